@@ -0,0 +1,104 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+import GlobalVariables
+
+# one pool of worker threads for the whole client, the Tk main loop never waits on the network
+executor = ThreadPoolExecutor(max_workers=GlobalVariables.worker_threads, thread_name_prefix="globaldorm-worker")
+
+
+class BackgroundWorker:
+    """
+    Runs blocking client calls on the shared worker pool and hands their results back to a window.
+    Results are collected in a queue and delivered on the Tk main loop with window.after polling,
+    the same way GlobalDormApp.check_for_new_messages picks up RabbitMQ messages.
+    Each job has a key (e.g. "crime"), submitting the same key again makes the previous job stale.
+    """
+    def __init__(self, window, poll_interval=50):
+        """
+        Initialises the worker for a window.
+
+        - window: the Tk/CTk window whose main loop receives the results.
+        - poll_interval: milliseconds between checks of the results queue while jobs are running.
+        """
+        self.window = window
+        self.poll_interval = poll_interval
+        self.results = queue.Queue()
+        self.generations = {}  # key -> latest submission, older results are dropped
+        self.futures = {}
+        self.pending = 0
+        self.polling = False
+
+    def submit(self, key, function, *args, on_result=None, on_error=None):
+        """
+        Runs function(*args) in the background and calls on_result(result) on the main loop.
+        Any earlier job with the same key is cancelled, or ignored if it has already started.
+        """
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        previous = self.futures.pop(key, None)
+
+        if previous is not None and previous.cancel():
+            self.pending -= 1
+
+        def job():
+            try:
+                self.results.put((key, generation, True, function(*args), on_result, on_error))
+            except Exception as e:
+                self.results.put((key, generation, False, e, on_result, on_error))
+
+        self.futures[key] = executor.submit(job)
+        self.pending += 1
+        self._start_polling()
+        return generation
+
+    def cancel(self, key):
+        """Cancels the job for a key, a result that still arrives is thrown away."""
+        self.generations[key] = self.generations.get(key, 0) + 1
+        future = self.futures.pop(key, None)
+
+        if future is not None and future.cancel():
+            self.pending -= 1
+
+    def is_busy(self, key):
+        """Checks whether a job for the key is still running."""
+        future = self.futures.get(key)
+        return future is not None and not future.done()
+
+    def _start_polling(self):
+        """Starts the window.after polling loop if it isn't already running."""
+        if not self.polling:
+            self.polling = True
+            self.window.after(self.poll_interval, self._check_for_results)
+
+    def _check_for_results(self):
+        """Delivers finished results on the main loop, keeps polling while jobs are outstanding."""
+        while not self.results.empty():
+            key, generation, succeeded, value, on_result, on_error = self.results.get()
+            self.pending -= 1
+
+            if self.generations.get(key) != generation:
+                continue  # stale, the user has clicked again since
+            self.futures.pop(key, None)
+
+            callback = on_result if succeeded else on_error
+            if callback is None:
+                if not succeeded:
+                    print(f"Background job '{key}' failed: {value}")
+                continue
+            try:
+                callback(value)
+            except Exception as e:  # a broken callback mustn't stop the polling, later results would never arrive
+                print(f"Handling the result of background job '{key}' failed: {e}")
+
+        if self.pending > 0:
+            try:
+                self.window.after(self.poll_interval, self._check_for_results)
+            except Exception:  # window destroyed while jobs were running
+                self.polling = False
+        else:
+            self.polling = False
+
+    def stop(self):
+        """Cancels every outstanding job, used when the window closes."""
+        for key in list(self.futures):
+            self.cancel(key)
@@ -0,0 +1,161 @@
+import math
+
+'''
+The crime category bar chart of the Search and Apply and Weather - Safety - Commute windows.
+Each window keeps one figure and canvas; showing another postcode's crimes changes the bar
+heights and count labels in place instead of building a new Figure and FigureCanvasTkAgg
+widget every time, and when the axes stay the same only the bars are redrawn (blitted).
+
+self.chart = CrimeChart(self.left_frame, figsize=(4, 4), place={"relx": 0.5, "rely": 0.3, "anchor": "center"})
+self.chart.show({"burglary": 3, "drugs": 5})
+'''
+
+text_size = 10
+number_text_size = 8
+count_bar_gap = 0.1
+bar_width = 0.6
+headroom = 1.1  # the y axis goes a little past the largest count, leaving room for its label
+min_fill = 0.4  # a largest count below this share of the y axis rescales it, so the bars don't shrink away
+
+
+def y_limit(max_count):
+    """A round top for the y axis above max_count: 1, 2 or 5 times a power of ten."""
+    needed = max_count * headroom + 1
+    magnitude = 10 ** math.floor(math.log10(needed))
+    return next(step * magnitude for step in (1, 2, 5, 10) if step * magnitude >= needed)
+
+
+class CrimeChart:
+    """
+    A bar chart of crime counts per category, built on the first show and then updated in place.
+    The layout (tight_layout) is only worked out again when the categories or the y axis's labels change,
+    and the axes only redrawn when the y axis has to be rescaled; otherwise the new bars are blitted
+    over a saved copy of the empty axes.
+    """
+    def __init__(self, master, figsize, place, layout_padding=1, color="C0", highlight_max=False, grid=False):
+        """
+        Initialises the chart, matplotlib isn't imported until the first show.
+
+        - master: the frame the canvas is placed in.
+        - figsize: figure size in inches at 100 dpi.
+        - place: keyword arguments for placing the canvas widget in master.
+        - color: the bars' colour; with highlight_max the largest count is drawn red.
+        """
+        self.master = master
+        self.figsize = figsize
+        self.place = place
+        self.layout_padding = layout_padding
+        self.color = color
+        self.highlight_max = highlight_max
+        self.grid = grid
+        self.figure = None
+        self.axes = None
+        self.canvas = None
+        self.bars = []
+        self.labels = []  # count above each bar
+        self.categories = None
+        self.top = None  # of the y axis
+        self.background = None  # the drawn figure without the bars, for blitting
+        self.layouts = 0
+        self.draws = 0  # full redraws
+        self.blits = 0
+
+    def _build(self):
+        """Creates the figure, axes and canvas once."""
+        # matplotlib is imported with the first chart, opening the window doesn't wait for it
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self._build_figure()
+        self.canvas = FigureCanvasTkAgg(self.figure, self.master)
+
+    def _build_figure(self):
+        """Creates the figure and axes with their titles, the canvas is up to _build."""
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=self.figsize, dpi=100)
+        self.axes = self.figure.add_subplot(111)
+        self.axes.set_title("Crime Data", fontsize=12, fontweight='bold', pad=5)
+        self.axes.set_xlabel("Crime Categories", fontsize=text_size, fontweight='bold', labelpad=10)
+        self.axes.set_ylabel("Counts", fontsize=text_size, fontweight='bold', labelpad=0)
+        if self.grid:
+            self.axes.grid(zorder=1)
+
+    def _on_draw(self, event):
+        """After every full draw (resizes too): saves the figure without the bars, then draws them on top."""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_bars()
+
+    def _draw_bars(self):
+        for artist in self.bars + self.labels:
+            self.axes.draw_artist(artist)
+
+    def _colors(self, counts):
+        max_count = max(counts) if counts else 0
+        return ['red' if self.highlight_max and count == max_count else self.color for count in counts]
+
+    def _lay_out(self, categories, counts):
+        """Replaces the bars and labels for a new set of categories."""
+        for artist in self.bars + self.labels:
+            artist.remove()
+
+        # numeric positions, categorical ones would keep every category ever shown on the axis
+        self.bars = list(self.axes.bar(range(len(categories)), counts, width=bar_width, zorder=2, color=self._colors(counts)))
+        self.labels = [self.axes.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + count_bar_gap, str(bar.get_height()),
+                                      ha='center', va='bottom', fontsize=number_text_size) for bar in self.bars]
+        for artist in self.bars + self.labels:
+            artist.set_animated(True)  # left out of full draws, _on_draw draws them over the saved background
+        self.axes.set_xticks(range(len(categories)))
+        self.axes.set_xticklabels(categories, rotation=90, fontsize=text_size)
+        self.axes.set_xlim(-0.5, len(categories) - 0.5)
+        self.categories = categories
+
+    def _update(self, counts):
+        """Moves the existing bars and labels to new counts."""
+        for bar, label, count, color in zip(self.bars, self.labels, counts, self._colors(counts)):
+            bar.set_height(count)
+            bar.set_color(color)
+            label.set_y(count + count_bar_gap)
+            label.set_text(str(count))
+
+    def show(self, crime_data):
+        """Shows {category: count}, blitting the bars straight away or redrawing everything when Tk is idle."""
+        if self.canvas is None:
+            self._build()
+            self.canvas.mpl_connect("draw_event", self._on_draw)
+
+        categories = list(crime_data.keys())
+        counts = list(crime_data.values())
+        max_count = max(counts, default=0)
+        relayout = categories != self.categories
+        rescale = self.top is None or not (min_fill * self.top < max_count * headroom + 1 <= self.top)
+
+        if relayout:
+            self._lay_out(categories, counts)
+        else:
+            self._update(counts)
+
+        if rescale:
+            top = y_limit(max_count)
+            relayout = relayout or len(str(top)) != len(str(self.top))  # wider y tick labels need more room
+            self.top = top
+            self.axes.set_ylim(0, top)
+
+        if relayout:
+            self.figure.tight_layout(pad=self.layout_padding)
+            self.layouts += 1
+
+        self.canvas.get_tk_widget().place(**self.place)
+        if relayout or rescale or self.background is None:
+            self.background = None  # out of date until the draw, _on_draw saves the new one
+            self.canvas.draw_idle()
+            self.draws += 1
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_bars()
+            self.canvas.blit(self.figure.bbox)
+            self.blits += 1
+
+    def clear(self):
+        """Hides the chart, the canvas is kept for the next one."""
+        if self.canvas is not None:
+            self.canvas.get_tk_widget().place_forget()
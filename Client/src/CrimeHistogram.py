@@ -0,0 +1,92 @@
+from collections import Counter
+
+'''
+Crime records summarised as counts, so the chart, the Safety message and comparison reports
+across many dorm postcodes work from a few hundred bytes per postcode and month instead of
+the raw police records. Histograms add up, so several months or postcodes merge without refetching.
+
+total = CrimeHistogram.merge(histogram_for_ng7, histogram_for_ng1)
+'''
+
+# (upper limit, message) for the risk bands, by number of crimes in the area
+RISK_BANDS = ((50, "Low crime risk in the area."), (150, "Moderate crime risk."), (300, "High crime risk."),
+              (500, "Very high crime risk."))
+HIGHEST_RISK = "Extremely high crime risk."
+
+
+class CrimeHistogram:
+    """Counts per category, per month and per street for a set of crime records."""
+    __slots__ = ("categories", "months", "streets")
+
+    def __init__(self, categories=None, months=None, streets=None):
+        """
+        Initialises the histogram.
+
+        - categories, months, streets: existing counts ({name: count}), e.g. from to_json.
+        """
+        self.categories = Counter(categories or {})
+        self.months = Counter(months or {})
+        self.streets = Counter(streets or {})
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds a histogram from crime records (CrimeRecordRow or CrimeRecord), which can be a stream."""
+        histogram = cls()
+        for record in records:
+            histogram.add(record)
+        return histogram
+
+    def add(self, record):
+        """Counts one crime record."""
+        self.categories[record.category] += 1
+        self.months[record.month] += 1
+        self.streets[record.location.street.name] += 1
+
+    @classmethod
+    def merge(cls, *histograms):
+        """A new histogram with the counts of every histogram given, e.g. several months or postcodes."""
+        merged = cls()
+        for histogram in histograms:
+            merged.categories.update(histogram.categories)
+            merged.months.update(histogram.months)
+            merged.streets.update(histogram.streets)
+        return merged
+
+    def __add__(self, other):
+        return CrimeHistogram.merge(self, other)
+
+    @property
+    def total(self):
+        """Number of crimes counted."""
+        return sum(self.categories.values())
+
+    def risk_message(self):
+        """The risk band for the number of crimes, as shown by the Safety button."""
+        total = self.total
+        for limit, message in RISK_BANDS:
+            if total < limit:
+                return message
+        return HIGHEST_RISK
+
+    def category_counts(self):
+        """{category: count} in the order categories were first seen, for the bar charts."""
+        return dict(self.categories)
+
+    def top_streets(self, count=5):
+        """The streets with the most crimes, as (street, count) pairs."""
+        return self.streets.most_common(count)
+
+    def to_json(self):
+        """Plain dicts for the persistent cache."""
+        return {"categories": self.categories, "months": self.months, "streets": self.streets}
+
+    @classmethod
+    def from_json(cls, value):
+        """Rebuilds a histogram saved with to_json."""
+        return cls(value["categories"], value["months"], value["streets"])
+
+    def __len__(self):
+        return self.total
+
+    def __repr__(self):
+        return f"CrimeHistogram(total={self.total}, months={sorted(self.months)})"
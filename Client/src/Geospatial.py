@@ -0,0 +1,166 @@
+import math
+from array import array
+from typing import NamedTuple
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, distances are then worked out one by one
+    np = None
+import GlobalVariables
+
+'''
+Distances from a room's postcode to the crimes around it. The server only returns crimes within
+half a mile (RadiusChecker); here their string coordinates are parsed once into float arrays, so
+any set of rings can be counted in one vectorised haversine pass without asking the server again.
+
+rings = points.rings(52.9536, -1.1505)  # CrimePoints from GlobalDormFunctions.fetch_crime_points
+print(rings.summary())
+'''
+
+available = np is not None
+
+EARTH_RADIUS_MILES = 3958.8  # same as the server's RadiusChecker
+
+
+def haversine_miles(latitude, longitude, latitudes, longitudes):
+    """Distances in miles from one point to many, with NumPy arrays of latitudes and longitudes in degrees."""
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+
+    a = (np.sin((latitudes - latitude) / 2) ** 2
+         + math.cos(latitude) * np.cos(latitudes) * np.sin((longitudes - longitude) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def haversine_mile(latitude, longitude, target_latitude, target_longitude):
+    """Distance in miles between two points, as RadiusChecker.withinRadius works it out."""
+    latitude_difference = math.radians(target_latitude - latitude)
+    longitude_difference = math.radians(target_longitude - longitude)
+
+    a = (math.sin(latitude_difference / 2) ** 2
+         + math.cos(math.radians(latitude)) * math.cos(math.radians(target_latitude)) * math.sin(longitude_difference / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+class CrimeRings(NamedTuple):
+    """Crimes counted per distance ring: ring i holds crimes further than radii[i - 1] and at most radii[i]."""
+    radii: tuple
+    counts: list  # crimes per ring
+    categories: list  # {category: count} per ring
+    outside: int  # crimes further out than the last ring
+
+    def cumulative(self):
+        """Crimes within each radius, e.g. everything within 0.25 miles."""
+        totals, total = [], 0
+        for count in self.counts:
+            total += count
+            totals.append(total)
+        return totals
+
+    def densities(self):
+        """Crimes per square mile in each ring."""
+        areas, inner = [], 0.0
+        for radius in self.radii:
+            areas.append(math.pi * (radius ** 2 - inner ** 2))
+            inner = radius
+        return [count / area for count, area in zip(self.counts, areas)]
+
+    def summary(self):
+        """One line per ring for the Safety view."""
+        lines, inner = [], 0.0
+        for radius, count, density in zip(self.radii, self.counts, self.densities()):
+            ring = f"Within {radius:g} miles" if not inner else f"{inner:g}-{radius:g} miles"
+            lines.append(f"{ring}: {count} crime{'' if count == 1 else 's'} ({density:.0f} per sq mile)")
+            inner = radius
+        return "\n".join(lines)
+
+
+class CrimePoints:
+    """Crime locations as float arrays, with a category code per crime. Built in the same pass as CrimeHistogram."""
+    __slots__ = ("latitudes", "longitudes", "codes", "category_names", "_category_codes")
+
+    def __init__(self):
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.codes = array("H")  # index into category_names
+        self.category_names = []
+        self._category_codes = {}
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds the arrays from crime records (CrimeRecordRow or CrimeRecord), which can be a stream."""
+        points = cls()
+        for record in records:
+            points.add(record)
+        return points
+
+    def add(self, record):
+        """Parses one record's coordinates, raising ValueError (and adding nothing) if they aren't numbers."""
+        latitude, longitude = float(record.location.latitude), float(record.location.longitude)
+
+        code = self._category_codes.get(record.category)
+        if code is None:
+            code = self._category_codes[record.category] = len(self.category_names)
+            self.category_names.append(record.category)
+
+        self.latitudes.append(latitude)
+        self.longitudes.append(longitude)
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def distances_from(self, latitude, longitude):
+        """Miles from a point to every crime, as a NumPy array (a list without NumPy)."""
+        if np is None:
+            return [haversine_mile(latitude, longitude, target_latitude, target_longitude)
+                    for target_latitude, target_longitude in zip(self.latitudes, self.longitudes)]
+        return haversine_miles(latitude, longitude, np.frombuffer(self.latitudes), np.frombuffer(self.longitudes))
+
+    def rings(self, latitude, longitude, radii=None):
+        """
+        Counts the crimes, and their categories, in each distance ring around a point.
+
+        - latitude, longitude: the room's postcode.
+        - radii: ascending ring radii in miles, defaults to GlobalVariables.crime_rings.
+        """
+        radii = tuple(radii or GlobalVariables.crime_rings)
+        ring_count = len(radii) + 1  # the last slot is for crimes outside every ring
+        distances = self.distances_from(latitude, longitude)
+
+        if np is None:
+            positions = [next((ring for ring, radius in enumerate(radii) if distance <= radius), len(radii))
+                         for distance in distances]
+            pairs = [0] * (ring_count * len(self.category_names))
+            for position, code in zip(positions, self.codes):
+                pairs[code * ring_count + position] += 1
+        else:
+            positions = np.searchsorted(np.asarray(radii), distances, side="left")
+            codes = np.frombuffer(self.codes, dtype=np.uint16).astype(np.int64)
+            pairs = np.bincount(codes * ring_count + positions, minlength=ring_count * len(self.category_names)).tolist()
+
+        counts = [0] * ring_count
+        categories = [{} for _ in radii]
+        for code, name in enumerate(self.category_names):
+            for ring in range(ring_count):
+                count = pairs[code * ring_count + ring]
+                counts[ring] += count
+                if count and ring < len(radii):
+                    categories[ring][name] = count
+
+        return CrimeRings(radii, counts[:-1], categories, counts[-1])
+
+    def to_json(self):
+        """Plain lists for the persistent cache."""
+        return {"latitudes": self.latitudes.tolist(), "longitudes": self.longitudes.tolist(),
+                "codes": self.codes.tolist(), "categories": self.category_names}
+
+    @classmethod
+    def from_json(cls, value):
+        """Rebuilds points saved with to_json."""
+        points = cls()
+        points.latitudes.extend(value["latitudes"])
+        points.longitudes.extend(value["longitudes"])
+        points.codes.extend(value["codes"])
+        points.category_names = list(value["categories"])
+        points._category_codes = {name: code for code, name in enumerate(points.category_names)}
+        return points
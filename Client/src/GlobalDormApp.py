@@ -1,12 +1,16 @@
 import customtkinter as ctk
+import importlib
 import queue
-from WeatherSafetyCommuteWindow import WeatherSafetyCommuteWindow
-from SearchAndApplyWindow import SearchAndApplyWindow
-from RabbitPushNotifications import PushNotifications
-from PIL import Image
-from GlobalDormFunctions import register_user, verify_user
+import threading
+from ImageAssets import background_image, pixel_size, scaled_image
+from GlobalDormTransport import transport
+from ServerProber import server_prober
+from BackgroundWorker import BackgroundWorker
+from WindowManager import WindowManager
 from GlobalVariables import global_set_user, global_fetch_user, database_url
-from GlobalVariables import servers, change_server, global_fetch_server
+from GlobalVariables import servers, global_fetch_server, status_poll_interval, deferred_modules, warm_up_delay
+from GlobalVariables import background_images
+from Resilience import status_message
 
 
 # database = "http://localhost:8080/GlobalDorm/webresources/database"
@@ -15,6 +19,9 @@ from GlobalVariables import servers, change_server, global_fetch_server
 # WARNING! Once application is cancelled, user cannot apply again...
 # also, becareful with spaces
 
+# The windows, GlobalDormFunctions (pydantic), matplotlib, tkcalendar and pika are imported when first needed,
+# so the home screen appears without waiting for them; warm_up loads them in the background after that.
+
 
 ctk.set_appearance_mode("dark")  # adjust as needed: "light", "dark", or "system"
 
@@ -30,6 +37,8 @@ class GlobalDormApp:
         # self.window.iconbitmap("images/icons/global_dorm_2.ico")
         self.window.geometry(f"{self.width * 2}x{self.height}")
         self.window.resizable(False, False)
+        self.worker = BackgroundWorker(self.window)  # login and registration run off the Tk main loop
+        self.windows = WindowManager(self)  # the secondary windows, built on first use and then kept
 
         # grid
         self.grid_container = ctk.CTkFrame(self.window, width=self.width * 2, height=self.height, fg_color="#27374D")
@@ -50,20 +59,43 @@ class GlobalDormApp:
         self.turn_notifications_on()  # has a test message at the moment
 
         self.message_queue = queue.Queue()  # message queue for receiving messages from the RabbitMQ listener
-        self.push_notifications = PushNotifications(message_queue=self.message_queue)
+        self.push_notifications = None  # created when notifications are first enabled, pika isn't needed before
         self.is_logged_in = False
         
         self.create_server_toggle_button()
         self.create_server_label()
+        self.create_service_status_label()
+        transport.on_failure = server_prober.probe_now  # a failed request checks the other servers straight away
+        server_prober.start()
 
         self.window.after(4000, self.create_login_register_form)
+        self.window.after(warm_up_delay, self.warm_up)
         self.window.mainloop()
 
+    def warm_up(self):
+        '''
+        Imports the deferred modules and scales the other windows' backgrounds in a background thread
+        once the home screen is up, so the first click is quick too.
+        '''
+        size = pixel_size((self.width, self.height), self.window)  # the other windows are the same size
+
+        def preload():
+            for module in deferred_modules:
+                try:
+                    importlib.import_module(module)
+                except Exception as e:  # it will fail again, with the full error, when the window is opened
+                    print(f"Couldn't preload {module}: {e}")
+            for name in ("search", "commute"):
+                try:
+                    scaled_image(background_images[name], size)
+                except OSError as e:
+                    print(f"Couldn't preload the {name} background: {e}")
+
+        threading.Thread(target=preload, name="globaldorm-warm-up", daemon=True).start()
+
     def add_image_to_left(self):
         '''Displays the main image on the left side.'''
-        home_image = ctk.CTkImage(light_image=Image.open("images/pexels-abdullahalmallah-8654406.jpg"),
-                                  dark_image=Image.open("images/pexels-abdullahalmallah-8654406.jpg"),
-                                  size=(self.width, self.height))
+        home_image = background_image(background_images["home"], (self.width, self.height), self.window)
 
         home_image_label = ctk.CTkLabel(self.left_frame, text="", image=home_image)
         home_image_label.place(relx=0.5, rely=0.5, anchor="center")
@@ -84,12 +116,12 @@ class GlobalDormApp:
             if global_fetch_user() == "":
                 return
 
-            SearchAndApplyWindow(self)
-            self.window.withdraw()
+            from SearchAndApplyWindow import SearchAndApplyWindow  # usually warmed up already
+            self.windows.show("search", SearchAndApplyWindow)
 
         def weather_safety_commute():
-            WeatherSafetyCommuteWindow(self)
-            self.window.withdraw()
+            from WeatherSafetyCommuteWindow import WeatherSafetyCommuteWindow
+            self.windows.show("commute", WeatherSafetyCommuteWindow)
 
         search_button = ctk.CTkButton(self.right_frame, text="Search and Apply for Rooms",
                                       command=search_and_apply, font=("Helvetica", 18), width=300, height=80,
@@ -117,6 +149,7 @@ class GlobalDormApp:
         '''Handles user logout.'''
         self.is_logged_in = False
         global_set_user("", "")
+        self.windows.close_all()  # they hold the last user's entries and results
         if hasattr(self, "logged_in_user_label"):
             self.logged_in_user_label.destroy()
             del self.logged_in_user_label  # for ++ logins, delete previous reference
@@ -126,7 +159,10 @@ class GlobalDormApp:
     def exit_application(self):
         '''Closes the application.'''
         self.window.destroy()
-        self.push_notifications.stop_consuming()
+        if self.push_notifications is not None:
+            self.push_notifications.stop_consuming()
+        server_prober.stop()
+        transport.close()
 
     def update_exit_logout(self):
         '''Updates exit/logout button text.'''
@@ -192,29 +228,47 @@ class GlobalDormApp:
 
     def handle_action(self):
         '''Processes login or registration.'''
+        from GlobalDormFunctions import register_user, verify_user  # warmed up by now, imported here to keep startup light
         username = self.username_entry.get()
         password = self.password_entry.get()
 
+        def action_error(error):
+            self.action_button.configure(state="normal")
+            self.show_secret_message(f"Error: {error}")
+
         if self.switch.get():  # login
-            message, verify_result_status = verify_user(database_url(), username, password, timeout=5)
-            if verify_result_status == "success":
-                self.is_logged_in = True
-                global_set_user(username, password)
-                self.display_logged_in_user(username)
-                self.update_exit_logout()  # switch to logout
-                self.register_form_frame.place_forget()
-            else:
-                self.show_secret_message(message)
+            def login_result(result):
+                message, verify_result_status = result
+                self.action_button.configure(state="normal")
+                if verify_result_status == "success":
+                    self.is_logged_in = True
+                    global_set_user(username, password)
+                    self.display_logged_in_user(username)
+                    self.update_exit_logout()  # switch to logout
+                    self.register_form_frame.place_forget()
+                else:
+                    self.show_secret_message(message)
+
+            self.action_button.configure(state="disabled")
+            self.worker.submit("account", verify_user, database_url(), username, password, 5, on_result=login_result,
+                               on_error=action_error)
         else:  # register
             confirm_password = self.confirm_password_entry.get()
-            message, register_result_status = register_user(database_url(), username, password, confirm_password, timeout=5)
-            if password == confirm_password:
+            if password != confirm_password:
+                self.show_secret_message("Passwords do not match!")
+                return
+
+            def register_result(result):
+                message, register_result_status = result
+                self.action_button.configure(state="normal")
                 if register_result_status == "success":
                     self.clear_form()
                 else:
                     self.show_secret_message(message)
-            else:
-                self.show_secret_message("Passwords do not match!")
+
+            self.action_button.configure(state="disabled")
+            self.worker.submit("account", register_user, database_url(), username, password, confirm_password, 5,
+                               on_result=register_result, on_error=action_error)
 
     def display_logged_in_user(self, username):
         '''Shows the logged-in username.'''
@@ -278,11 +332,14 @@ class GlobalDormApp:
     def toggle_message(self):
         '''Toggles RabbitMQ message listening.'''
         if self.notifications_enabled.get():
+            if self.push_notifications is None:
+                from RabbitPushNotifications import PushNotifications
+                self.push_notifications = PushNotifications(message_queue=self.message_queue)
             self.push_notifications.listen_for_messages()
             self.check_for_new_messages()
 #            self.show_update_notification_message("This is just a test, just a little test. ABCDEFGHIJKLMNOPQRSTUVWXYZ")
 #            self.show_update_notification_message("This is just a test.")
-        else:
+        elif self.push_notifications is not None:
             self.push_notifications.stop_consuming()
             
     def create_server_toggle_button(self):  # switch servers - database doesn't work!
@@ -292,7 +349,7 @@ class GlobalDormApp:
             current_server_index = servers_list.index(global_fetch_server())
             next_server_index = (current_server_index + 1) % len(servers_list)
             next_server = servers_list[next_server_index]
-            change_server(next_server)
+            server_prober.pin(next_server)  # kept until it stops answering
             self.update_server_label()
 
         button_size = 10
@@ -308,8 +365,22 @@ class GlobalDormApp:
         self.server_label.place(relx=0.51, rely=0.01, anchor="nw")
 
     def update_server_label(self):
-        '''Updates the displayed server name. THIS ISN'T NECESSARY.'''
-        self.server_label.configure(text=f"{global_fetch_server()}")
+        '''Updates the displayed server name and its round trip time, the prober can switch servers at any time.'''
+        self.server_label.configure(text=server_prober.label())
+
+    def create_service_status_label(self):
+        '''Shows which services are unavailable (open circuit breakers), under the server name.'''
+        self.service_status_label = ctk.CTkLabel(self.right_frame, text="", font=("Helvetica", 12), text_color="#FFD700",
+                                                 bg_color="transparent", justify="left")
+        self.service_status_label.place(relx=0.51, rely=0.05, anchor="nw")
+        self.update_service_status()
+
+    def update_service_status(self):
+        '''Refreshes the service status and server labels every second, the prober may have switched servers.'''
+        self.service_status_label.configure(text=status_message())
+        self.update_server_label()
+        self.window.after(status_poll_interval, self.update_service_status)
 
 
-GlobalDormApp()
+if __name__ == "__main__":
+    GlobalDormApp()
@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import GlobalDormFunctions
+import GlobalVariables
+from ResponseCache import normalise_postcode
+from SingleFlight import lookups
+from model.routeDistanceModel import CommuteRow
+
+'''
+asyncio versions of the read-only GlobalDormFunctions calls, for scripted bulk lookups.
+Each call runs the matching sync function on a worker thread, so the return values
+are exactly the strings and tuples the GUI already gets, and every request still goes
+through the pooled keep-alive transport. Identical lookups already in flight, from other tasks or
+from the GUI's threads, are awaited rather than sent again.
+
+results = asyncio.run(weather_for_postcodes(weather_url(), ["NG11AA", "NG72RD"]))
+'''
+
+
+# the threads gather_limited's lookups run on, None for the event loop's default executor
+_executor = contextvars.ContextVar("executor", default=None)
+
+
+async def _run(function, *args):
+    """Runs a blocking client function on a worker thread."""
+    return await asyncio.get_running_loop().run_in_executor(_executor.get(), function, *args)
+
+
+async def _shared(function, *args):
+    """Like _run, but waits for an identical call that is already in flight instead of making another one."""
+    return await lookups.do_async((function.__name__,) + args, function, *args, executor=_executor.get())
+
+
+async def httpJsonWeatherData(url, postcode):
+    """Async version of GlobalDormFunctions.httpJsonWeatherData."""
+    return await _shared(GlobalDormFunctions.httpJsonWeatherData, url, postcode)
+
+
+async def httpJsonCrimeData(url, postcode):
+    """Async version of GlobalDormFunctions.httpJsonCrimeData."""
+    return await _shared(GlobalDormFunctions.httpJsonCrimeData, url, postcode)
+
+
+async def fetch_crime_histogram(url, postcode, month=None):
+    """Async version of GlobalDormFunctions.fetch_crime_histogram."""
+    return await _shared(GlobalDormFunctions.fetch_crime_histogram, url, postcode, month)
+
+
+async def fetch_crime_rings(url, postcode, month=None, radii=None):
+    """Async version of GlobalDormFunctions.fetch_crime_rings."""
+    return await _run(GlobalDormFunctions.fetch_crime_rings, url, postcode, month, radii)
+
+
+async def httpJsonDistanceData(url, sourcePostcode, targetPostcode):
+    """Async version of GlobalDormFunctions.httpJsonDistanceData."""
+    return await _shared(GlobalDormFunctions.httpJsonDistanceData, url, sourcePostcode, targetPostcode)
+
+
+async def fetch_route(url, sourcePostcode, targetPostcode):
+    """Async version of GlobalDormFunctions.fetch_route."""
+    return await _shared(GlobalDormFunctions.fetch_route, url, sourcePostcode, targetPostcode)
+
+
+async def fetch_dorm_room_names(database, min_price, max_price, city, live_in_landlord, max_roommates,
+                                bills_included, shared_bathroom, languages_spoken, available_from):
+    """Async version of GlobalDormFunctions.fetch_dorm_room_names."""
+    return await _run(GlobalDormFunctions.fetch_dorm_room_names, database, min_price, max_price, city, live_in_landlord,
+                      max_roommates, bills_included, shared_bathroom, languages_spoken, available_from)
+
+
+async def search_dorm_rooms(database, query):
+    """Async version of GlobalDormFunctions.search_dorm_rooms."""
+    return await _run(GlobalDormFunctions.search_dorm_rooms, database, query)
+
+
+async def fetch_dorm_room_combined_information(database, room_name):
+    """Async version of GlobalDormFunctions.fetch_dorm_room_combined_information."""
+    return await _shared(GlobalDormFunctions.fetch_dorm_room_combined_information, database, room_name)
+
+
+async def view_room_application_history(database, dorm_name):
+    """Async version of GlobalDormFunctions.view_room_application_history."""
+    return await _run(GlobalDormFunctions.view_room_application_history, database, dorm_name)
+
+
+async def gather_limited(function, arguments, limit=None):
+    """
+    Runs an async client function once per argument tuple, at most limit at a time.
+    Results come back in the same order as the arguments.
+    """
+    limit = limit or GlobalVariables.async_concurrency
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(args):
+        async with semaphore:
+            return await function(*args)
+
+    # own threads, as in route_matrix, so the limit isn't capped by the event loop's default executor
+    with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="globaldorm-async") as executor:
+        token = _executor.set(executor)  # the tasks gather creates copy it
+        try:
+            return await asyncio.gather(*(bounded(args) for args in arguments))
+        finally:
+            _executor.reset(token)
+
+
+async def weather_for_postcodes(url, postcodes, limit=None):
+    """Fetches weather for many postcodes concurrently, returning {postcode: message}."""
+    results = await gather_limited(httpJsonWeatherData, [(url, postcode) for postcode in postcodes], limit)
+    return dict(zip(postcodes, results))
+
+
+async def crime_for_postcodes(url, postcodes, limit=None):
+    """Fetches crime data for many postcodes concurrently, returning {postcode: (message, categories)}."""
+    results = await gather_limited(httpJsonCrimeData, [(url, postcode) for postcode in postcodes], limit)
+    return dict(zip(postcodes, results))
+
+
+async def crime_histograms_for_postcodes(url, postcodes, months=(None,), limit=None):
+    """
+    Fetches crime histograms for many postcodes and months concurrently, returning {(postcode, month): CrimeHistogram or None}.
+    Merge them with CrimeHistogram.merge for a report across areas or months.
+    """
+    pairs = [(postcode, month) for postcode in postcodes for month in months]
+    results = await gather_limited(fetch_crime_histogram, [(url, postcode, month) for postcode, month in pairs], limit)
+    return dict(zip(pairs, results))
+
+
+async def routes_from_postcode(url, sourcePostcode, targetPostcodes, limit=None):
+    """Fetches routes from one postcode to many others concurrently, returning {target: message}."""
+    results = await gather_limited(httpJsonDistanceData, [(url, sourcePostcode, target) for target in targetPostcodes], limit)
+    return dict(zip(targetPostcodes, results))
+
+
+async def combined_information_for_rooms(database, room_names, limit=None):
+    """Fetches combined information for many rooms concurrently, returning {room_name: (postcode, details)}."""
+    results = await gather_limited(fetch_dorm_room_combined_information, [(database, room) for room in room_names], limit)
+    return dict(zip(room_names, results))
+
+
+async def application_history_for_rooms(database, dorm_names, limit=None):
+    """Fetches the application history of many rooms concurrently, returning {dorm_name: history}."""
+    results = await gather_limited(view_room_application_history, [(database, dorm) for dorm in dorm_names], limit)
+    return dict(zip(dorm_names, results))
+
+
+def _by_duration(row):
+    """Sort key for commute tables: quickest first, failed routes last."""
+    return (row.route is None, row.route.duration if row.route else 0)
+
+
+async def route_matrix(url, sourcePostcode, targetPostcodes, limit=None):
+    """
+    Routes from one postcode to many, all at once up to limit (GlobalVariables.route_concurrency) in flight.
+    Repeated targets are routed once and every route is cached, so the table takes about as long as the slowest route.
+    Returns CommuteRows (named by postcode) sorted by duration, failed routes last.
+    """
+    targets = list(dict.fromkeys(normalise_postcode(postcode) for postcode in targetPostcodes))
+    if not targets:
+        return []
+
+    loop = asyncio.get_running_loop()
+    # own threads, so the limit isn't capped by the event loop's default executor
+    with ThreadPoolExecutor(max_workers=min(limit or GlobalVariables.route_concurrency, len(targets)),
+                            thread_name_prefix="globaldorm-routes") as executor:
+        results = await asyncio.gather(*(loop.run_in_executor(executor, GlobalDormFunctions.fetch_route, url, sourcePostcode, target)
+                                         for target in targets))
+
+    return sorted((CommuteRow(target, target, route, message) for target, (route, message) in zip(targets, results)), key=_by_duration)
+
+
+async def commute_to_rooms(url, database, sourcePostcode, room_names, limit=None):
+    """
+    Commutes from one postcode (e.g. a campus) to every room in room_names, such as a search's results.
+    Rooms sharing a postcode cost one route. Returns CommuteRows sorted by duration, failed routes last.
+    """
+    postcodes = await _run(GlobalDormFunctions.room_postcodes, database, room_names)
+    routes = {row.postcode: row for row in await route_matrix(url, sourcePostcode, postcodes.values(), limit)}
+
+    rows = []
+    for name, postcode in postcodes.items():
+        row = routes[normalise_postcode(postcode)]
+        rows.append(CommuteRow(name, postcode, row.route, row.message))
+    return sorted(rows, key=_by_duration)
+
+
+def commute_table(url, database, sourcePostcode, room_names, limit=None):
+    """Blocking version of commute_to_rooms, for the GUI's background worker."""
+    return asyncio.run(commute_to_rooms(url, database, sourcePostcode, room_names, limit))
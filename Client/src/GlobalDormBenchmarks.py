@@ -0,0 +1,1109 @@
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+'''
+Benchmarks for the client, run against a local stand-in for the Tomcat server.
+Nothing here talks to the real APIs.
+
+cd Documents/NetBeansProjects/Client/src/
+py GlobalDormBenchmarks.py
+'''
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a canned JSON body, keeping the connection alive like Tomcat does."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Tomcat flushes headers and body together
+    routes = {}
+    delay = 0.0  # seconds, stands in for the upstream API the server calls
+    hits = Counter()  # requests per path, i.e. calls the server would make upstream
+    down = False  # hang up without answering, like a server that has gone away
+
+    def do_GET(self):
+        if self.down:
+            self.close_connection = True
+            return
+        path = self.path.split("?")[0]
+        self.hits[path] += 1
+        time.sleep(self.delay)
+        body = self.routes.get(path, b"[]")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):  # ServerProber's probes
+        if self.down:
+            self.close_connection = True
+            return
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # keep the benchmark output readable
+
+
+class StandInServer(ThreadingHTTPServer):
+    request_queue_size = 128  # room for many simultaneous connections, e.g. a whole route matrix
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):  # a client that timed out and hung up, expected in benchmark_outage
+            super().handle_error(request, client_address)
+
+
+def start_stand_in_server(routes, delay=0.0):
+    """Starts the stand-in server on a free local port and returns it with its base URL."""
+    StandInHandler.delay = delay
+    StandInHandler.hits.clear()
+    StandInHandler.routes = {path: json.dumps(payload).encode("utf-8") for path, payload in routes.items()}
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def time_calls(function, repeat):
+    """Runs function repeat times and returns the per-call timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(title, timings):
+    print(f"{title:<40} mean {statistics.mean(timings):7.3f} ms   median {statistics.median(timings):7.3f} ms")
+
+
+def benchmark_transport(repeat=300):
+    """Per-request latency of a bare requests.get against the pooled keep-alive transport."""
+    import requests
+    from GlobalDormTransport import ClientTransport
+
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/database/viewAllDormRooms": {"status": "success", "data": []}})
+    url = f"{base_url}/GlobalDorm/webresources/database/viewAllDormRooms"
+    pooled = ClientTransport()
+
+    try:
+        bare = time_calls(lambda: requests.get(url), repeat)
+        keep_alive = time_calls(lambda: pooled.get(url), repeat)
+    finally:
+        pooled.close()
+        server.shutdown()
+
+    print("\nTransport (one request per click)")
+    report("requests.get (new connection)", bare)
+    report("ClientTransport (pooled keep-alive)", keep_alive)
+    print(f"saved per request: {statistics.mean(bare) - statistics.mean(keep_alive):.3f} ms")
+
+
+def benchmark_bulk_weather(postcode_count=40, upstream_delay=0.05):
+    """Weather for many postcodes one at a time against GlobalDormAsync with a bounded fan-out."""
+    import asyncio
+    import GlobalDormAsync
+    import GlobalDormFunctions
+    from GlobalDormFunctions import httpJsonWeatherData
+    from PersistentCache import PersistentCache
+    from ResponseCache import weather_cache
+
+    weather = [{"date": "20241130", "weather": "cloudy", "temp_min": 3, "temp_max": 9},
+               {"date": "20241201", "weather": "rain", "temp_min": 4, "temp_max": 8}]
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/globaldorm/weather": weather}, delay=upstream_delay)
+    url = f"{base_url}/GlobalDorm/webresources/globaldorm/weather?postcode="
+    postcodes = [f"NG{number}AA" for number in range(postcode_count)]
+
+    saved_cache = GlobalDormFunctions.persistent_cache
+    try:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")  # don't touch the real cache file
+        start = time.perf_counter()
+        sequential = {postcode: httpJsonWeatherData(url, postcode) for postcode in postcodes}
+        sequential_time = time.perf_counter() - start
+
+        weather_cache.clear()  # time the network, not the cache
+        start = time.perf_counter()
+        concurrent = asyncio.run(GlobalDormAsync.weather_for_postcodes(url, postcodes))
+        concurrent_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        GlobalDormFunctions.persistent_cache = saved_cache
+
+    assert sequential == concurrent
+    print(f"\nBulk weather, {postcode_count} postcodes, {upstream_delay * 1000:.0f} ms upstream")
+    print(f"one at a time: {sequential_time:.2f} s   GlobalDormAsync: {concurrent_time:.2f} s")
+
+    weather_cache.clear()
+
+
+def benchmark_cached_lookups(repeat=1000, upstream_delay=0.2):
+    """First weather lookup for a postcode against repeat lookups served by the TTL cache."""
+    import GlobalDormFunctions
+    from GlobalDormFunctions import httpJsonWeatherData
+    from PersistentCache import PersistentCache
+    from ResponseCache import weather_cache
+
+    weather = [{"date": "20241130", "weather": "cloudy", "temp_min": 3, "temp_max": 9},
+               {"date": "20241201", "weather": "rain", "temp_min": 4, "temp_max": 8}]
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/globaldorm/weather": weather}, delay=upstream_delay)
+    url = f"{base_url}/GlobalDorm/webresources/globaldorm/weather?postcode="
+
+    saved_cache = GlobalDormFunctions.persistent_cache
+    try:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")  # don't touch the real cache file
+        weather_cache.clear()
+        first = time_calls(lambda: httpJsonWeatherData(url, "ng7 2rd"), 1)
+        repeats = time_calls(lambda: httpJsonWeatherData(url, "NG72RD"), repeat)
+    finally:
+        server.shutdown()
+        GlobalDormFunctions.persistent_cache = saved_cache
+
+    print(f"\nWeather cache, {upstream_delay * 1000:.0f} ms upstream")
+    print(f"first lookup: {first[0]:.1f} ms   repeat lookup: {statistics.mean(repeats) * 1000:.2f} \u00b5s   {weather_cache.stats()}")
+    weather_cache.clear()
+
+
+cities = ["Nottingham", "London", "Leeds", "Manchester", "Bristol", "Sheffield", "Leicester", "Derby"]
+languages = ["English", "Spanish", "French", "German", "Mandarin", "Italian"]
+
+
+def sample_room_payload(count, seed=1):
+    """A /viewAllDormRooms payload with count made-up rooms."""
+    generator = random.Random(seed)
+    rooms = []
+    for room_id in range(count):
+        rooms.append({
+            "id": room_id,
+            "name": f"Room {room_id}",
+            "location": {"city": generator.choice(cities), "county": "Somewhere", "postcode": f"NG{generator.randint(1, 20)} {generator.randint(1, 9)}AB"},
+            "details": {"furnished": generator.random() < 0.5, "amenities": ["wifi", "desk"],
+                        "live_in_landlord": generator.random() < 0.3, "shared_with": generator.randint(0, 5),
+                        "bills_included": generator.random() < 0.5, "bathroom_shared": generator.random() < 0.6},
+            "price_per_month_gbp": generator.randint(300, 1500),
+            "availability_date": f"2025-{generator.randint(1, 12):02d}-{generator.randint(1, 28):02d}",
+            "spoken_languages": generator.sample(languages, generator.randint(1, 3)),
+            "is_available": generator.random() < 0.8,
+        })
+    return {"status": "success", "data": rooms}
+
+
+def sample_filters(count, seed=2):
+    """Random filter combinations in fetch_dorm_room_names' argument order."""
+    generator = random.Random(seed)
+    filters = []
+    for _ in range(count):
+        min_price = generator.choice([None, generator.randint(300, 900)])
+        max_price = generator.choice([None, generator.randint(600, 1500)])
+        city = generator.choice([None, generator.choice(cities).lower()])
+        max_roommates = generator.choice([None, generator.randint(0, 5)])
+        language = generator.choice([None, generator.choice(languages)])
+        available_from = generator.choice([None, f"2025-{generator.randint(1, 12):02d}-15"])
+        filters.append((min_price, max_price, city, generator.randint(0, 2), max_roommates,
+                        generator.randint(0, 2), generator.randint(0, 2), language, available_from))
+    return filters
+
+
+def benchmark_room_index(room_count=20000, query_count=200):
+    """Linear _room_filter scan against RoomIndex for the same searches, checking both agree."""
+    import model.roomModel as roomModel
+    from GlobalDormFunctions import _room_filter
+    from RoomIndex import RoomIndex
+    from RoomQuery import RoomQuery
+
+    rooms = roomModel.Response(**sample_room_payload(room_count)).data
+    filters = sample_filters(query_count)
+    queries = [RoomQuery.from_filters(*room_filter) for room_filter in filters]
+
+    start = time.perf_counter()
+    room_index = RoomIndex(rooms)
+    build_time = time.perf_counter() - start
+
+    linear_results = []
+    start = time.perf_counter()
+    for room_filter in filters:
+        linear_results.append([room.name for room in rooms if _room_filter(room, *room_filter)[0]])
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_results = [room_index.filter(query)[0] for query in queries]
+    index_time = time.perf_counter() - start
+
+    assert linear_results == index_results
+    print(f"\nRoom search, {room_count} rooms, {query_count} searches (index built once in {build_time * 1000:.0f} ms)")
+    print(f"_room_filter scan: {linear_time / query_count * 1000:.3f} ms/search   RoomIndex: {index_time / query_count * 1000:.3f} ms/search")
+
+
+def benchmark_room_columns(room_count=5000, query_count=2000, python_query_count=50):
+    """Batch of saved searches: the pure-Python engine against NumPy RoomColumns, checking they agree."""
+    import model.roomModel as roomModel
+    from GlobalDormFunctions import filter_room_index
+    from RoomIndex import RoomIndex
+    from RoomQuery import RoomQuery
+
+    room_index = RoomIndex(roomModel.Response(**sample_room_payload(room_count)).data)
+    if room_index.columns() is None:
+        print("\nRoomColumns skipped, numpy isn't installed")
+        return
+
+    filters = [RoomQuery.from_filters(*room_filter) for room_filter in sample_filters(query_count)]
+
+    start = time.perf_counter()
+    python_results = [filter_room_index(room_index, room_filter, "python") for room_filter in filters[:python_query_count]]
+    python_time = (time.perf_counter() - start) / python_query_count
+
+    start = time.perf_counter()
+    columnar_results = [filter_room_index(room_index, room_filter, "columnar") for room_filter in filters]
+    columnar_time = (time.perf_counter() - start) / query_count
+
+    index_results = [filter_room_index(room_index, room_filter, "index") for room_filter in filters]
+
+    assert python_results == columnar_results[:python_query_count]
+    assert columnar_results == index_results
+    print(f"\nSaved searches, {room_count} rooms, {query_count} filter combinations")
+    print(f"python: {python_time * 1000:.3f} ms/search   columnar: {columnar_time * 1000:.3f} ms/search   "
+          f"batch of {query_count}: {columnar_time * query_count:.2f} s instead of {python_time * query_count:.1f} s")
+
+
+def benchmark_repeated_search(room_count=20000, repeat=1000):
+    """The same RoomQuery searched again and again over an unchanged room list."""
+    import GlobalDormFunctions
+    from PersistentCache import PersistentCache
+    from RoomQuery import RoomQuery
+
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/database/viewAllDormRooms": sample_room_payload(room_count)})
+    database = f"{base_url}/GlobalDorm/webresources/database"
+    query = RoomQuery.from_filters(None, 900, "leeds", 2, 3, 1, 2, "English", None)
+
+    try:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")  # don't touch the real cache file
+        first = time_calls(lambda: GlobalDormFunctions.search_dorm_rooms(database, query), 1)
+        offline = time_calls(lambda: GlobalDormFunctions.search_dorm_rooms(database, query, offline=True), repeat)
+    finally:
+        server.shutdown()
+
+    print(f"\nRepeated search, {room_count} rooms")
+    print(f"first search (download, parse, index, filter): {first[0]:.0f} ms   repeat: {statistics.mean(offline) * 1000:.1f} \u00b5s")
+
+
+def sample_crime_payload(count, seed=3):
+    """A police API crime list with count made-up records."""
+    generator = random.Random(seed)
+    categories = ["anti-social-behaviour", "burglary", "shoplifting", "vehicle-crime", "violent-crime", "other-theft"]
+    return [{"category": generator.choice(categories), "id": crime_id, "month": "2024-10", "context": None,
+             "location": {"latitude": f"52.95{generator.randint(0, 9999):04d}", "longitude": f"-1.15{generator.randint(0, 9999):04d}",
+                          "street": {"id": generator.randint(1, 500), "name": f"On or near Street {generator.randint(1, 500)}"}}}
+            for crime_id in range(count)]
+
+
+def peak_memory(function):
+    """Runs function once and returns (seconds, peak MB allocated while it ran)."""
+    import tracemalloc
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def benchmark_streaming_parse(crime_count=20000, room_count=20000):
+    """Peak memory parsing big crime and room bodies: the whole-body path against StreamingJson."""
+    import model.crimeDataModel as crimeDataModel
+    import model.roomModel as roomModel
+    from StreamingJson import iter_array, iter_chunks
+
+    crime_body = json.dumps(sample_crime_payload(crime_count)).encode("utf-8")
+    room_body = json.dumps(sample_room_payload(room_count)).encode("utf-8")
+
+    def crime_whole():  # getData + list of models, as httpJsonCrimeData used to
+        data = json.loads(crime_body)
+        json.dumps(data, indent=4)
+        categories = {}
+        for crime in [crimeDataModel.CrimeRecord(**crime) for crime in data]:
+            categories[crime.category] = categories.get(crime.category, 0) + 1
+
+    def crime_streamed():
+        categories = {}
+        for crime in iter_array(iter_chunks(crime_body)):
+            category = crimeDataModel.CrimeRecord(**crime).category
+            categories[category] = categories.get(category, 0) + 1
+
+    def rooms_whole():
+        return roomModel.Response(**json.loads(room_body)).data
+
+    def rooms_streamed():
+        return [roomModel.DormRoom(**room) for room in iter_array(iter_chunks(room_body), key="data")]
+
+    print(f"\nStreaming parse, {crime_count} crimes ({len(crime_body) / 1024 / 1024:.1f} MB), "
+          f"{room_count} rooms ({len(room_body) / 1024 / 1024:.1f} MB)")
+    for title, whole, streamed in (("crime", crime_whole, crime_streamed), ("rooms", rooms_whole, rooms_streamed)):
+        whole_time, whole_peak = peak_memory(whole)
+        streamed_time, streamed_peak = peak_memory(streamed)
+        print(f"{title}: whole body {whole_peak:6.1f} MB peak, {whole_time:.2f} s   "
+              f"streamed {streamed_peak:6.1f} MB peak, {streamed_time:.2f} s")
+
+
+def benchmark_lazy_response(crime_count=20000, repeat=5):
+    """getData's old parse-and-pretty-print against ApiResponse, which parses on demand and never pretty-prints."""
+    from GlobalDormTransport import ApiResponse
+
+    body = json.dumps(sample_crime_payload(crime_count)).encode("utf-8")
+
+    def eager():  # what getData did for every weather, crime and route call
+        data = json.loads(body)
+        if not data:
+            return None
+        return json.dumps(data, indent=4), data
+
+    def lazy():
+        result = ApiResponse(body)
+        if result.is_empty:
+            return None
+        return result.data
+
+    eager_time, lazy_time = min(time_calls(eager, repeat)), min(time_calls(lazy, repeat))  # timed without tracemalloc
+    eager_peak, lazy_peak = peak_memory(eager)[1], peak_memory(lazy)[1]
+    check_time = min(time_calls(lambda: ApiResponse(body).is_empty, 1000))
+
+    print(f"\nLazy responses, {crime_count} crimes ({len(body) / 1024 / 1024:.1f} MB)")
+    print(f"parse + indent=4: {eager_time:.0f} ms, {eager_peak:.1f} MB peak   "
+          f"ApiResponse.data: {lazy_time:.0f} ms, {lazy_peak:.1f} MB peak   empty check: {check_time * 1000:.1f} \u00b5s")
+
+
+def benchmark_compact_records(crime_count=20000, room_count=20000, repeat=3):
+    """Pydantic models against the slot-based rows: parse time per 1000 records and memory kept per record."""
+    import tracemalloc
+    from dataclasses import asdict
+    import model.crimeDataModel as crimeDataModel
+    import model.roomModel as roomModel
+    from pydantic import ValidationError
+
+    crimes = json.loads(json.dumps(sample_crime_payload(crime_count)))
+    rooms = sample_room_payload(room_count)["data"]
+
+    def kept_per_record(function, count):
+        tracemalloc.start()
+        records = function()
+        kept = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del records
+        return kept / count
+
+    print(f"\nCompact records, {crime_count} crimes, {room_count} rooms")
+    for title, records, model, validator in (("crime", crimes, crimeDataModel.CrimeRecord, crimeDataModel.crime_records),
+                                             ("rooms", rooms, roomModel.DormRoom, roomModel.dorm_rooms)):
+        models = [model(**record) for record in records]
+        rows = validator.validate(records)
+        assert [asdict(row) for row in rows] == [original.model_dump() for original in models]
+
+        per_record_time = min(time_calls(lambda: [model(**record) for record in records], repeat)) / len(records) * 1000
+        bulk_time = min(time_calls(lambda: validator.validate(records), repeat)) / len(records) * 1000
+        model_bytes = kept_per_record(lambda: [model(**record) for record in records], len(records))
+        row_bytes = kept_per_record(lambda: validator.validate(records), len(records))
+        print(f"{title}: pydantic {per_record_time:.2f} ms/1000, {model_bytes:.0f} bytes each   "
+              f"rows {bulk_time:.2f} ms/1000, {row_bytes:.0f} bytes each")
+
+    broken = crimes[:50] + [dict(crimes[0], id="not a number")]
+    errors = []
+    for validate in (lambda: [crimeDataModel.CrimeRecord(**crime) for crime in broken], lambda: crimeDataModel.crime_records.validate(broken)):
+        try:
+            validate()
+        except ValidationError as e:
+            errors.append(str(e))
+    assert len(errors) == 2 and errors[0] == errors[1], "rows must raise the model's own error"
+
+
+def benchmark_json_codec(room_count=20000, crime_count=20000, repeat=3):
+    """response.json() + pydantic models against JsonCodec.decode into rows, for every installed backend."""
+    from typing import List
+    import JsonCodec
+    import model.crimeDataModel as crimeDataModel
+    import model.roomModel as roomModel
+
+    room_body = json.dumps(sample_room_payload(room_count)).encode("utf-8")
+    crime_body = json.dumps(sample_crime_payload(crime_count)).encode("utf-8")
+    payloads = (("rooms", room_body, lambda: roomModel.Response(**json.loads(room_body)), roomModel.ResponseRow),
+                ("crime", crime_body, lambda: [crimeDataModel.CrimeRecord(**crime) for crime in json.loads(crime_body)],
+                 List[crimeDataModel.CrimeRecordRow]))
+    backends = [name for name in ("json", "orjson", "msgspec") if JsonCodec.installed[name]]
+    original = JsonCodec.backend
+
+    print(f"\nJSON decoding, {room_count} rooms ({len(room_body) / 1024 / 1024:.1f} MB), "
+          f"{crime_count} crimes ({len(crime_body) / 1024 / 1024:.1f} MB)")
+    try:
+        for title, body, models, target in payloads:
+            timings = [f"stdlib + models {min(time_calls(models, repeat)):.0f} ms"]
+            for name in backends:
+                JsonCodec.set_backend(name)
+                timings.append(f"{name} {min(time_calls(lambda: JsonCodec.decode(body, target), repeat)):.0f} ms")
+            print(f"{title}: " + "   ".join(timings))
+    finally:
+        JsonCodec.set_backend(original)
+
+
+def benchmark_crime_histograms(postcode_count=40, month_count=3, crime_count=2000):
+    """A crime comparison report across many postcodes and months: raw downloads against cached CrimeHistograms."""
+    import GlobalDormFunctions
+    from PersistentCache import PersistentCache
+    from ResponseCache import crime_cache
+
+    payload = sample_crime_payload(crime_count)
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/globaldorm/crime": payload})
+    url = f"{base_url}/GlobalDorm/webresources/globaldorm/crime?crime=all-crime&postcode="
+    postcodes = [f"NG{number} 1AA" for number in range(1, postcode_count + 1)]
+    months = [f"2024-{month:02d}" for month in range(1, month_count + 1)]
+    saved_cache = GlobalDormFunctions.persistent_cache
+
+    try:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")  # don't touch the real cache file
+        crime_cache.clear()
+        first = time_calls(lambda: GlobalDormFunctions.merged_crime_histogram(url, postcodes, months), 1)
+        repeats = time_calls(lambda: GlobalDormFunctions.merged_crime_histogram(url, postcodes, months), 20)
+        crime_cache.clear()  # a restart: histograms come back from SQLite, still no downloads
+        restart = time_calls(lambda: GlobalDormFunctions.merged_crime_histogram(url, postcodes, months), 1)
+        report_histogram = GlobalDormFunctions.merged_crime_histogram(url, postcodes, months)
+    finally:
+        GlobalDormFunctions.persistent_cache = saved_cache
+        server.shutdown()
+        crime_cache.clear()
+
+    histogram = GlobalDormFunctions.CrimeHistogram.from_records(
+        GlobalDormFunctions.crimeDataModel.crime_records.validate(payload))
+    print(f"\nCrime report, {postcode_count} postcodes x {month_count} months, {crime_count} crimes each "
+          f"({report_histogram.total} in total)")
+    print(f"downloads: {first[0]:.0f} ms   cached histograms: {statistics.mean(repeats):.2f} ms   after restart: {restart[0]:.0f} ms   "
+          f"per postcode and month: {len(json.dumps(histogram.to_json()))} bytes instead of {len(json.dumps(payload))}")
+
+
+def benchmark_crime_rings(crime_count=20000, repeat=20):
+    """Distance rings around a postcode: a haversine per record in Python against Geospatial's vectorised pass."""
+    import Geospatial
+    import model.crimeDataModel as crimeDataModel
+
+    records = crimeDataModel.crime_records.validate(sample_crime_payload(crime_count))
+    origin = (52.9536, -1.1505)
+    radii = (0.1, 0.25, 0.5)
+
+    def per_record():  # parse the strings and bucket one record at a time, for every click
+        counts = [0] * (len(radii) + 1)
+        for record in records:
+            distance = Geospatial.haversine_mile(*origin, float(record.location.latitude), float(record.location.longitude))
+            counts[next((ring for ring, radius in enumerate(radii) if distance <= radius), len(radii))] += 1
+        return counts
+
+    build = time_calls(lambda: Geospatial.CrimePoints.from_records(records), 1)
+    points = Geospatial.CrimePoints.from_records(records)
+    rings = points.rings(*origin, radii)
+    assert rings.counts + [rings.outside] == per_record()
+
+    python_time = min(time_calls(per_record, 3))
+    ring_time = min(time_calls(lambda: points.rings(*origin, radii), repeat))
+    print(f"\nCrime rings, {crime_count} crimes, rings {radii} miles (points parsed once in {build[0]:.0f} ms)")
+    print(f"per record: {python_time:.1f} ms   vectorised: {ring_time:.2f} ms   counts {rings.counts}, {rings.outside} further out")
+
+
+def sample_route_payload():
+    """An OSRM route response as the server relays it."""
+    return {"code": "Ok", "routes": [{"weight_name": "routability", "weight": 900.0, "duration": 840.0, "distance": 5200.0,
+                                      "legs": [{"steps": [], "summary": "", "weight": 900.0, "duration": 840.0, "distance": 5200.0}]}],
+            "waypoints": [{"hint": "", "distance": 1.0, "name": "Campus", "location": [-1.19, 52.94]},
+                          {"hint": "", "distance": 1.0, "name": "", "location": [-1.15, 52.95]}]}
+
+
+def benchmark_commute_table(room_count=50, upstream_delay=0.1):
+    """Commutes from one postcode to a shortlist of rooms: one route at a time against GlobalDormAsync.commute_table."""
+    import GlobalDormAsync
+    import GlobalDormFunctions
+    from PersistentCache import PersistentCache
+    from ResponseCache import route_cache
+
+    rooms = sample_room_payload(room_count)
+    for position, room in enumerate(rooms["data"]):
+        room["location"]["postcode"] = f"NG{position % 40 + 1} 1AB"  # some rooms share a postcode
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/globaldorm/route": sample_route_payload(),
+                                              "/GlobalDorm/webresources/database/viewAllDormRooms": rooms}, delay=upstream_delay)
+    url = f"{base_url}/GlobalDorm/webresources/globaldorm/route?mode=driving&"
+    database = f"{base_url}/GlobalDorm/webresources/database"
+    names = [room["name"] for room in rooms["data"]]
+    saved_cache = GlobalDormFunctions.persistent_cache
+
+    try:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")  # don't touch the real cache file
+        GlobalDormFunctions.fetch_room_index(database)
+        postcodes = GlobalDormFunctions.room_postcodes(database, names)
+
+        route_cache.clear()
+        one_at_a_time = time_calls(lambda: [GlobalDormFunctions.httpJsonDistanceData(url, "NG7 2RD", postcode)
+                                            for postcode in postcodes.values()], 1)
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")
+        GlobalDormFunctions.fetch_room_index(database)
+        route_cache.clear()
+        table = time_calls(lambda: GlobalDormAsync.commute_table(url, database, "NG7 2RD", names), 1)
+        cached = time_calls(lambda: GlobalDormAsync.commute_table(url, database, "NG7 2RD", names), 5)
+        rows = GlobalDormAsync.commute_table(url, database, "NG7 2RD", names)
+    finally:
+        GlobalDormFunctions.persistent_cache = saved_cache
+        server.shutdown()
+        route_cache.clear()
+
+    assert len(rows) == room_count and all(row.route for row in rows)
+    print(f"\nCommute table, {room_count} rooms ({len(set(postcodes.values()))} postcodes), {upstream_delay * 1000:.0f} ms per route")
+    print(f"one at a time: {one_at_a_time[0] / 1000:.2f} s   commute_table: {table[0] / 1000:.2f} s   cached: {statistics.mean(cached):.1f} ms")
+
+
+def benchmark_room_prefetch(room_count=20, depth=5, picks=(0, 1, 0, 3, 7, 2), upstream_delay=0.2, think_time=0.5):
+    """Time to show a picked room's details with and without prefetching the top of the search results."""
+    import GlobalDormFunctions
+    from PersistentCache import PersistentCache
+    from ResponseCache import TTLCache
+    from RoomPrefetcher import RoomPrefetcher
+
+    room = sample_room_payload(1)["data"][0]
+    room["current_weather"] = {"weather": "cloudy", "temp_min": 3, "temp_max": 9, "date": "20241130"}
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/database/fetchDormRoomCombinedInformation":
+                                              {"status": "success", "data": room}}, delay=upstream_delay)
+    database = f"{base_url}/GlobalDorm/webresources/database"
+    names = [f"Room {number}" for number in range(room_count)]
+
+    def pick_rooms(prefetcher):
+        """Waits for the user to look at the results, then picks rooms, returning ms until each is shown."""
+        prefetcher.prefetch(database, names)
+        time.sleep(think_time)
+        timings = []
+        for pick in picks:
+            start = time.perf_counter()
+            found = prefetcher.lookup(names[pick])
+            if found is None:
+                prefetcher.fetch_room(database, names[pick])
+            elif not isinstance(found, tuple):
+                found.result()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    saved_cache = GlobalDormFunctions.persistent_cache
+    try:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")  # don't touch the real cache file
+        without = pick_rooms(RoomPrefetcher(depth=0, cache=TTLCache(None)))
+        prefetcher = RoomPrefetcher(depth=depth, cache=TTLCache(None))
+        with_prefetch = pick_rooms(prefetcher)
+    finally:
+        GlobalDormFunctions.persistent_cache = saved_cache
+        server.shutdown()
+
+    print(f"\nRoom details prefetch, top {depth} of {room_count} results, {upstream_delay * 1000:.0f} ms per room, picks {list(picks)}")
+    print(f"no prefetch: mean {statistics.mean(without):.1f} ms   prefetch: mean {statistics.mean(with_prefetch):.1f} ms   "
+          f"median {statistics.median(with_prefetch):.3f} ms")
+    print(prefetcher.stats())
+
+
+def benchmark_single_flight(thread_count=8, task_count=8, upstream_delay=0.2):
+    """
+    A scripted load where GUI threads and asyncio tasks ask for the same postcodes at the same time,
+    counting the requests that reach the server with and without request coalescing.
+    """
+    import asyncio
+    import GlobalDormAsync
+    import GlobalDormFunctions
+    import GlobalVariables
+    from PersistentCache import PersistentCache
+    from ResponseCache import weather_cache, crime_cache, crime_points_cache, route_cache
+    from SingleFlight import lookups
+
+    weather = [{"date": "20241130", "weather": "cloudy", "temp_min": 3, "temp_max": 9},
+               {"date": "20241201", "weather": "rain", "temp_min": 4, "temp_max": 8}]
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/globaldorm/weather": weather,
+                                              "/GlobalDorm/webresources/globaldorm/crime": sample_crime_payload(500),
+                                              "/GlobalDorm/webresources/globaldorm/route": sample_route_payload()}, delay=upstream_delay)
+    weather_url = f"{base_url}/GlobalDorm/webresources/globaldorm/weather?postcode="
+    crime_url = f"{base_url}/GlobalDorm/webresources/globaldorm/crime?crime=all-crime&postcode="
+    route_url = f"{base_url}/GlobalDorm/webresources/globaldorm/route?mode=driving&"
+    postcodes = ["NG7 2RD", "ng72rd", "NG1 5FS", "NG15FS"]  # two postcodes, spelt two ways each
+
+    def gui_thread():
+        for postcode in postcodes:
+            GlobalDormFunctions.httpJsonWeatherData(weather_url, postcode)
+            GlobalDormFunctions.httpJsonCrimeData(crime_url, postcode)
+            GlobalDormFunctions.httpJsonDistanceData(route_url, "NG7 2RD", postcode)
+
+    async def script():
+        await asyncio.gather(*(GlobalDormAsync.weather_for_postcodes(weather_url, postcodes) for _ in range(task_count)),
+                             *(GlobalDormAsync.crime_for_postcodes(crime_url, postcodes) for _ in range(task_count)),
+                             *(GlobalDormAsync.routes_from_postcode(route_url, "NG7 2RD", postcodes) for _ in range(task_count)))
+
+    def run_load():
+        for cache in (weather_cache, crime_cache, crime_points_cache, route_cache):
+            cache.clear()
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")
+        StandInHandler.hits.clear()
+        threads = [threading.Thread(target=gui_thread) for _ in range(thread_count)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        asyncio.run(script())
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start, {path.rsplit("/", 1)[-1]: count for path, count in sorted(StandInHandler.hits.items())}
+
+    saved_cache = GlobalDormFunctions.persistent_cache
+    try:
+        GlobalVariables.coalesce_requests = False
+        without_time, without = run_load()
+        GlobalVariables.coalesce_requests = True
+        with_time, with_flights = run_load()
+    finally:
+        GlobalVariables.coalesce_requests = True
+        GlobalDormFunctions.persistent_cache = saved_cache
+        server.shutdown()
+        for cache in (weather_cache, crime_cache, crime_points_cache, route_cache):
+            cache.clear()
+
+    print(f"\nSingle-flight, {thread_count} threads + {task_count} tasks per lookup, 2 postcodes, {upstream_delay * 1000:.0f} ms upstream")
+    print(f"without coalescing: {without} in {without_time:.2f} s")
+    print(f"with coalescing:    {with_flights} in {with_time:.2f} s   {lookups.stats()}")
+
+
+def benchmark_outage(click_count=20, hang=2.0, read_timeout=0.3):
+    """
+    Weather clicks while the weather service hangs: every click waiting out its timeout against the
+    retry and circuit breaker policy, which fails fast once the breaker opens and shows the saved weather.
+    """
+    import GlobalDormFunctions
+    import GlobalVariables
+    import Resilience
+    from PersistentCache import PersistentCache
+    from ResponseCache import weather_cache
+
+    weather = [{"date": "20241130", "weather": "cloudy", "temp_min": 3, "temp_max": 9},
+               {"date": "20241201", "weather": "rain", "temp_min": 4, "temp_max": 8}]
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/globaldorm/weather": weather})
+    url = f"{base_url}/GlobalDorm/webresources/globaldorm/weather?postcode="
+    postcodes = [f"NG{number} 1AA" for number in range(1, click_count + 1)]
+    timeout = (GlobalVariables.default_timeout[0], read_timeout)
+    settings = dict(GlobalVariables.resilience["weather"], timeout=timeout)
+    policies = {"timeouts only": Resilience.ResiliencePolicy("weather", attempts=1, base_delay=0, max_delay=0,
+                                                             failure_threshold=click_count * 10, reset_timeout=0, timeout=timeout),
+                "retry and breaker": Resilience.ResiliencePolicy("weather", **settings)}
+    saved_cache = GlobalDormFunctions.persistent_cache
+    saved_policy = Resilience.policies["weather"]
+    results = {}
+
+    try:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")
+        for postcode in postcodes:  # the weather seen earlier, saved on disk
+            GlobalDormFunctions.httpJsonWeatherData(url, postcode)
+
+        StandInHandler.delay = hang  # the weather API stops answering
+        for name, policy in policies.items():
+            Resilience.policies["weather"] = policy
+            weather_cache.clear()  # the in-memory copies have expired
+            StandInHandler.hits.clear()
+            messages = []
+            timings = time_calls(lambda: messages.append(GlobalDormFunctions.httpJsonWeatherData(url, postcodes[len(messages)])), click_count)
+            saved = sum("Saved" in message for message in messages)
+            results[name] = (timings, saved, sum(StandInHandler.hits.values()), policy.breaker.state)
+    finally:
+        Resilience.policies["weather"] = saved_policy
+        GlobalDormFunctions.persistent_cache = saved_cache
+        StandInHandler.delay = 0.0
+        server.shutdown()
+        weather_cache.clear()
+
+    print(f"\nWeather outage, {click_count} clicks, service hangs for {hang:.0f} s, {read_timeout * 1000:.0f} ms read timeout")
+    for name, (timings, saved, requests_sent, state) in results.items():
+        print(f"{name:<18} total {sum(timings) / 1000:5.2f} s   median click {statistics.median(timings):7.1f} ms   "
+              f"slowest {max(timings):6.0f} ms   saved weather shown {saved}/{click_count}   requests sent {requests_sent}   breaker {state}")
+
+
+def benchmark_server_selection(delays=None, requests_per_server=20):
+    """
+    Request latency on the fixed default server against the server ServerProber picks, then how long
+    the client takes to fail over when the server it picked goes down.
+    """
+    import GlobalVariables
+    from GlobalDormTransport import transport
+    from ServerProber import ServerProber
+
+    delays = delays or {"netbeans": 0.15, "docker": 0.05, "azure": 0.01}  # the default is the slowest here
+    weather = [{"date": "20241130", "weather": "cloudy", "temp_min": 3, "temp_max": 9}]
+    StandInHandler.routes = {"/GlobalDorm/webresources/globaldorm/weather": json.dumps(weather).encode("utf-8")}
+    stand_ins = {}
+    for name, delay in delays.items():
+        handler = type(f"{name.capitalize()}Handler", (StandInHandler,), {"delay": delay})
+        server = StandInServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        stand_ins[name] = server
+
+    saved_servers, saved_current = dict(GlobalVariables.servers), GlobalVariables.current_server
+    GlobalVariables.servers.update({name: f"127.0.0.1:{server.server_address[1]}" for name, server in stand_ins.items()})
+    GlobalVariables.change_server("netbeans")
+    prober = ServerProber(servers=GlobalVariables.servers, interval=60)
+
+    def request_time():
+        return time_calls(lambda: transport.get(GlobalVariables.weather_url() + "NG72RD"), requests_per_server)
+
+    try:
+        fixed = request_time()
+        chosen = prober.probe()
+        probed = request_time()
+
+        transport.on_failure = prober.probe_now
+        prober.start()
+        stand_ins[chosen].RequestHandlerClass.down = True  # the chosen server goes down
+        start = time.perf_counter()
+        try:
+            transport.get(GlobalVariables.weather_url() + "NG72RD")
+        except Exception:
+            pass  # the click that finds out
+        while GlobalVariables.global_fetch_server() == chosen and time.perf_counter() - start < 10:
+            time.sleep(0.005)
+        failover = time.perf_counter() - start
+        failed_over_to = prober.label()
+        after_failover = request_time()
+    finally:
+        prober.stop()
+        transport.on_failure = None
+        GlobalVariables.servers.clear()
+        GlobalVariables.servers.update(saved_servers)
+        GlobalVariables.current_server = saved_current
+        transport.rebuild()
+        for server in stand_ins.values():
+            server.shutdown()
+
+    print(f"\nServer selection, upstream delays {delays}")
+    print(f"fixed default (netbeans): {statistics.mean(fixed):6.1f} ms   probed ({chosen}): {statistics.mean(probed):6.1f} ms")
+    print(f"{chosen} goes down: failed over to {failed_over_to} in {failover * 1000:.0f} ms (including the failed request), "
+          f"then {statistics.mean(after_failover):.1f} ms per request   switches: {prober.switches}")
+
+
+def benchmark_hedged_reads(request_count=400, fast=0.02, slow=0.5, slow_share=0.02, seed=4):
+    """
+    Weather reads against three servers that are usually fast but now and then stall: the current
+    server alone against reads balanced over all three and hedged past the 95th percentile.
+    """
+    import GlobalDormTransport
+    import GlobalVariables
+    from LoadBalancer import ReadBalancer
+    from ServerProber import ServerProber
+
+    generator = random.Random(seed)
+    weather = [{"date": "20241130", "weather": "cloudy", "temp_min": 3, "temp_max": 9}]
+    StandInHandler.routes = {"/GlobalDorm/webresources/globaldorm/weather": json.dumps(weather).encode("utf-8")}
+    handler = type("StallingHandler", (StandInHandler,), {"delay": property(lambda self: slow if generator.random() < slow_share else fast)})
+    stand_ins = {name: StandInServer(("127.0.0.1", 0), handler) for name in ("netbeans", "docker", "azure")}
+    for server in stand_ins.values():
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    saved_servers, saved_current = dict(GlobalVariables.servers), GlobalVariables.current_server
+    saved_balancer = GlobalDormTransport.read_balancer
+    GlobalVariables.servers.update({name: f"127.0.0.1:{server.server_address[1]}" for name, server in stand_ins.items()})
+    GlobalVariables.change_server("netbeans")
+    prober = ServerProber(servers=GlobalVariables.servers)
+    balancer = ReadBalancer(prober)
+    GlobalDormTransport.read_balancer = balancer
+
+    def percentiles():
+        timings = sorted(time_calls(lambda: GlobalDormTransport.transport.get(GlobalVariables.weather_url() + "NG72RD"), request_count))
+        return [timings[int(len(timings) * share)] for share in (0.5, 0.95, 0.99)] + [timings[-1]]
+
+    try:
+        GlobalVariables.load_balancing = False
+        single = percentiles()
+        GlobalVariables.load_balancing = True
+        for _ in range(GlobalVariables.probe_window):
+            prober.probe()
+        balanced = percentiles()
+    finally:
+        GlobalVariables.load_balancing = True
+        GlobalDormTransport.read_balancer = saved_balancer
+        GlobalVariables.servers.clear()
+        GlobalVariables.servers.update(saved_servers)
+        GlobalVariables.current_server = saved_current
+        GlobalDormTransport.transport.rebuild()
+        for server in stand_ins.values():
+            server.shutdown()
+
+    print(f"\nHedged reads, {request_count} requests, {slow_share:.0%} of responses stall for {slow * 1000:.0f} ms")
+    for name, (p50, p95, p99, worst) in (("current server", single), ("balanced + hedged", balanced)):
+        print(f"{name:<18} p50 {p50:6.1f} ms   p95 {p95:6.1f} ms   p99 {p99:6.1f} ms   max {worst:6.1f} ms")
+    print(balancer.stats())
+
+
+def benchmark_cold_start(repeat=5):
+    """
+    Time to import GlobalDormApp, which is everything the home screen needs, in a fresh interpreter,
+    against importing every module it used to load up front. Import times swing with the machine's load,
+    so this only reports them against GlobalVariables.startup_budget; tests/test_cold_start.py checks
+    that the heavy modules stay unloaded.
+    """
+    import os
+    import subprocess
+    import GlobalVariables
+
+    heavy = ("matplotlib", "tkcalendar", "pika", "pydantic")
+    eager = ("GlobalDormApp", "GlobalDormFunctions", "JsonCodec", "RabbitPushNotifications", "SearchAndApplyWindow",
+             "WeatherSafetyCommuteWindow", "tkcalendar", "matplotlib.figure", "matplotlib.backends.backend_tkagg")
+
+    def import_time(modules):
+        script = (f"import sys, time\nstart = time.perf_counter()\n"
+                  f"for module in {modules!r}:\n    __import__(module)\n"
+                  f"print(time.perf_counter() - start)\nprint(*[m for m in {heavy!r} if m in sys.modules])")
+        output = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout.splitlines()
+        return float(output[0]), output[1].split() if len(output) > 1 else []
+
+    eager_times = [import_time(eager)[0] for _ in range(repeat)]
+    lazy_runs = [import_time(("GlobalDormApp",)) for _ in range(repeat)]
+    lazy_time = statistics.median(elapsed for elapsed, _ in lazy_runs)
+    loaded = lazy_runs[0][1]
+
+    print(f"\nCold start, median of {repeat} fresh interpreters")
+    print(f"everything up front {statistics.median(eager_times) * 1000:7.1f} ms")
+    print(f"home screen only    {lazy_time * 1000:7.1f} ms   (budget {GlobalVariables.startup_budget * 1000:.0f} ms"
+          f"{', over' if lazy_time > GlobalVariables.startup_budget else ''})")
+    if loaded:
+        print(f"GlobalDormApp imports {', '.join(loaded)} at start-up")
+
+
+def benchmark_image_assets(repeat=5, size=(450, 720)):
+    """
+    Opening a window's background: decoding the full-size JPEG and resizing it every time, as the windows
+    used to, against ImageAssets on a first start (no thumbnails), a later start (thumbnails on disk)
+    and a later window open (in memory).
+    """
+    import os
+    import tempfile
+    from PIL import Image
+    import GlobalVariables
+    import ImageAssets
+
+    client_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = [os.path.join(client_dir, path) for path in GlobalVariables.background_images.values()]
+
+    def decode_every_time():
+        for path in paths:
+            Image.open(path).resize(size)  # what CTkImage did with the full-size image
+
+    def open_windows():
+        for path in paths:
+            ImageAssets.scaled_image(path, size)
+
+    saved_dir = GlobalVariables.thumbnail_dir
+    with tempfile.TemporaryDirectory() as thumbnail_dir:
+        GlobalVariables.thumbnail_dir = thumbnail_dir
+        try:
+            first_start, later_start = [], []
+            for _ in range(repeat):
+                for thumbnail in os.listdir(thumbnail_dir):
+                    os.remove(os.path.join(thumbnail_dir, thumbnail))
+                ImageAssets.image_cache.clear()
+                first_start.append(time_calls(open_windows, 1)[0])
+                ImageAssets.image_cache.clear()
+                later_start.append(time_calls(open_windows, 1)[0])
+            in_memory = time_calls(open_windows, repeat)
+        finally:
+            GlobalVariables.thumbnail_dir = saved_dir
+            ImageAssets.image_cache.clear()
+
+    print(f"\nBackground images, {len(paths)} windows at {size[0]}x{size[1]}")
+    report("decoded every time", time_calls(decode_every_time, repeat))
+    report("first start", first_start)
+    report("thumbnails on disk", later_start)
+    report("in memory", in_memory)
+
+
+def benchmark_window_reuse(visits=5):
+    """
+    Going back and forth between the main window and the two secondary windows: building each window
+    on every visit and destroying it on "Home", as the app used to, against WindowManager showing the
+    same window again. Needs a display, it is skipped without one.
+    """
+    import os
+    import tempfile
+    import tkinter
+    from types import SimpleNamespace
+    import customtkinter as ctk
+    import GlobalDormFunctions
+    import GlobalVariables
+    from PersistentCache import PersistentCache
+    from SearchAndApplyWindow import SearchAndApplyWindow
+    from WeatherSafetyCommuteWindow import WeatherSafetyCommuteWindow
+    from WindowManager import WindowManager
+
+    try:
+        root = ctk.CTk()
+    except tkinter.TclError as e:
+        print(f"\nWindow reuse skipped, no display: {e}")
+        return
+
+    height = 720
+    parent = SimpleNamespace(window=root, width=int(height / 16 * 10), height=height)
+    windows = {"search": SearchAndApplyWindow, "commute": WeatherSafetyCommuteWindow}
+    saved_cache, saved_dir, saved_cwd = GlobalDormFunctions.persistent_cache, GlobalVariables.thumbnail_dir, os.getcwd()
+
+    def visit(open_window, close_window):
+        """Milliseconds until the window is drawn, then goes back to the main window."""
+        start = time.perf_counter()
+        window = open_window()
+        root.update()
+        elapsed = (time.perf_counter() - start) * 1000
+        close_window(window)
+        root.update()
+        return elapsed
+
+    with tempfile.TemporaryDirectory() as thumbnail_dir:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")
+        GlobalVariables.thumbnail_dir = thumbnail_dir
+        os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # the image paths are relative to Client/
+        try:
+            rebuilt = {name: [visit(lambda: window_class(parent), lambda window: window.destroy()) for _ in range(visits)]
+                       for name, window_class in windows.items()}
+            manager = WindowManager(parent)
+            reused = {name: [visit(lambda: manager.show(name, window_class), lambda window: window.back_button.invoke())
+                             for _ in range(visits)] for name, window_class in windows.items()}
+            toplevels = sum(isinstance(child, tkinter.Toplevel) for child in root.winfo_children())
+        finally:
+            os.chdir(saved_cwd)
+            GlobalDormFunctions.persistent_cache = saved_cache
+            GlobalVariables.thumbnail_dir = saved_dir
+            root.destroy()
+
+    print(f"\nWindow reuse, {visits} visits to each window")
+    for name in windows:
+        report(f"{name}, rebuilt on every visit", rebuilt[name])
+        report(f"{name}, first visit then shown again", reused[name])
+    print(f"{manager.stats()}, toplevels left {toplevels}")
+    assert manager.created == len(windows), "Home destroyed a window, WindowManager had to build it again"
+
+
+def benchmark_crime_chart(room_count=20, seed=5):
+    """
+    Flipping between rooms' crime charts: a new Figure, bars and tight_layout for every room, as the windows
+    used to, against CrimeChart updating one figure in place. Both render with Agg, without a window,
+    so the time is the drawing itself; in the app the new chart's draw also waits until Tk is idle.
+    """
+    from types import SimpleNamespace
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from CrimeChart import CrimeChart
+
+    class OffscreenCanvas(FigureCanvasAgg):
+        def get_tk_widget(self):
+            return SimpleNamespace(place=lambda **place: None)
+
+        def draw_idle(self):
+            self.draw()  # drawn straight away, so it is timed
+
+    class OffscreenChart(CrimeChart):
+        def _build(self):
+            self._build_figure()
+            self.canvas = OffscreenCanvas(self.figure)
+
+    def rebuild(crime_data):
+        figure = Figure(figsize=(4, 4), dpi=100)
+        axes = figure.add_subplot(111)
+        bars = axes.bar(list(crime_data), list(crime_data.values()), width=0.6, zorder=2)
+        for bar in bars:
+            axes.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.1, str(bar.get_height()), ha='center', va='bottom', fontsize=8)
+        axes.set_xticks(range(len(crime_data)))
+        axes.set_xticklabels(list(crime_data), rotation=90, fontsize=10)
+        axes.set_title("Crime Data", fontsize=12, fontweight='bold', pad=5)
+        axes.grid(zorder=1)
+        figure.tight_layout(pad=1)
+        FigureCanvasAgg(figure).draw()
+
+    generator = random.Random(seed)
+    categories = ["anti-social-behaviour", "bicycle-theft", "burglary", "criminal-damage-arson", "drugs", "other-theft",
+                  "public-order", "robbery", "shoplifting", "vehicle-crime", "violent-crime"]
+    rooms = [{category: generator.randint(10, 99) for category in categories} for _ in range(room_count)]
+
+    chart = OffscreenChart(None, figsize=(4, 4), place={}, highlight_max=True, grid=True)
+    chart.show(rooms[0])  # the canvas is built with the window's first chart
+    print(f"\nCrime chart, flipping between {room_count} rooms with the same categories")
+    report("new figure per room", [time_calls(lambda: rebuild(room), 1)[0] for room in rooms])
+    report("updated in place", [time_calls(lambda: chart.show(room), 1)[0] for room in rooms])
+    print(f"layouts {chart.layouts}, full draws {chart.draws}, blits {chart.blits}")
+
+
+def benchmark_cli_batch(postcode_count=40, months=("2024-10", "2024-11"), upstream_delay=0.05):
+    """
+    A nightly crime report through GlobalDormCLI: postcodes read from a file, one request at a time
+    against --concurrency 16, both written as CSV, which has to come out the same.
+    """
+    import csv
+    import os
+    import tempfile
+    import GlobalDormCLI
+    import GlobalDormFunctions
+    import GlobalVariables
+    from ResponseCache import crime_cache, crime_points_cache
+
+    server, base_url = start_stand_in_server({"/GlobalDorm/webresources/globaldorm/crime": sample_crime_payload(500)},
+                                             delay=upstream_delay)
+    saved_server, saved_cache = GlobalVariables.current_server, GlobalDormFunctions.persistent_cache
+    GlobalVariables.current_server = base_url.removeprefix("http://")
+
+    def report_with(concurrency, directory):
+        crime_cache.clear()
+        crime_points_cache.clear()
+        output = os.path.join(directory, f"crime-{concurrency}.csv")
+        arguments = ["--fresh", "--format", "csv", "--concurrency", str(concurrency), "--output", output,
+                     "crime", "--input", os.path.join(directory, "postcodes.txt")]
+        for month in months:
+            arguments += ["--month", month]
+        start = time.perf_counter()
+        exit_code = GlobalDormCLI.main(arguments)
+        elapsed = time.perf_counter() - start
+        with open(output, newline="", encoding="utf-8") as stream:
+            return exit_code, elapsed, list(csv.DictReader(stream))
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "postcodes.txt"), "w", encoding="utf-8") as stream:
+                stream.write("# nightly report\n" + "".join(f"NG{number} {number % 9}AA\n" for number in range(postcode_count)))
+            sequential_code, sequential_time, sequential = report_with(1, directory)
+            concurrent_code, concurrent_time, concurrent = report_with(16, directory)
+    finally:
+        server.shutdown()
+        GlobalVariables.current_server = saved_server
+        GlobalDormFunctions.persistent_cache = saved_cache
+        crime_cache.clear()
+        crime_points_cache.clear()
+
+    assert sequential_code == concurrent_code == 0 and sequential == concurrent
+    print(f"\nCLI crime report, {postcode_count} postcodes x {len(months)} months, {upstream_delay * 1000:.0f} ms upstream")
+    print(f"--concurrency 1: {sequential_time:.2f} s   --concurrency 16: {concurrent_time:.2f} s   ({len(concurrent)} rows)")
+
+
+if __name__ == "__main__":
+    benchmark_transport()
+    benchmark_bulk_weather()
+    benchmark_cached_lookups()
+    benchmark_room_index()
+    benchmark_room_columns()
+    benchmark_repeated_search()
+    benchmark_streaming_parse()
+    benchmark_lazy_response()
+    benchmark_compact_records()
+    benchmark_json_codec()
+    benchmark_crime_histograms()
+    benchmark_crime_rings()
+    benchmark_commute_table()
+    benchmark_room_prefetch()
+    benchmark_single_flight()
+    benchmark_outage()
+    benchmark_server_selection()
+    benchmark_hedged_reads()
+    benchmark_cold_start()
+    benchmark_image_assets()
+    benchmark_window_reuse()
+    benchmark_crime_chart()
+    benchmark_cli_batch()
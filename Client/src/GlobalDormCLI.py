@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import sys
+import time
+import GlobalDormAsync
+import GlobalDormFunctions
+import GlobalVariables
+from GlobalDormTransport import transport
+from PersistentCache import PersistentCache
+from RoomQuery import RoomQuery
+from ServerProber import server_prober
+
+'''
+The client without the GUI, for batch reports and load tests. Each subcommand calls the same
+GlobalDormFunctions the windows use, so results, caching and error messages match the app;
+many inputs, given on the command line or read from a file with --input, are looked up
+concurrently through GlobalDormAsync, one result per input in the order given. Results are written as JSON (default) or CSV.
+Run it from Client/, like the app, so the cache and image paths resolve.
+
+python src/GlobalDormCLI.py weather "NG7 2RD" "NG1 5FS"
+python src/GlobalDormCLI.py search --city Nottingham --max-price 600 --bills-included yes --format csv
+python src/GlobalDormCLI.py crime --input postcodes.txt --month 2024-10 --month 2024-11 --concurrency 16 --output crime.csv
+python src/GlobalDormCLI.py route "NG7 2RD" "NG1 5FS" "NG9 2HA"
+'''
+
+YES_NO_EITHER = {"no": 0, "yes": 1, "either": 2}  # the GUI's dropdown values
+SEARCH_FILTERS = ("min_price", "max_price", "city", "live_in_landlord", "max_roommates",
+                  "bills_included", "shared_bathroom", "language", "available_from")
+
+
+def read_inputs(path):
+    """Lines of an input file ("-" for stdin), skipping blank lines and # comments."""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with stream:
+        return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+
+
+def read_searches(path):
+    """Searches from a CSV file whose header names some of SEARCH_FILTERS, one search per row; empty cells don't filter."""
+    stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    with stream:
+        rows = list(csv.DictReader(stream))
+
+    unknown = {field for row in rows for field in row if field not in SEARCH_FILTERS}
+    if unknown:
+        raise ValueError(f"unknown search filters {', '.join(sorted(unknown))}, expected some of {', '.join(SEARCH_FILTERS)}")
+    return [{field: value.strip() for field, value in row.items() if value and value.strip()} for row in rows]
+
+
+def search_query(filters):
+    """The RoomQuery for a dict of filters (strings, as typed), checked like the window's filters."""
+    def either(field):
+        value = filters.get(field, "either")
+        if value not in YES_NO_EITHER:
+            raise ValueError(f"{field} must be yes, no or either, not {value!r}")
+        return YES_NO_EITHER[value]
+
+    return RoomQuery.from_filters(filters.get("min_price"), filters.get("max_price"), filters.get("city"),
+                                  either("live_in_landlord"), filters.get("max_roommates"), either("bills_included"),
+                                  either("shared_bathroom"), filters.get("language"), filters.get("available_from"))
+
+
+def run_search(args):
+    """One row per search: its filters, the matching rooms and the search's message."""
+    if args.input:
+        searches = read_searches(args.input)
+    else:
+        searches = [{field: str(getattr(args, field)) for field in SEARCH_FILTERS if getattr(args, field) is not None}]
+    queries = [search_query(filters) for filters in searches]
+
+    # one room list download (or saved copy with --offline) for every search
+    results = GlobalDormFunctions.search_dorm_rooms_batch(GlobalVariables.database_url(), queries, offline=args.offline)
+
+    return [{**filters, "count": len(result.rooms), "rooms": result.rooms, "message": result.message,
+             **({"error": result.error} if result.error else {})}
+            for filters, result in zip(searches, results)]
+
+
+def lookup_all(args, function, arguments):
+    """Runs an async GlobalDormAsync lookup once per argument tuple, --concurrency at a time, results in order."""
+    return asyncio.run(GlobalDormAsync.gather_limited(function, arguments, args.concurrency))
+
+
+def failed(message):
+    """
+    Whether a weather or history message reports a failure rather than a result.
+    Those lookups only return text, the others (search, room, crime, route) say explicitly when they failed.
+    """
+    return message.startswith(("Failed", "Error"))
+
+
+def run_room(args, room_names):
+    """Combined information (details and weather) per room."""
+    database = GlobalVariables.database_url()
+    results = lookup_all(args, GlobalDormAsync.fetch_dorm_room_combined_information, [(database, room) for room in room_names])
+    rows = []
+    for room_name, (postcode, details) in zip(room_names, results):
+        row = {"room": room_name, "postcode": postcode, "details": details}
+        if not postcode:
+            row["error"] = details
+        rows.append(row)
+    return rows
+
+
+def run_weather(args, postcodes):
+    url = GlobalVariables.weather_url()
+    results = lookup_all(args, GlobalDormAsync.httpJsonWeatherData, [(url, postcode) for postcode in postcodes])
+    rows = []
+    for postcode, message in zip(postcodes, results):
+        rows.append({"postcode": postcode, "weather": message, **({"error": message} if failed(message) else {})})
+    return rows
+
+
+def run_crime(args, postcodes):
+    """One row per postcode and month: the total, risk band, busiest street and a column per crime category."""
+    url = GlobalVariables.crime_url()
+    pairs = [(postcode, month) for postcode in postcodes for month in args.month or [None]]
+    results = lookup_all(args, GlobalDormAsync.fetch_crime_histogram, [(url, postcode, month) for postcode, month in pairs])
+    rows = []
+    for (postcode, month), histogram in zip(pairs, results):
+        row = {"postcode": postcode, "month": month or "latest"}
+        if histogram is None:
+            row["error"] = "Failed to retrieve crime data."
+        else:
+            top_street = histogram.top_streets(1)
+            row.update(total=histogram.total, risk=histogram.risk_message(),
+                       top_street=top_street[0][0] if top_street else "", **histogram.category_counts())
+        rows.append(row)
+    return rows
+
+
+def run_route(args, pairs):
+    """One row per (source, target) pair: duration, distance and the route message."""
+    url = GlobalVariables.distance_url()
+    results = lookup_all(args, GlobalDormAsync.fetch_route, [(url, source, target) for source, target in pairs])
+    rows = []
+    for (source, target), (route, message) in zip(pairs, results):
+        row = {"source": source, "target": target}
+        if route is None:
+            row["error"] = message
+        else:
+            row.update(mode=route.mode, duration_s=route.duration, distance_m=route.distance, message=message)
+        rows.append(row)
+    return rows
+
+
+def run_history(args, room_names):
+    database = GlobalVariables.database_url()
+    results = lookup_all(args, GlobalDormAsync.view_room_application_history, [(database, room) for room in room_names])
+    rows = []
+    for room_name, history in zip(room_names, results):
+        rows.append({"room": room_name, "history": history, **({"error": history} if failed(history) else {})})
+    return rows
+
+
+def route_pairs(args):
+    """(source, target) pairs: the first postcode to each of the others, and "source,target" lines from --input."""
+    pairs = [(args.postcodes[0], target) for target in args.postcodes[1:]] if args.postcodes else []
+    for line in read_inputs(args.input) if args.input else []:
+        source, separator, target = line.partition(",")
+        if not separator:
+            raise ValueError(f"route inputs are source,target pairs, not {line!r}")
+        pairs.append((source.strip(), target.strip()))
+    return pairs
+
+
+def write_rows(rows, output_format, stream):
+    """Writes the rows as a JSON array, or as CSV with a column for every key any row has (lists joined with "; ")."""
+    if output_format == "json":
+        json.dump(rows, stream, indent=2, ensure_ascii=False, default=str)
+        stream.write("\n")
+        return
+
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    writer = csv.DictWriter(stream, fieldnames=fields)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({field: "; ".join(map(str, value)) if isinstance(value, list) else value for field, value in row.items()})
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="GlobalDormCLI", description="Global Dorm without the GUI, for batch reports and load tests.")
+    parser.add_argument("--server", choices=[*GlobalVariables.servers, "auto"],
+                        help="server to use, auto probes them all and picks the fastest (default: the app's default server)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json", help="output format (default: json)")
+    parser.add_argument("--output", default="-", help="file to write the results to (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=GlobalVariables.async_concurrency,
+                        help=f"lookups in flight at once (default: {GlobalVariables.async_concurrency})")
+    parser.add_argument("--fresh", action="store_true",
+                        help="ignore the results saved on disk and don't save new ones, e.g. for load tests")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="search rooms with the Search and Apply filters")
+    search.add_argument("--min-price", type=float)
+    search.add_argument("--max-price", type=float)
+    search.add_argument("--city")
+    search.add_argument("--live-in-landlord", choices=YES_NO_EITHER)
+    search.add_argument("--max-roommates", type=int)
+    search.add_argument("--bills-included", choices=YES_NO_EITHER)
+    search.add_argument("--shared-bathroom", choices=YES_NO_EITHER)
+    search.add_argument("--language")
+    search.add_argument("--available-from", metavar="YYYY-MM-DD", help="rooms available on or before this date")
+    search.add_argument("--offline", action="store_true", help="search the room list saved by the last run, without the network")
+    search.add_argument("--input", help=f"CSV file of searches, one per row, with columns named {', '.join(SEARCH_FILTERS)}")
+
+    for name, subject, help_text in (("room", "rooms", "combined room information, details and weather"),
+                                     ("weather", "postcodes", "weather for postcodes"),
+                                     ("crime", "postcodes", "crime histograms for postcodes"),
+                                     ("history", "rooms", "application history of rooms")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument(subject, nargs="*", help=f"{subject} to look up")
+        command.add_argument("--input", help=f"file of {subject}, one per line (- for stdin)")
+        if name == "crime":
+            command.add_argument("--month", action="append", metavar="YYYY-MM", help="month to fetch, repeatable (default: latest)")
+
+    route = commands.add_parser("route", help="routes from one postcode to others")
+    route.add_argument("postcodes", nargs="*", help="the source postcode, then the targets")
+    route.add_argument("--input", help="file of source,target postcode pairs, one per line (- for stdin)")
+    return parser
+
+
+def main(argv=None):
+    """Runs one subcommand, returning the exit code: 0, 1 if any lookup failed, 2 for bad input."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.server == "auto":
+        with contextlib.redirect_stdout(sys.stderr):
+            server = server_prober.probe()
+        print(f"Using {server}.", file=sys.stderr)
+    elif args.server:
+        GlobalVariables.change_server(args.server)
+    if args.fresh:
+        GlobalDormFunctions.persistent_cache = PersistentCache(":memory:")
+
+    start = time.perf_counter()
+    try:
+        # GlobalDormFunctions prints its diagnostics, keep them out of the JSON or CSV on stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.command == "search":
+                rows = run_search(args)
+            elif args.command == "route":
+                pairs = route_pairs(args)
+                if not pairs:
+                    raise ValueError("no routes given, list a source and targets or use --input")
+                rows = run_route(args, pairs)
+            else:
+                subject = "postcodes" if args.command in ("weather", "crime") else "rooms"
+                items = getattr(args, subject) + (read_inputs(args.input) if args.input else [])
+                if not items:
+                    raise ValueError(f"no {subject} given, list them or use --input")
+                commands = {"room": run_room, "weather": run_weather, "crime": run_crime, "history": run_history}
+                rows = commands[args.command](args, items)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        transport.close()
+
+    if args.output == "-":
+        write_rows(rows, args.format, sys.stdout)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as stream:
+            write_rows(rows, args.format, stream)
+
+    failed = sum("error" in row for row in rows)
+    print(f"{len(rows)} results, {failed} failed, in {time.perf_counter() - start:.2f} s.", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
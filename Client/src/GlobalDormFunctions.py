@@ -1,6 +1,19 @@
-import json
 import datetime
 import requests
+from urllib.parse import urlparse, parse_qs
+from typing import List
+from GlobalDormTransport import transport, ApiResponse
+from ResponseCache import normalise_postcode, weather_cache, crime_cache, route_cache, query_results, crime_points_cache, coordinates_cache
+from PersistentCache import persistent_cache, content_version, is_etag
+from RoomIndex import RoomIndex
+from RoomQuery import RoomQuery
+from CrimeHistogram import CrimeHistogram
+from Geospatial import CrimePoints
+from StreamingJson import CHUNK_SIZE, iter_array, iter_chunks
+from SingleFlight import lookups
+from Resilience import CircuitOpenError
+import GlobalVariables
+import JsonCodec
 from pydantic import ValidationError
 from model.verifyUserResponseModel import VerifyUserResponse
 import model.weatherModel as weatherModel
@@ -12,24 +25,28 @@ import model.routeDistanceModel as routeDistanceModel
 
 
 def getData(url, postcode=""):  # API
-    """Retrieves data from a given URL, optionally with a postcode, and handles API errors."""
+    """
+    Retrieves data from a given URL, optionally with a postcode, and handles API errors.
+    Returns an ApiResponse (parsed only when .data is used), or None if the request failed or the body is empty.
+    """
     try:
-        response = requests.get(url + postcode)
+        response = transport.get(url + postcode)
         response.raise_for_status()
 
-        jsonData = response.json()
+        result = ApiResponse.from_response(response)
 
-        if not jsonData:
+        if result.is_empty:
             print("No data available.")
             return None
 
-        prettyPrintJson = json.dumps(jsonData, indent=4)
-        # print(prettyPrintJson)
+        # print(result.pretty())
 
-        return prettyPrintJson, jsonData
+        return result
 
     except requests.exceptions.Timeout:
         print("Connection timed out: Unable to connect to the server.")
+    except CircuitOpenError as e:
+        print(e)
     except requests.exceptions.ConnectionError:
         print("Connection failed: Server is not running.")
     except requests.exceptions.RequestException as e:
@@ -37,12 +54,48 @@ def getData(url, postcode=""):  # API
         return None
 
 
+def streamData(url, postcode=""):  # API
+    """
+    Like getData, but returns the response with its body still unread, so large arrays can be parsed
+    record by record with StreamingJson.iter_array. Returns None on API errors.
+    """
+    try:
+        response = transport.get(url + postcode, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()  # give the connection back to the pool
+            raise
+        return response
+
+    except requests.exceptions.Timeout:
+        print("Connection timed out: Unable to connect to the server.")
+    except CircuitOpenError as e:
+        print(e)
+    except requests.exceptions.ConnectionError:
+        print("Connection failed: Server is not running.")
+    except requests.exceptions.RequestException as e:
+        print(f"Error: {e}")
+        return None
+
+
+class SavedResult(tuple):
+    """A result read back from the persistent cache because the server couldn't provide it, unpacks like a fresh one."""
+
+
+def _saved_note(entry):
+    """The line shown under a saved copy that stands in for data the server couldn't provide."""
+    minutes = int(entry.age() // 60)
+    age = f"{minutes // 60} hours" if minutes >= 120 else f"{minutes} minutes"
+    return f"(Saved {age} ago, the service is unavailable.)"
+
+
 def httpJson(title, url):
     """Fetches JSON data from a URL and prints it in a readable format, handling connection errors."""
     try:
-        response = requests.get(url)
+        response = transport.get(url)
         response.raise_for_status()
-        prettyPrintJson = json.dumps(response.json(), indent=4)
+        prettyPrintJson = ApiResponse.from_response(response).pretty()
         # print(title + ": " + pretty_print_json)
         print(f"{title}: {prettyPrintJson}")
     except requests.exceptions.Timeout:
@@ -51,99 +104,290 @@ def httpJson(title, url):
         print("Connection failed: Server is not running.")
     except requests.exceptions.RequestException as e:
         print(f"Error: {e}")
+    except ValueError as e:  # not JSON
+        print(f"Error: {e}")
 
 
 # deserialised version
 def httpJsonWeatherData(url, postcode):
-    """Fetches and deserialises weather data, then formats it into a string."""
+    """Fetches and deserialises weather data, then formats it into a string. Repeat postcodes are served from the cache."""
+    cache_key = normalise_postcode(postcode)
+    cached = weather_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # the crime switch and the Safety button, or two windows, can ask for the same postcode at once
+    return lookups.do(("weather", url, cache_key), _download_weather, url, postcode, cache_key)
+
+
+def _download_weather(url, postcode, cache_key):
+    """Fetches and formats the weather for httpJsonWeatherData, unless a call that just finished has cached it."""
+    cached = weather_cache.peek(cache_key)
+    if cached is not None:
+        return cached
+
     result = getData(url, postcode)
 
     if result is None:
+        saved = persistent_cache.get("weather", cache_key)
+        if saved is not None:
+            return f"{saved.value}\n{_saved_note(saved)}"
         return "Failed to retrieve weather data."
 
-    _, jsonData = result
-
     try:
-        weather_entries = [weatherModel.WeatherData(**entry) for entry in jsonData]
+        weather_entries = result.decode(List[weatherModel.WeatherData])
 
         today_weather = weather_entries[0]
         tomorrow_weather = weather_entries[1]
 
-        return (
+        weather_message = (
             f"Today's Weather: {today_weather.weather} - with highs of {today_weather.temp_max}\u00b0C "
             f"and lows of {today_weather.temp_min}\u00b0C.\n"
             f"Tomorrow's Weather: {tomorrow_weather.weather} - expect highs of {tomorrow_weather.temp_max}\u00b0C "
             f"and lows of {tomorrow_weather.temp_min}\u00b0C."
         )
+        weather_cache.set(cache_key, weather_message)
+        persistent_cache.set("weather", cache_key, weather_message)  # shown if the weather service goes down
+        return weather_message
     except Exception as e:
         return f"Error processing weather data: {e}"
 
 
-# deserialised version
-def httpJsonCrimeData(url: str, postcode: str):
-    """Fetches and deserialises crime data for a postcode, then provides a risk assessment and categories."""
-    result = getData(url, postcode)
+def fetch_crime_histogram(url, postcode, month=None):
+    """
+    Fetches the crimes around a postcode for one month ("YYYY-MM", None for the latest published) as a CrimeHistogram,
+    or None if they couldn't be fetched. Histograms are cached per postcode and month, in memory and on disk;
+    they are shared, so merge them rather than adding to them.
+    """
+    cache_key = (normalise_postcode(postcode), month or "latest")
+    cached = crime_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    saved = persistent_cache.get("crime_histogram", "|".join(cache_key), max_age=GlobalVariables.cache_ttls["crime"])
+    if saved is not None:
+        histogram = CrimeHistogram.from_json(saved.value)
+        crime_cache.set(cache_key, histogram)
+        return histogram
+
+    result = _download_crimes(url, postcode, month, cache_key)
+    if result is None:
+        saved = persistent_cache.get("crime_histogram", "|".join(cache_key))  # however old, while the service is down
+        return None if saved is None else CrimeHistogram.from_json(saved.value)
+    return result[0]
+
+
+def fetch_crime_points(url, postcode, month=None):
+    """The same crimes as fetch_crime_histogram, as Geospatial.CrimePoints for distance rings. Cached the same way."""
+    cache_key = (normalise_postcode(postcode), month or "latest")
+    cached = crime_points_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
+    saved = persistent_cache.get("crime_points", "|".join(cache_key), max_age=GlobalVariables.cache_ttls["crime"])
+    if saved is not None:
+        points = CrimePoints.from_json(saved.value)
+        crime_points_cache.set(cache_key, points)
+        return points
+
+    result = _download_crimes(url, postcode, month, cache_key)
     if result is None:
+        saved = persistent_cache.get("crime_points", "|".join(cache_key))
+        return None if saved is None else CrimePoints.from_json(saved.value)
+    return result[1]
+
+
+def _download_crimes(url, postcode, month, cache_key):
+    """Streams one month of crimes into a CrimeHistogram and CrimePoints, concurrent calls for it share one download."""
+    return lookups.do(("crime", url, cache_key), _stream_crimes, url, postcode, month, cache_key)
+
+
+def _stream_crimes(url, postcode, month, cache_key):
+    """Streams the crimes in a single pass and caches both, unless a download that just finished has cached them."""
+    histogram, points = crime_cache.peek(cache_key), crime_points_cache.peek(cache_key)
+    if histogram is not None and points is not None:
+        return histogram, points
+
+    response = streamData(url, postcode if month is None else f"{postcode}&date={month}")
+
+    if response is None:
         return None
 
-    _, jsonData = result
+    histogram = CrimeHistogram()
+    points = CrimePoints()
+    unplaced = 0  # crimes counted in the histogram but left off the map, their coordinates aren't numbers
 
+    # records are validated a batch at a time as they arrive and only counted, the month's list is never held in memory
     try:
-        crimeRecords = [crimeDataModel.CrimeRecord(**crime) for crime in jsonData]
+        with response:
+            for crime in crimeDataModel.crime_records.validate_stream(iter_array(response.iter_content(CHUNK_SIZE))):
+                histogram.add(crime)
+                try:
+                    points.add(crime)
+                except (TypeError, ValueError):
+                    unplaced += 1
     except Exception as e:
         print(f"Error deserialising crime data: {e}")  #
         return None
 
-    crimeCount = 0
-    crimeCategories = {}
-
-    for crime in crimeRecords:
-        category = crime.category
-        crimeCount += 1
-        crimeCategories[category] = crimeCategories.get(category, 0) + 1
-
-    if crimeCount < 50:
-        dangerMessage = "Low crime risk in the area."
-    elif crimeCount < 150:
-        dangerMessage = "Moderate crime risk."
-    elif crimeCount < 300:
-        dangerMessage = "High crime risk."
-    elif crimeCount < 500:
-        dangerMessage = "Very high crime risk."
-    else:
-        dangerMessage = "Extremely high crime risk."
+    if unplaced:
+        print(f"{unplaced} crimes without usable coordinates left out of the distance rings.")
 
-    return dangerMessage, crimeCategories
+    if not histogram:
+        print("No data available.")
+        return None
+
+    crime_cache.set(cache_key, histogram)
+    crime_points_cache.set(cache_key, points)
+    persistent_cache.set("crime_histogram", "|".join(cache_key), histogram.to_json())
+    persistent_cache.set("crime_points", "|".join(cache_key), points.to_json())
+    return histogram, points
+
+
+def fetch_postcode_coordinates(postcode):
+    """Looks up a postcode's (latitude, longitude), as the server does for crime. Cached for good, returns None on failure."""
+    cache_key = normalise_postcode(postcode)
+    cached = coordinates_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    saved = persistent_cache.get("coordinates", cache_key)
+    if saved is not None:
+        coordinates = tuple(saved.value)
+        coordinates_cache.set(cache_key, coordinates)
+        return coordinates
+
+    return lookups.do(("coordinates", cache_key), _download_coordinates, cache_key)
+
+
+def _download_coordinates(cache_key):
+    """Looks the postcode up for fetch_postcode_coordinates, unless a call that just finished has cached it."""
+    cached = coordinates_cache.peek(cache_key)
+    if cached is not None:
+        return cached
+
+    result = getData(GlobalVariables.coordinates_url, cache_key)
+
+    if result is None:
+        return None
+
+    try:
+        data = result.data["data"]
+        coordinates = (float(data["latitude"]), float(data["longitude"]))
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Error reading postcode coordinates: {e}")
+        return None
+
+    coordinates_cache.set(cache_key, coordinates)
+    persistent_cache.set("coordinates", cache_key, list(coordinates))
+    return coordinates
+
+
+def fetch_crime_rings(url, postcode, month=None, radii=None):
+    """
+    Counts the crimes around a postcode per distance ring (GlobalVariables.crime_rings by default), returning
+    Geospatial.CrimeRings or None. Reuses the cached crimes, so asking for other radii needs no new download.
+    """
+    coordinates = fetch_postcode_coordinates(postcode)
+    if coordinates is None:
+        return None
+
+    points = fetch_crime_points(url, postcode, month)
+    if points is None:
+        return None
+
+    return points.rings(*coordinates, radii)
+
+
+# deserialised version
+def httpJsonCrimeData(url: str, postcode: str):
+    """Fetches and deserialises crime data for a postcode, then provides a risk assessment and categories."""
+    histogram = fetch_crime_histogram(url, postcode)
+
+    if histogram is None:
+        return None
+
+    return histogram.risk_message(), histogram.category_counts()
+
+
+def merged_crime_histogram(url, postcodes, months=(None,)):
+    """
+    One CrimeHistogram over several postcodes and months, e.g. for comparing areas across a year.
+    Each postcode and month is fetched once and then served from the cache; ones that can't be fetched are left out.
+    """
+    histograms = [fetch_crime_histogram(url, postcode, month) for postcode in postcodes for month in months]
+    return CrimeHistogram.merge(*(histogram for histogram in histograms if histogram is not None))
 
 
 # deserialised version
 def httpJsonDistanceData(url, sourcePostcode, targetPostcode):
     """Fetches and deserialises route distance data between two postcodes, returning formatted travel information."""
+    _, route_message = fetch_route(url, sourcePostcode, targetPostcode)
+    return route_message
+
+
+def fetch_route(url, sourcePostcode, targetPostcode):
+    """
+    Fetches the route between two postcodes, returning (routeDistanceModel.RouteSummary, message),
+    or (None, error message). Routes are cached per (source, target, mode), in memory and on disk.
+    """
+    cache_key = (normalise_postcode(sourcePostcode), normalise_postcode(targetPostcode), _route_mode(url))
+    cached = route_cache.get(cache_key)
+    if cached is not None:
+        return cached, cached.message
+
+    saved = persistent_cache.get("route_summary", "|".join(cache_key), max_age=GlobalVariables.cache_ttls["route"])
+    if saved is not None:
+        route_summary = routeDistanceModel.RouteSummary(*saved.value)
+        route_cache.set(cache_key, route_summary)
+        return route_summary, route_summary.message
+
+    return lookups.do(("route", url, cache_key), _download_route, url, sourcePostcode, targetPostcode, cache_key)
+
+
+def _download_route(url, sourcePostcode, targetPostcode, cache_key):
+    """Fetches and summarises the route for fetch_route, unless a call that just finished has cached it."""
+    cached = route_cache.peek(cache_key)
+    if cached is not None:
+        return cached, cached.message
+
     distance_url = f"{url}startPostcode={sourcePostcode}&endPostcode={targetPostcode}"
     result = getData(distance_url)
 
     if result is None:
-        return "Error: No data received from the server."
-
-    _, jsonData = result
+        saved = persistent_cache.get("route_summary", "|".join(cache_key))  # however old, routes rarely change
+        if saved is not None:
+            route_summary = routeDistanceModel.RouteSummary(*saved.value)
+            return route_summary, f"{route_summary.message}\n{_saved_note(saved)}"
+        return None, "Error: No data received from the server."
 
     try:
-        response_data = routeDistanceModel.OSRMResponse(**jsonData)
+        response_data = result.decode(routeDistanceModel.OSRMResponse)
 
         if not response_data.routes:
-            return "Error: No routes found in the response."
+            return None, "Error: No routes found in the response."
 
         route = response_data.routes[0]
         duration = route.duration
         distance = route.distance
 
-        return routeDistanceModel.generateRouteMessage(sourcePostcode, targetPostcode, duration, distance, response_data.waypoints)
+        route_message = routeDistanceModel.generateRouteMessage(sourcePostcode, targetPostcode, duration, distance, response_data.waypoints)
+        route_summary = routeDistanceModel.RouteSummary(*cache_key, duration, distance, route_message)
+        route_cache.set(cache_key, route_summary)
+        persistent_cache.set("route_summary", "|".join(cache_key), list(route_summary))
+        return route_summary, route_message
 
     except ValidationError as e:
-        return f"Error: Validation error while parsing the response - {e}"
+        return None, f"Error: Validation error while parsing the response - {e}"
     except KeyError as e:
-        return f"Error: Missing key {e} in the response data."
+        return None, f"Error: Missing key {e} in the response data."
+    except ValueError as e:  # the body wasn't JSON
+        return None, f"Error: Could not parse the response - {e}"
+
+
+def _route_mode(url):
+    """Pulls the travel mode (e.g. driving) out of a distance URL, routes are cached per mode."""
+    return parse_qs(urlparse(url).query).get("mode", [""])[0]
 
 
 def register_user(url, username, password, confirmPassword, timeout=10):
@@ -157,7 +401,7 @@ def register_user(url, username, password, confirmPassword, timeout=10):
     username_password = {"username": username, "password": password}
 
     try:
-        response = requests.post(f"{url}/addUser", json=username_password, timeout=timeout)
+        response = transport.post(f"{url}/addUser", json=username_password, timeout=timeout)
 
         if response.status_code == 200:
             try:
@@ -184,7 +428,7 @@ def verify_user(url, username, password, timeout=10):
     full_url = f"{url}/verifyUser?username={username}&password={password}"
 
     try:
-        response = requests.get(full_url, timeout=timeout)
+        response = transport.get(full_url, timeout=timeout)
 
         if response.status_code == 200:
             try:
@@ -209,7 +453,7 @@ def verify_user(url, username, password, timeout=10):
 def fetch_dorm_room_information(database, room_name):
     """Fetches and displays detailed information for a specific dorm room from the database."""
     full_url = f"{database}/viewDormRooms?roomName={room_name}"  # one room at a time
-    response = requests.get(full_url)
+    response = transport.get(full_url)
 
     if response.status_code == 200:
         response_data = roomModel.Response(**response.json())  # .json
@@ -223,7 +467,11 @@ def fetch_dorm_room_information(database, room_name):
         return f"Failed to fetch data: {response.status_code}"
 
 
+_room_index = None  # RoomIndex of the last room list fetched
+
+
 # marked as private, not actually private...
+# searches now go through RoomQuery, this is the original single-room check
 def _room_filter(room, min_price, max_price, city, live_in_landlord, max_roommates,
                   bills_included, shared_bathroom, languages_spoken, available_from):
     """
@@ -256,29 +504,194 @@ def _room_filter(room, min_price, max_price, city, live_in_landlord, max_roommat
         return False, f"Error while checking filters for room {room.name}: {e}"
 
 
-def fetch_dorm_room_names(database, min_price, max_price, city, live_in_landlord, max_roommates,
-                           bills_included, shared_bathroom, languages_spoken, available_from):
-    """Fetches all dorm room data and filters it based on specified criteria, returning names of matching rooms."""
+def fetch_room_index(database, offline=False):
+    """
+    Fetches every dorm room and returns (RoomIndex, error message).
+    The index is rebuilt only when the room list's version changes, and the payload is saved to the
+    persistent cache; offline=True uses the last saved list without touching the network.
+    """
+    global _room_index
     full_url = f"{database}/viewAllDormRooms"
+    saved_version = persistent_cache.version("rooms", full_url)
+    body = None  # the saved body is only read from disk if the index is out of date
 
-    response = requests.get(full_url)
-    if response.status_code != 200:
-        return [], f"Failed to fetch data: {response.status_code}"
+    if offline:
+        if saved_version is None:
+            return None, "No saved rooms yet."
+        version = saved_version
+    else:
+        headers = {"If-None-Match": saved_version} if is_etag(saved_version) else {}
+        try:
+            response = transport.get(full_url, headers=headers)
+        except requests.exceptions.RequestException as e:
+            if saved_version is None:
+                return None, f"Failed to fetch data: {e}"
+            print(f"Failed to fetch rooms, searching the saved list: {e}")
+            response = None
+
+        if response is None:
+            version = saved_version
+        elif response.status_code == 304:  # unchanged since the saved copy
+            persistent_cache.touch("rooms", full_url)
+            version = saved_version
+        elif response.status_code != 200:
+            return None, f"Failed to fetch data: {response.status_code}"
+        else:
+            version = content_version(response)
 
+            if version == saved_version:
+                persistent_cache.touch("rooms", full_url)
+            else:
+                body = response.content
+
+    if body is not None:
+        rooms, error_message = _decode_rooms(body)
+        if rooms is not None:
+            # saved as sent, not re-encoded, and only once it has parsed, so a bad response can't replace the last good list
+            persistent_cache.set_raw("rooms", full_url, body, version=version)
+            _room_index = RoomIndex(rooms, version=version)
+            return _room_index, None
+        if saved_version is None:
+            return None, error_message
+        print(f"Couldn't read the room list, searching the saved list: {error_message}")
+        version = saved_version
+
+    if _room_index is not None and _room_index.version == version:
+        return _room_index, None
+
+    saved = persistent_cache.get_raw("rooms", full_url)
+    if saved is None:  # evicted, or a sqlite error, since its version was read
+        return None, "No saved rooms yet." if offline else "Failed to fetch data: the saved room list couldn't be read."
+
+    rooms, error_message = _decode_rooms(saved.value)
+    if rooms is None:
+        return None, error_message
+    _room_index = RoomIndex(rooms, version=version)
+    return _room_index, None
+
+
+def _decode_rooms(body):
+    """Decodes and validates a /viewAllDormRooms body, returning (rooms, error message)."""
+    # decoded straight into compact rows, without building the decoded JSON first
     try:
-        response_data = roomModel.Response(**response.json())
-    except Exception as e:
-        return [], f"Error parsing response: {e}"
+        return JsonCodec.decode(body, roomModel.ResponseRow).data, None
+    except ValueError:
+        # validate record by record, only to report the same error the models give
+        envelope = {}
+        try:
+            rooms = list(roomModel.dorm_rooms.validate_stream(iter_array(iter_chunks(body), key="data", extras=envelope)))
+            roomModel.Response(**envelope, data=[])  # status is still checked
+        except Exception as e:
+            return None, f"Error parsing response: {e}"
+        return rooms, None
+
+
+def fetch_all_dorm_rooms(database, offline=False):
+    """Fetches every dorm room, returning (rooms, error message). See fetch_room_index."""
+    room_index, error_message = fetch_room_index(database, offline)
+    if room_index is None:
+        return None, error_message
+    return room_index.rooms, None
+
+
+def room_postcodes(database, room_names):
+    """{room name: postcode} for the given rooms, from the saved room list if there is one. Unknown rooms are left out."""
+    room_index, _ = fetch_room_index(database, offline=True)
+    if room_index is None:
+        room_index, _ = fetch_room_index(database)
+    if room_index is None:
+        return {}
+
+    wanted = set(room_names)
+    return {room.name: room.location.postcode for room in room_index.rooms if room.name in wanted}
+
 
-    filtered_rooms = []
+def fetch_dorm_room_names(database, min_price, max_price, city, live_in_landlord, max_roommates,
+                           bills_included, shared_bathroom, languages_spoken, available_from, offline=False):
+    """
+    Fetches all dorm room data and filters it based on specified criteria, returning names of matching rooms.
+    The positional filters (0/1/2 for no/yes/either) are turned into a RoomQuery, see search_dorm_rooms.
+    """
+    try:
+        query = RoomQuery.from_filters(min_price, max_price, city, live_in_landlord, max_roommates,
+                                       bills_included, shared_bathroom, languages_spoken, available_from)
+    except ValueError as e:
+        return [], f"Error while checking filters: {e}"
+
+    return search_dorm_rooms(database, query, offline)
+
+
+def search_dorm_rooms(database, query, offline=False, engine=None):
+    """
+    Runs a RoomQuery over every dorm room, returning (names of matching rooms, message).
+    Results are memoised per query and room list version, so repeating a search doesn't re-scan anything.
+    With offline=True the last saved room list is searched instead, so a cold start can show rooms straight away.
+    """
+    room_index, error_message = fetch_room_index(database, offline)
+    if room_index is None:
+        return [], error_message
+
+    memo_key = (room_index.version, query)
+    result = query_results.get(memo_key)
+    if result is None:
+        result = _room_names_message(filter_room_index(room_index, query, engine))
+        query_results.set(memo_key, result)
+
+    filtered_rooms, message = result
+    return list(filtered_rooms), message
+
+
+def search_dorm_rooms_batch(database, queries, offline=False, engine="columnar"):
+    """
+    Runs many RoomQuery searches over one download of the room list, e.g. saved searches for nightly alerts.
+    Returns a RoomSearch per query, in order: the names and message search_dorm_rooms would give, and
+    the error when the search couldn't run, so callers don't have to tell failures apart by their message.
+    """
+    room_index, error_message = fetch_room_index(database, offline)
+    if room_index is None:
+        return [roomModel.RoomSearch([], error_message, error_message) for _ in queries]
+
+    searches = []
+    for query in queries:
+        filtered_rooms, error_message = filter_room_index(room_index, query, engine)
+        searches.append(roomModel.RoomSearch(*_room_names_message((filtered_rooms, error_message)), error_message))
+    return searches
 
-    for room in response_data.data:
-        filter_pass, error_message = _room_filter(room, min_price, max_price, city, live_in_landlord, max_roommates,
-                                                  bills_included, shared_bathroom, languages_spoken, available_from)
-        if error_message:
-            return [], error_message
-        if filter_pass:
-            filtered_rooms.append(room.name)
+
+def filter_room_index(room_index, query, engine=None):
+    """
+    Runs one RoomQuery over a fetched room list, returning (matching names, error message).
+    engine is "index", "columnar" (NumPy, falls back to the index without it) or "python"
+    (the query compiled to one check per constrained field, most selective first); all three give identical results.
+    """
+    engine = engine or GlobalVariables.room_filter_engine
+
+    if engine == "python":
+        if query.available_from is not None and room_index.date_errors:
+            position, error = room_index.date_errors[0]
+            return [], f"Error while checking filters for room {room_index.names[position]}: {error}"
+
+        matches = query.compile(room_index.selectivity(query))
+        filtered_rooms = []
+        for room in room_index.rooms:
+            try:
+                if matches(room):
+                    filtered_rooms.append(room.name)
+            except Exception as e:
+                return [], f"Error while checking filters for room {room.name}: {e}"
+        return filtered_rooms, None
+
+    if engine == "columnar" and room_index.columns() is not None:
+        return room_index.columns().filter(query)
+
+    return room_index.filter(query)
+
+
+def _room_names_message(result):
+    """Turns (names, error) into search_dorm_rooms' (names, message) result."""
+    filtered_rooms, error_message = result
+    if error_message:
+        return [], error_message
 
     if not filtered_rooms:
         return [], "No rooms available that match the filters."
@@ -288,21 +701,34 @@ def fetch_dorm_room_names(database, min_price, max_price, city, live_in_landlord
 
 # this includes the weather data...
 def fetch_dorm_room_combined_information(database, room_name):
-    """Fetches combined dorm room information, including weather data for its location."""
+    """
+    Fetches combined dorm room information, including weather data for its location.
+    Each result is saved, the last saved copy is shown if the server can't provide it.
+    """
     url = f"{database}/fetchDormRoomCombinedInformation?roomName={room_name}"
 
-    response = requests.get(url)
+    try:
+        response = transport.get(url)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching room data: {e}")
+        response = None
 
-    if response.status_code == 200:
+    if response is not None and response.status_code == 200:
         response_data = combinedRoomModel.Response(**response.json())
-        return response_data.data.location.postcode, response_data.data.display_room_details_left()
+        result = response_data.data.location.postcode, response_data.data.display_room_details_left()
+        persistent_cache.set("combined", room_name, list(result), version=content_version(response))
+        return result
     else:
+        saved = persistent_cache.get("combined", room_name)
+        if saved is not None:
+            postcode, dorm_details = saved.value
+            return SavedResult((postcode, dorm_details))
         return "", "Error fetching room data"
 
 
 def add_application(database, dorm_name, applicant_name, username, password):
     """Submits a new dorm room application to the database."""
-    response = requests.post(f"{database}/addApplication", json={
+    response = transport.post(f"{database}/addApplication", json={
         "dormName": dorm_name, "applicantName": applicant_name,
         "username": username, "password": password})
 
@@ -324,7 +750,7 @@ def cancel_application(database, username, password, dorm_name, applicant_name):
         "dormRoomName": dorm_name, "applicantName": applicant_name}
 
     try:
-        response = requests.patch(f"{database}/cancelApplication", json=cancel_application_data)
+        response = transport.patch(f"{database}/cancelApplication", json=cancel_application_data)
 
         if response.status_code == 200:
             response_data = VerifyUserResponse(**response.json())
@@ -343,14 +769,16 @@ def view_room_application_history(database, dorm_name):
     url = f"{database}/viewRoomApplicationHistory/{dorm_name}"
 
     try:
-        response = requests.get(url)
+        response = transport.get(url)
         response.raise_for_status()
 
-        response_data = applicationHistoryModel.ResponseData(**response.json())
+        response_data = JsonCodec.decode(response.content, applicationHistoryModel.ResponseData)
 
         if response_data.status == "success" and response_data.data:
             return response_data.display_rooms()
         else:
             return f"No application history for '{dorm_name}'."
     except requests.exceptions.RequestException as e:
+        return f"Error fetching application history: {e}"
+    except ValueError as e:  # not JSON, or not the expected shape
         return f"Error fetching application history: {e}"
\ No newline at end of file
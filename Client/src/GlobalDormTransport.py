@@ -0,0 +1,194 @@
+import json
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import GlobalVariables
+import Resilience
+from LoadBalancer import read_balancer
+from SingleFlight import SingleFlight
+
+route_path = "/GlobalDorm/webresources/globaldorm/route"  # see GlobalVariables.distance_url
+
+
+class ClientTransport:
+    """
+    Shared HTTP transport for every call the client makes to the Global Dorm server.
+    Keeps a pooled, keep-alive requests.Session for the current server, applies default
+    timeouts, and rebuilds the pool when GlobalVariables.change_server switches hosts.
+    Identical GETs in flight at the same time are sent once and share the response, and every request
+    to the server goes through its endpoint family's retry and circuit breaker policy (see Resilience).
+    Read-only GETs are spread over the healthy servers and hedged (see LoadBalancer), writes are not.
+    """
+    def __init__(self, pool_sizes=None, timeout=None):
+        """
+        Initialises the transport.
+
+        - pool_sizes: connections kept alive per server name, defaults to GlobalVariables.pool_sizes.
+        - timeout: default (connect, read) timeout in seconds, defaults to GlobalVariables.default_timeout.
+        """
+        self.pool_sizes = pool_sizes if pool_sizes is not None else GlobalVariables.pool_sizes
+        self.timeout = timeout if timeout is not None else GlobalVariables.default_timeout
+        self.server = None
+        self.session = None
+        self.flights = SingleFlight()
+        self.on_failure = None  # called when the server can't be reached, e.g. ServerProber.probe_now
+        self._lock = threading.Lock()
+
+    def _build_session(self, server):
+        """Creates a keep-alive session with a connection pool sized for the given server."""
+        server_name = next((name for name, address in GlobalVariables.servers.items() if address == server), None)
+        pool_size = self.pool_sizes.get(server_name, GlobalVariables.default_pool_size)
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(GlobalVariables.servers), pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # commute tables send route_concurrency routes at once, only they get a connection each
+        route_adapter = HTTPAdapter(pool_connections=len(GlobalVariables.servers), pool_maxsize=GlobalVariables.route_concurrency)
+        for address in GlobalVariables.servers.values():
+            session.mount(f"http://{address}{route_path}", route_adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        return session
+
+    def current_session(self):
+        """Returns the session for the current server, rebuilding the pool if the server has changed."""
+        with self._lock:
+            if self.session is None or self.server != GlobalVariables.current_server:
+                if self.session is not None:
+                    self.session.close()
+                self.server = GlobalVariables.current_server
+                self.session = self._build_session(self.server)
+            return self.session
+
+    def rebuild(self):
+        """Drops every pooled connection, the next request opens a fresh pool."""
+        with self._lock:
+            if self.session is not None:
+                self.session.close()
+            self.session = None
+            self.server = None
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """
+        Sends a request through the pooled session, applying the default timeout when none is given.
+        A GET identical to one already in flight waits for it and gets the same response (or exception);
+        streamed GETs are never shared, each caller reads its own body.
+        """
+        if method == "GET" and not kwargs.get("stream"):
+            key = (GlobalVariables.current_server, url, _frozen(kwargs.get("params")), _frozen(kwargs.get("headers")))
+            return self.flights.do(key, self._send, method, url, timeout, kwargs)
+        return self._send(method, url, timeout, kwargs)
+
+    def _send(self, method, url, timeout, kwargs):
+        """
+        Sends one request, retried only if it is a GET, through the URL's resilience policy if it has one.
+        Balanced reads may go to another server, everything else goes to the server in the URL.
+        """
+        session = self.current_session()
+        policy = Resilience.policy_for(url)
+        timeout = timeout or (policy.timeout if policy else None) or self.timeout
+
+        def send(target_url):
+            return session.request(method, target_url, timeout=timeout, **kwargs)
+
+        if method == "GET" and read_balancer.is_balanced(url):
+            attempt = lambda: read_balancer.send(send, url)
+        else:
+            attempt = lambda: send(url)
+            if method != "GET":
+                read_balancer.note_write(url)
+
+        if policy is None:
+            return attempt()
+
+        try:
+            return policy.call(attempt, retry=method == "GET")
+        except Resilience.CircuitOpenError:
+            raise  # nothing was sent, the failures that opened the breaker have been reported already
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if self.on_failure is not None:
+                self.on_failure()
+            raise
+
+    def get(self, url, **kwargs):
+        """Sends a GET request through the pooled session."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Sends a POST request through the pooled session."""
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        """Sends a PATCH request through the pooled session."""
+        return self.request("PATCH", url, **kwargs)
+
+    def close(self):
+        """Closes the pool, used when the application exits."""
+        self.rebuild()
+
+
+def _frozen(values):
+    """A hashable copy of a params or headers dict, for the single-flight key."""
+    if values is None:
+        return None
+    if isinstance(values, dict):
+        return tuple(sorted((str(name), str(value)) for name, value in values.items()))
+    return tuple(values) if isinstance(values, list) else values
+
+
+class ApiResponse:
+    """
+    A fetched response body kept as raw bytes. It is parsed on first access to data and
+    pretty-printed only when asked, so callers that just need the values never pay for indent=4.
+    """
+    EMPTY_BODIES = {b"", b"[]", b"{}", b"null", b'""', b"0", b"false"}  # everything "if not jsonData" used to reject
+
+    def __init__(self, content, status_code=200, url=""):
+        """
+        Wraps a body.
+
+        - content: the raw response bytes.
+        - status_code, url: kept for error messages and debugging.
+        """
+        self.content = content
+        self.status_code = status_code
+        self.url = url
+        self._data = None
+        self._parsed = False
+
+    @classmethod
+    def from_response(cls, response):
+        """Wraps a requests.Response, reading its body once."""
+        return cls(response.content, response.status_code, response.url)
+
+    @property
+    def is_empty(self):
+        """True for an empty JSON body ([], {}, null, ...), checked on the bytes without parsing them."""
+        stripped = self.content.strip()
+        if len(stripped) > 16:  # anything longer has real content
+            return False
+        return b"".join(stripped.split()) in self.EMPTY_BODIES
+
+    @property
+    def data(self):
+        """The decoded JSON, parsed the first time it is used. Raises ValueError if the body isn't JSON."""
+        if not self._parsed:
+            import JsonCodec  # imported on first use, it loads pydantic, which the home screen doesn't need
+            self._data = JsonCodec.loads(self.content)
+            self._parsed = True
+        return self._data
+
+    def decode(self, target):
+        """Decodes the body straight into typed objects, e.g. decode(OSRMResponse), see JsonCodec.decode."""
+        import JsonCodec
+        return JsonCodec.decode(self.content, target)
+
+    def pretty(self):
+        """The body as indented JSON, for printing while debugging."""
+        return json.dumps(self.data, indent=4)
+
+    def __len__(self):
+        return len(self.content)
+
+
+transport = ClientTransport()  # one transport for the whole client
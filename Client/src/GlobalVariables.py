@@ -9,6 +9,81 @@ logged_in_password = ""
 servers = {"netbeans": "localhost:8080", "docker": "localhost:8081", "azure": "20.162.251.254:8080"}
 current_server = servers["netbeans"]
 
+# the client probes every server in the background and uses the fastest healthy one (ServerProber)
+auto_select_server = True
+probe_interval = 15  # seconds between rounds of probes, a failed request probes straight away
+probe_timeout = (1.0, 2.0)
+probe_path = "/GlobalDorm/"  # a HEAD of the application root, any answer below 500 means the server is up
+probe_window = 5  # probes the error rate is worked out over
+probe_smoothing = 0.3  # weight of the newest round trip time in the running average
+probe_max_error_rate = 0.4
+switch_margin = 0.2  # another server has to be 20% faster before the client moves to it
+
+# read-only endpoints go to any healthy server and are hedged to a second one when slow (LoadBalancer),
+# writes always go to the current server
+load_balancing = True
+balanced_endpoints = ("viewAllDormRooms", "viewDormRooms", "fetchDormRoomCombinedInformation",
+                      "/globaldorm/weather", "/globaldorm/crime", "/globaldorm/route")
+hedge_percentile = 95  # hedge once the first server is slower than this percentile of recent responses
+hedge_samples = 200  # recent response times kept per endpoint
+hedge_min_samples = 20  # until then hedge_default_delay is used
+hedge_default_delay = 1.0  # seconds
+hedge_budget = 0.1  # at most one hedge per ten reads
+read_your_writes = 30  # seconds database reads stay on the server that took the last write
+balancer_threads = 128
+
+# connection pool per server (kept alive between clicks) and the default (connect, read) timeout
+pool_sizes = {"netbeans": 8, "docker": 8, "azure": 16}
+default_pool_size = 8
+default_timeout = (3.05, 20)
+
+async_concurrency = 8  # requests in flight at once for GlobalDormAsync bulk lookups
+coalesce_requests = True  # identical lookups in flight at the same time share one request (SingleFlight)
+route_concurrency = 50  # routes in flight at once for a commute table, a whole shortlist goes out together
+worker_threads = 4  # background threads that keep network calls off the Tk main loop
+prefetch_depth = 5  # rooms at the top of each search whose details are fetched before they are picked
+prefetch_threads = 2
+prefetch_cache_size = 64  # prefetched room details kept, a few searches' worth
+
+# retry and circuit breaking per endpoint family, see Resilience.ResiliencePolicy for what each setting does
+resilience = {
+    "database": {"attempts": 3, "base_delay": 0.2, "max_delay": 2.0, "failure_threshold": 3, "reset_timeout": 30, "timeout": (3.05, 10)},
+    "weather": {"attempts": 3, "base_delay": 0.2, "max_delay": 2.0, "failure_threshold": 3, "reset_timeout": 60, "timeout": (3.05, 8)},
+    "crime": {"attempts": 2, "base_delay": 0.5, "max_delay": 2.0, "failure_threshold": 3, "reset_timeout": 60, "timeout": (3.05, 20)},
+    "route": {"attempts": 3, "base_delay": 0.2, "max_delay": 2.0, "failure_threshold": 3, "reset_timeout": 60, "timeout": (3.05, 10)},
+}
+resilience_paths = {"/webresources/database": "database", "/globaldorm/weather": "weather",
+                    "/globaldorm/crime": "crime", "/globaldorm/route": "route"}  # URL path -> family
+# start-up: modules GlobalDormApp imports in the background once the home screen is up (empty to import
+# them only when first used), and how long importing everything the home screen needs may take
+deferred_modules = ("GlobalDormFunctions", "WeatherSafetyCommuteWindow", "SearchAndApplyWindow",
+                    "matplotlib.figure", "matplotlib.backends.backend_tkagg")
+warm_up_delay = 500  # milliseconds after the main loop starts
+startup_budget = 0.35  # seconds, reported against by GlobalDormBenchmarks.benchmark_cold_start
+status_poll_interval = 1000  # milliseconds between refreshes of the service status label
+
+# client-side cache, seconds each data type stays fresh: weather changes hourly, crime monthly, routes rarely
+cache_ttls = {"weather": 60 * 60, "crime": 30 * 24 * 60 * 60, "route": 7 * 24 * 60 * 60}
+cache_size = 256  # entries per cache before the least recently used is evicted
+persistent_cache_path = "cache/global_dorm_cache.sqlite3"  # relative to Client/, like the images
+
+# window background images, relative to Client/, scaled once per size and kept in memory and in thumbnail_dir
+background_images = {"home": "images/pexels-abdullahalmallah-8654406.jpg",
+                     "search": "images/kira-laktionov-ezyhA0jc1oU-unsplash.jpg",
+                     "commute": "images/pexels-abdullahalmallah-13185437.jpg"}
+image_cache_size = 16  # scaled images kept in memory, a few sizes of each background
+thumbnail_dir = "cache/thumbnails"  # None to scale the originals on every start
+
+# distance rings (miles) the Safety view counts crimes in, the server only sends crimes within 0.5 miles
+crime_rings = (0.1, 0.25, 0.5)
+coordinates_url = "https://api.getthedata.com/postcode/"  # the postcode lookup the server uses for crime
+
+# how room searches run: "index" (RoomIndex), "columnar" (NumPy, falls back to index) or "python" (compiled RoomQuery per room)
+room_filter_engine = "index"
+
+# JSON decoder: "msgspec", "orjson" or "json" (stdlib), None uses the fastest one installed
+json_backend = None
+
 '''
 This is quite unconventional.
 Created a centralised place to put links and login information.
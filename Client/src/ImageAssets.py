@@ -0,0 +1,103 @@
+import hashlib
+import os
+import customtkinter as ctk
+from PIL import Image
+import GlobalVariables
+from ResponseCache import TTLCache
+from SingleFlight import SingleFlight
+
+'''
+The background images of the windows, decoded and scaled once per size instead of on every
+window open. Scaled copies are kept in a least recently used cache for the whole client, and
+written to GlobalVariables.thumbnail_dir so the next start doesn't decode the full-size JPEGs either.
+
+home_image = background_image("images/pexels-abdullahalmallah-8654406.jpg", (self.width, self.height), self.window)
+'''
+
+image_cache = TTLCache(None, GlobalVariables.image_cache_size)  # (path, (width, height)) -> scaled PIL image
+decodes = SingleFlight()  # the warm-up thread and a window opening can ask for the same image at once
+
+
+def thumbnail_path(path, size):
+    """
+    Where the scaled copy of path is saved, e.g. cache/thumbnails/kira-laktionov-ezyhA0jc1oU-unsplash-9a391f3c-450x720.jpg.
+    The hash of the whole path keeps images with the same name in different folders apart.
+    """
+    stem, extension = os.path.splitext(os.path.basename(path))
+    digest = hashlib.sha1(os.path.normpath(path).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(GlobalVariables.thumbnail_dir, f"{stem}-{digest}-{size[0]}x{size[1]}{extension}")
+
+
+def _read_thumbnail(path, size):
+    """The saved scaled copy, or None if there isn't one or the original has changed since it was made."""
+    if not GlobalVariables.thumbnail_dir:
+        return None
+    thumbnail = thumbnail_path(path, size)
+    try:
+        if os.path.getmtime(thumbnail) < os.path.getmtime(path):
+            return None
+        with Image.open(thumbnail) as image:
+            image.load()
+            return image
+    except OSError:
+        return None
+
+
+def _write_thumbnail(path, size, image):
+    """Saves the scaled copy, written to a temporary file first so a crash can't leave half an image behind."""
+    if not GlobalVariables.thumbnail_dir:
+        return
+    thumbnail = thumbnail_path(path, size)
+    temporary = f"{thumbnail}.tmp"
+    try:
+        os.makedirs(GlobalVariables.thumbnail_dir, exist_ok=True)
+        image.save(temporary, format=Image.registered_extensions().get(os.path.splitext(path)[1].lower()), quality=90)
+        os.replace(temporary, thumbnail)
+    except (OSError, ValueError) as e:  # thumbnails only save time, the image is shown either way
+        print(f"Couldn't save the thumbnail of {path}: {e}")
+
+
+def _scale(path, size):
+    """Decodes an image straight at a reduced size where the format allows (JPEG), then resizes it to size."""
+    with Image.open(path) as image:
+        image.draft("RGB", size)  # a JPEG is decoded at 1/2, 1/4 or 1/8 scale, still at least as large as size
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        return image.resize(size, Image.Resampling.LANCZOS)
+
+
+def _load(path, size):
+    image = _read_thumbnail(path, size)
+    if image is None:
+        image = _scale(path, size)
+        _write_thumbnail(path, size, image)
+    image_cache.set((path, size), image)
+    return image
+
+
+def scaled_image(path, size):
+    """
+    Returns the image at path resized to size, decoding it only the first time each size is asked for.
+
+    - path: relative to Client/, like every image the client shows.
+    - size: (width, height) in pixels.
+    """
+    size = (int(size[0]), int(size[1]))
+    image = image_cache.get((path, size))
+    if image is None:
+        image = decodes.do((path, size), _load, path, size)
+    return image
+
+
+def pixel_size(size, window=None):
+    """The size in pixels CTkImage shows an image of size at in window, after its scaling. Call from the Tk thread."""
+    scaling = ctk.ScalingTracker.get_widget_scaling(window) if window is not None else 1.0
+    return round(size[0] * scaling), round(size[1] * scaling)
+
+
+def background_image(path, size, window=None):
+    """
+    A CTkImage of path at size, the same picture in light and dark mode.
+    Pass the window it is shown in so the image is scaled for it, otherwise CTkImage resizes it again.
+    """
+    return ctk.CTkImage(light_image=scaled_image(path, pixel_size(size, window)), size=size)
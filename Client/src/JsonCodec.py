@@ -0,0 +1,100 @@
+import json
+from typing import get_args
+from pydantic import BaseModel, TypeAdapter
+import GlobalVariables
+try:
+    import msgspec
+except ImportError:  # optional, decodes straight into the row dataclasses
+    msgspec = None
+try:
+    import orjson
+except ImportError:  # optional, faster untyped parsing
+    orjson = None
+
+'''
+One place for JSON decoding. decode() turns a response body straight into typed objects
+(pydantic models or the compact row dataclasses) without building dicts first, using msgspec
+when it is installed and pydantic-core's own parser otherwise. With json_backend = "json"
+everything goes through the stdlib, as the client did before.
+
+weather = decode(response.content, List[weatherModel.WeatherData])
+'''
+
+installed = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+
+
+def choose_backend(preferred=None):
+    """The backend to use: preferred if it is installed, otherwise the fastest one that is."""
+    if preferred and installed.get(preferred):
+        return preferred
+    if preferred:
+        print(f"JSON backend {preferred} isn't installed, using the fastest available.")
+    return next(name for name in ("msgspec", "orjson", "json") if installed[name])
+
+
+backend = choose_backend(GlobalVariables.json_backend)
+
+_adapters = {}  # target type -> pydantic TypeAdapter
+_decoders = {}  # target type -> msgspec Decoder, or None if msgspec can't build it (e.g. pydantic models)
+
+
+def set_backend(name):
+    """Switches backend at runtime, e.g. for benchmarks."""
+    global backend
+    backend = choose_backend(name)
+
+
+def loads(content):
+    """Decodes JSON bytes into plain dicts and lists."""
+    if backend != "json" and orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _adapter(target):
+    if target not in _adapters:
+        _adapters[target] = TypeAdapter(target)
+    return _adapters[target]
+
+
+def _is_model(target):
+    return isinstance(target, type) and issubclass(target, BaseModel)
+
+
+def _uses_models(target):
+    """True if target is, or contains (e.g. List[WeatherData]), a pydantic model, which msgspec can't build."""
+    return _is_model(target) or any(_uses_models(argument) for argument in get_args(target))
+
+
+def _decoder(target):
+    if target not in _decoders:
+        try:
+            _decoders[target] = None if _uses_models(target) else msgspec.json.Decoder(target)
+        except TypeError:  # another type msgspec doesn't know how to build
+            _decoders[target] = None
+    return _decoders[target]
+
+
+def decode(content, target):
+    """
+    Decodes JSON bytes straight into target, a pydantic model or a type such as List[CrimeRecordRow].
+    Values follow pydantic's rules whichever backend runs. Malformed data raises a ValueError
+    (pydantic's ValidationError, or the stdlib's JSONDecodeError with the "json" backend).
+    """
+    if backend == "json":
+        value = json.loads(content)
+        if _is_model(target):
+            return target(**value) if isinstance(value, dict) else target.model_validate(value)
+        return _adapter(target).validate_python(value)
+
+    if backend == "msgspec":
+        decoder = _decoder(target)
+        if decoder is not None:
+            try:
+                return decoder.decode(content)
+            except msgspec.MsgspecError:
+                pass  # msgspec is stricter ("5" for an int), let pydantic coerce it or raise the usual error
+
+    if _is_model(target):
+        return target.model_validate_json(content)
+    return _adapter(target).validate_json(content)
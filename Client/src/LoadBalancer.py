@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit, urlunsplit
+import GlobalVariables
+from ServerProber import server_prober
+
+'''
+Spreads the read-only requests (room lists, combined room information, weather, crime, routes)
+over every healthy server, and hedges them: when the first server hasn't answered within the
+95th percentile of that endpoint's recent response times, the same request goes to a second
+server and whichever answers first is used. Writes (addApplication, cancelApplication, addUser)
+always go to the current server, and for a while afterwards the database reads follow them there
+so a user sees their own changes.
+
+response = read_balancer.send(lambda url: session.get(url), url)  # ClientTransport does this
+'''
+
+
+class ReadBalancer:
+    """
+    Chooses a server per read by (requests in flight + 1) x round trip time, using ServerProber's
+    measurements, so the fastest server takes most reads but a busy one sheds them to the others.
+    Before the first probes every request goes to the current server, as it did before.
+    """
+    def __init__(self, prober=server_prober):
+        """
+        Initialises the balancer.
+
+        - prober: the ServerProber whose health records say which servers are up and how fast.
+        """
+        self.prober = prober
+        self.latencies = {}  # endpoint -> recent response times in seconds
+        self.in_flight = {}  # server address -> requests being sent to it
+        self.requests = 0
+        self.hedges = 0  # duplicates sent
+        self.hedge_wins = 0  # duplicates that answered first
+        self.write_server = None  # (address, until), where database reads go after a write
+        # every read waits on a thread here, so there is room for a whole commute table plus its hedges
+        self.executor = ThreadPoolExecutor(max_workers=GlobalVariables.balancer_threads, thread_name_prefix="globaldorm-read")
+        self._lock = threading.Lock()
+
+    def endpoint(self, url):
+        """The balanced endpoint a URL belongs to, e.g. "viewAllDormRooms", or None for one that isn't balanced."""
+        path = urlsplit(url).path
+        return next((endpoint for endpoint in GlobalVariables.balanced_endpoints if endpoint in path), None)
+
+    def is_balanced(self, url):
+        """Checks whether a GET to url may go to any server: a balanced endpoint on one of our servers."""
+        return (GlobalVariables.load_balancing and self.endpoint(url) is not None
+                and urlsplit(url).netloc in GlobalVariables.servers.values())
+
+    def note_write(self, url):
+        """Records a write, database reads go to its server for GlobalVariables.read_your_writes seconds."""
+        self.write_server = (urlsplit(url).netloc, time.monotonic() + GlobalVariables.read_your_writes)
+
+    def servers_for(self, url):
+        """Server addresses to try for a read, best first."""
+        address = urlsplit(url).netloc
+        if self.write_server and "/webresources/database" in url:
+            write_address, until = self.write_server
+            if time.monotonic() < until:
+                return [write_address]
+
+        healthy = [health for health in self.prober.health.values() if health.healthy]
+        if not healthy:
+            return [address]
+
+        with self._lock:
+            healthy.sort(key=lambda health: (self.in_flight.get(health.address, 0) + 1) * health.rtt)
+        return [health.address for health in healthy]
+
+    def hedge_delay(self, endpoint):
+        """Seconds to wait for the first server before hedging: the endpoint's 95th percentile response time."""
+        with self._lock:  # copied, the reads still running append to it
+            samples = list(self.latencies.get(endpoint, ()))
+        if len(samples) < GlobalVariables.hedge_min_samples:
+            return GlobalVariables.hedge_default_delay
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * GlobalVariables.hedge_percentile / 100))]
+
+    def _may_hedge(self):
+        """Hedges are capped at a share of all reads, so a slow period can't double the load on every server."""
+        return self.hedges < GlobalVariables.hedge_budget * self.requests
+
+    def _send_to(self, send, url, address, endpoint):
+        """Sends the read to one server, recording its response time."""
+        with self._lock:
+            self.in_flight[address] = self.in_flight.get(address, 0) + 1
+        start = time.perf_counter()
+        try:
+            response = send(_with_server(url, address))
+        finally:
+            with self._lock:
+                self.in_flight[address] -= 1
+        with self._lock:
+            self.latencies.setdefault(endpoint, deque(maxlen=GlobalVariables.hedge_samples)).append(time.perf_counter() - start)
+        return response
+
+    def send(self, send, url):
+        """
+        Sends a read with send(url) to the best server, hedging to the next best if it is slow to answer.
+        Returns the first response, raising only if every server it went to failed.
+        """
+        endpoint = self.endpoint(url)
+        addresses = self.servers_for(url)
+        with self._lock:
+            self.requests += 1
+
+        first = self.executor.submit(self._send_to, send, url, addresses[0], endpoint)
+        done, _ = wait([first], timeout=self.hedge_delay(endpoint))
+        if done or len(addresses) < 2 or not self._may_hedge():
+            return first.result()
+
+        with self._lock:
+            self.hedges += 1
+        second = self.executor.submit(self._send_to, send, url, addresses[1], endpoint)
+        pending = {first, second}
+        error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                if future is second:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return future.result()
+
+        raise error
+
+    def stats(self):
+        """Counters for tuning the hedging settings."""
+        with self._lock:
+            endpoints = list(self.latencies)
+        return {"requests": self.requests, "hedges": self.hedges, "hedge_wins": self.hedge_wins,
+                "hedge_delays": {endpoint: self.hedge_delay(endpoint) for endpoint in endpoints}}
+
+
+def _with_server(url, address):
+    """The same URL on another server."""
+    parts = urlsplit(url)
+    return url if parts.netloc == address else urlunsplit(parts._replace(netloc=address))
+
+
+def _close_response(future):
+    """Hands a slower hedged response's connection back to the pool."""
+    if future.exception() is None:
+        future.result().close()
+
+
+read_balancer = ReadBalancer()  # one for the whole client
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+import GlobalVariables
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    fetched_at: float  # time.time() when the data was downloaded
+    version: Optional[str]  # the server's ETag, or a hash of the body when there isn't one
+
+    def age(self):
+        """Seconds since the entry was fetched."""
+        return time.time() - self.fetched_at
+
+
+def content_version(response):
+    """Uses the response's ETag as its version, falling back to a hash of the body."""
+    etag = response.headers.get("ETag")
+    if etag:
+        return etag
+    return "sha1:" + hashlib.sha1(response.content).hexdigest()
+
+
+def is_etag(version):
+    """Only real ETags can be sent back to the server in If-None-Match."""
+    return bool(version) and not version.startswith("sha1:")
+
+
+class PersistentCache:
+    """
+    Keeps fetched JSON (room lists, combined room info, crime aggregates, routes) in a local SQLite file,
+    so it survives restarts. Each entry records when it was fetched and an ETag-like version.
+    """
+    def __init__(self, path=None):
+        """
+        Opens (or creates) the cache file.
+
+        - path: SQLite file, defaults to GlobalVariables.persistent_cache_path.
+        """
+        self.path = path or GlobalVariables.persistent_cache_path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        """
+        Opens the database on first use, so importing the client never touches the disk.
+        Raises OSError if the cache directory can't be created, callers fall back to no cache as for sqlite3.Error.
+        """
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # shared between the Tk main loop and the background workers, guarded by self._lock
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("""CREATE TABLE IF NOT EXISTS entries (
+                                          namespace TEXT NOT NULL,
+                                          key TEXT NOT NULL,
+                                          value TEXT NOT NULL,
+                                          fetched_at REAL NOT NULL,
+                                          version TEXT,
+                                          PRIMARY KEY (namespace, key))""")
+            self._connection.commit()
+        return self._connection
+
+    def get(self, namespace, key, max_age=None):
+        """
+        Returns the CacheEntry for namespace/key, or None if there isn't one.
+        With max_age (seconds), entries older than that are treated as missing.
+        """
+        entry = self.get_raw(namespace, key, max_age)
+        if entry is None:
+            return None
+        return entry._replace(value=json.loads(entry.value))
+
+    def get_raw(self, namespace, key, max_age=None):
+        """Same as get, but the value is left as the stored JSON text, e.g. for StreamingJson.iter_array."""
+        try:
+            with self._lock:
+                row = self._connect().execute("SELECT value, fetched_at, version FROM entries WHERE namespace = ? AND key = ?",
+                                              (namespace, key)).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Persistent cache unavailable: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        entry = CacheEntry(*row)
+        if max_age is not None and entry.age() > max_age:
+            return None
+        return entry
+
+    def version(self, namespace, key):
+        """Returns just the stored version for namespace/key (None if missing), without loading the value."""
+        try:
+            with self._lock:
+                row = self._connect().execute("SELECT version FROM entries WHERE namespace = ? AND key = ?",
+                                              (namespace, key)).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Persistent cache unavailable: {e}")
+            return None
+
+        return row[0] if row else None
+
+    def set(self, namespace, key, value, version=None, fetched_at=None):
+        """Stores a JSON-serialisable value with its fetch time and version."""
+        self.set_raw(namespace, key, json.dumps(value), version, fetched_at)
+
+    def set_raw(self, namespace, key, body, version=None, fetched_at=None):
+        """Stores a response body that is already JSON (str or bytes) as it is, without decoding and re-encoding it."""
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute("INSERT OR REPLACE INTO entries (namespace, key, value, fetched_at, version) VALUES (?, ?, ?, ?, ?)",
+                                   (namespace, key, body, fetched_at or time.time(), version))
+                connection.commit()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Persistent cache unavailable: {e}")
+
+    def touch(self, namespace, key):
+        """Marks an entry as freshly fetched, e.g. after the server answers 304 Not Modified."""
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute("UPDATE entries SET fetched_at = ? WHERE namespace = ? AND key = ?", (time.time(), namespace, key))
+                connection.commit()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Persistent cache unavailable: {e}")
+
+    def clear(self, namespace=None):
+        """Removes every entry, or only those in one namespace."""
+        with self._lock:
+            connection = self._connect()
+            if namespace is None:
+                connection.execute("DELETE FROM entries")
+            else:
+                connection.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            connection.commit()
+
+    def close(self):
+        """Closes the database file."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+persistent_cache = PersistentCache()  # one file for the whole client
@@ -0,0 +1,189 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+import GlobalVariables
+
+'''
+Retry and circuit breaking for the calls the client makes, per endpoint family (database, weather,
+crime, route), so one slow or dead backend neither gets hammered nor makes every click wait out a
+full timeout. ClientTransport runs every request through the policy for its URL; when the breaker
+is open the request fails straight away with CircuitOpenError, and GlobalDormFunctions shows
+the saved copy instead.
+
+print(status_message())  # e.g. "Weather service unavailable, retrying in 25 s."
+'''
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+RETRY_STATUSES = {429, 502, 503, 504}  # the server or its upstream API is overloaded or down, worth another try
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while a family's breaker is open, handled like a connection failure."""
+
+
+class CircuitBreaker:
+    """
+    Counts consecutive failures of one backend. After failure_threshold of them the breaker opens and calls
+    fail fast; after reset_timeout seconds a single trial call is let through (half-open), which closes it again
+    if it succeeds and reopens it if it doesn't.
+    """
+    def __init__(self, family, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.family = family
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Checks whether a call may be sent now, moving an open breaker to half-open once reset_timeout has passed."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.trial_running = False
+            if self.state == HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = self.clock()
+            self.trial_running = False
+
+    def release(self):
+        """Ends a trial call that neither reached the backend nor failed to, e.g. a malformed URL."""
+        with self._lock:
+            self.trial_running = False
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a trial call through, 0 otherwise."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+
+class ResiliencePolicy:
+    """Capped exponential backoff with full jitter, in front of a circuit breaker, for one endpoint family."""
+    def __init__(self, family, attempts, base_delay, max_delay, failure_threshold, reset_timeout, timeout=None,
+                 sleep=time.sleep, clock=time.monotonic):
+        """
+        Initialises the policy.
+
+        - family: "database", "weather", "crime" or "route", used in messages.
+        - attempts: tries per GET, other methods are tried once since they may not be safe to repeat.
+        - base_delay, max_delay: seconds, the wait before retry n is random between 0 and min(max_delay, base_delay * 2 ** n).
+        - failure_threshold, reset_timeout: see CircuitBreaker.
+        - timeout: (connect, read) timeout for the family, None keeps the transport's default.
+        """
+        self.family = family
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.sleep = sleep
+        self.breaker = CircuitBreaker(family, failure_threshold, reset_timeout, clock)
+        self.retries = 0
+        self.rejected = 0  # calls failed fast by the open breaker
+
+    def backoff(self, attempt):
+        """Seconds to wait before retrying after the given attempt (0 for the first)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, send, retry=True):
+        """
+        Sends a request with send() and returns its response, retrying connection errors, timeouts and
+        RETRY_STATUSES. The last response is returned if it still has a retry status; the last error is raised.
+        Raises CircuitOpenError without sending anything while the breaker is open.
+        """
+        attempts = self.attempts if retry else 1
+        error = None
+
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                if error is not None:
+                    raise error  # opened by this call's own failures, report what actually happened
+                self.rejected += 1
+                raise CircuitOpenError(f"The {self.family} service is unavailable, retrying in {self.breaker.retry_in():.0f} s.")
+
+            try:
+                response = send()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.breaker.record_failure()
+                error = e
+            except Exception:
+                self.breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt + 1 == attempts:
+                    return response
+                response.close()  # hand the connection back before trying again
+
+            if attempt + 1 < attempts:
+                self.retries += 1
+                self.sleep(self.backoff(attempt))
+
+        raise error
+
+
+# one per endpoint family, shared by the whole client
+policies = {family: ResiliencePolicy(family, **settings) for family, settings in GlobalVariables.resilience.items()}
+
+
+def family_for(url):
+    """The endpoint family of a URL, e.g. "weather", or None for URLs outside the server's API."""
+    path = urlparse(url).path
+    for marker, family in GlobalVariables.resilience_paths.items():
+        if marker in path:
+            return family
+    return None
+
+
+def policy_for(url):
+    """The ResiliencePolicy for a URL, or None if requests to it are sent as they are."""
+    family = family_for(url)
+    return policies.get(family) if family else None
+
+
+def reset():
+    """Closes every breaker, e.g. after switching to another server."""
+    for policy in policies.values():
+        policy.breaker.record_success()
+
+
+def breaker_states():
+    """{family: "closed", "open" or "half-open"}, for the UI."""
+    return {family: policy.breaker.state for family, policy in policies.items()}
+
+
+def status_message():
+    """One line per family that is currently failing, "" when every backend is fine."""
+    lines = []
+    for family, policy in policies.items():
+        if policy.breaker.state == OPEN:
+            retry_in = policy.breaker.retry_in()
+            retry = f"retrying in {retry_in:.0f} s" if retry_in else "retrying on the next request"
+            lines.append(f"{family.capitalize()} service unavailable, {retry}.")
+        elif policy.breaker.state == HALF_OPEN:
+            lines.append(f"{family.capitalize()} service recovering...")
+    return "\n".join(lines)
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+import GlobalVariables
+
+_missing = object()
+
+
+def normalise_postcode(postcode):
+    """Upper case with no spaces, so "ng7 2rd" and "NG72RD" share a cache entry."""
+    return postcode.upper().replace(" ", "")
+
+
+class TTLCache:
+    """
+    A size-bounded, least recently used cache whose entries expire after a fixed time to live.
+    Safe to share between the Tk main loop and the background worker threads.
+    """
+    def __init__(self, ttl, maxsize=None, clock=time.monotonic):
+        """
+        Initialises the cache.
+
+        - ttl: seconds an entry stays valid, None keeps entries until they are evicted.
+        - maxsize: entries kept before the least recently used one is evicted.
+        - clock: time source, monotonic so changing the system clock doesn't expire everything.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize or GlobalVariables.cache_size
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (expires_at, value), oldest first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns the cached value, or default if it is missing or has expired."""
+        with self._lock:
+            entry = self.entries.get(key, _missing)
+
+            if entry is not _missing:
+                expires_at, value = entry
+                if expires_at is None or expires_at > self.clock():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Stores a value, evicting the least recently used entries past maxsize."""
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+
+        with self._lock:
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Removes a single entry."""
+        with self._lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Removes every entry, the counters are kept."""
+        with self._lock:
+            self.entries.clear()
+
+    def peek(self, key, default=None):
+        """Returns a live entry like get, without counting a lookup or refreshing its position."""
+        with self._lock:
+            entry = self.entries.get(key, _missing)
+            if entry is not _missing and (entry[0] is None or entry[0] > self.clock()):
+                return entry[1]
+            return default
+
+    def __contains__(self, key):
+        """Checks for a live entry without counting a lookup."""
+        return self.peek(key, _missing) is not _missing
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Returns the hit/miss counters, e.g. for printing while tuning cache sizes."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.entries), "hit_rate": self.hit_rate}
+
+
+# one cache per data type, keyed by normalised postcode(s); crime holds a CrimeHistogram per (postcode, month)
+weather_cache = TTLCache(GlobalVariables.cache_ttls["weather"])
+crime_cache = TTLCache(GlobalVariables.cache_ttls["crime"])
+route_cache = TTLCache(GlobalVariables.cache_ttls["route"])  # routeDistanceModel.RouteSummary per (source, target, mode)
+crime_points_cache = TTLCache(GlobalVariables.cache_ttls["crime"])  # Geospatial.CrimePoints, keyed like crime_cache
+coordinates_cache = TTLCache(None)  # (latitude, longitude) per postcode, postcodes don't move
+# (postcode, details) per room name from /fetchDormRoomCombinedInformation, which includes the weather
+combined_cache = TTLCache(GlobalVariables.cache_ttls["weather"], GlobalVariables.prefetch_cache_size)
+
+# room search results keyed by (room list version, RoomQuery), a new room list version means new keys
+query_results = TTLCache(None)
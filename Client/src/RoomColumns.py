@@ -0,0 +1,119 @@
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, without it filtering stays on RoomIndex
+    np = None
+from RoomQuery import availability_ordinal
+
+'''
+Columnar room filtering with NumPy, for evaluating many filter combinations over the same rooms
+(e.g. the nightly saved-search alerts). Each RoomQuery check is a vectorised mask over every
+room at once, instead of a Python loop per room.
+'''
+
+available = np is not None
+
+LIVE_IN_LANDLORD = 1  # bit positions in RoomColumns.flags
+BILLS_INCLUDED = 2
+BATHROOM_SHARED = 4
+
+
+class RoomColumns:
+    """
+    The roomModel.DormRoom list as NumPy columns: price, shared_with, availability date as days,
+    bit-packed yes/no flags, a city code per room and a room x language matrix.
+    """
+    def __init__(self, rooms, version=None):
+        """
+        Builds the columns.
+
+        - rooms: the roomModel.DormRoomRow (or DormRoom) list from /viewAllDormRooms.
+        - version: identifies the dataset, as for RoomIndex.
+        """
+        if np is None:
+            raise ImportError("RoomColumns needs numpy, use RoomIndex instead.")
+
+        self.rooms = list(rooms)
+        self.names = [room.name for room in self.rooms]
+        self.version = version
+        self.date_errors = []  # (position, error) for rooms whose availability_date doesn't parse
+
+        count = len(self.rooms)
+        self.prices = np.fromiter((float(room.price_per_month_gbp) for room in self.rooms), dtype=np.float64, count=count)
+        self.shared_with = np.fromiter((room.details.shared_with for room in self.rooms), dtype=np.int64, count=count)
+        self.flags = np.fromiter(((LIVE_IN_LANDLORD if room.details.live_in_landlord else 0)
+                                  | (BILLS_INCLUDED if room.details.bills_included else 0)
+                                  | (BATHROOM_SHARED if room.details.bathroom_shared else 0) for room in self.rooms),
+                                 dtype=np.uint8, count=count)
+
+        self.city_codes = {}
+        cities = np.empty(count, dtype=np.int32)
+        self.language_codes = {}
+        room_languages = []
+        availability_days = np.zeros(count, dtype=np.int64)
+
+        for position, room in enumerate(self.rooms):
+            cities[position] = self.city_codes.setdefault(room.location.city.lower(), len(self.city_codes))
+            room_languages.append([self.language_codes.setdefault(language.lower(), len(self.language_codes))
+                                   for language in room.spoken_languages])
+            try:
+                availability_days[position] = availability_ordinal(room.availability_date)
+            except Exception as e:
+                self.date_errors.append((position, e))
+
+        self.cities = cities
+        self.availability_days = availability_days
+        self.languages = np.zeros((count, len(self.language_codes)), dtype=bool)
+        for position, codes in enumerate(room_languages):
+            self.languages[position, codes] = True
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def _flag_mask(self, flag, wanted):
+        """Rooms with a yes/no flag set (wanted=True) or not set (wanted=False)."""
+        if wanted:
+            return (self.flags & flag) != 0
+        return (self.flags & flag) == 0
+
+    def mask(self, query):
+        """Boolean array of the rooms passing every constrained field of a RoomQuery."""
+        passing = np.ones(len(self.rooms), dtype=bool)
+
+        if query.city is not None:
+            code = self.city_codes.get(query.city)
+            if code is None:
+                return np.zeros(len(self.rooms), dtype=bool)
+            passing &= self.cities == code
+        if query.language is not None:
+            code = self.language_codes.get(query.language)
+            if code is None:
+                return np.zeros(len(self.rooms), dtype=bool)
+            passing &= self.languages[:, code]
+
+        for flag, wanted in ((LIVE_IN_LANDLORD, query.live_in_landlord), (BILLS_INCLUDED, query.bills_included),
+                             (BATHROOM_SHARED, query.shared_bathroom)):
+            if wanted is not None:
+                passing &= self._flag_mask(flag, wanted)
+
+        if query.min_price is not None:
+            passing &= self.prices >= query.min_price
+        if query.max_price is not None:
+            passing &= self.prices <= query.max_price
+        if query.max_roommates is not None:
+            passing &= self.shared_with <= query.max_roommates
+        if query.available_from is not None:
+            passing &= self.availability_days <= query.available_from
+
+        return passing
+
+    def filter(self, query):
+        """Same contract as RoomIndex.filter: (matching names in room order, error message)."""
+        if query.available_from is not None and self.date_errors:
+            position, error = self.date_errors[0]
+            return [], f"Error while checking filters for room {self.names[position]}: {error}"
+
+        return [self.names[position] for position in np.flatnonzero(self.mask(query))], None
+
+    def filter_many(self, queries):
+        """Runs filter() for every RoomQuery, e.g. thousands of saved searches in one batch."""
+        return [self.filter(query) for query in queries]
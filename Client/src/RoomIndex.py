@@ -0,0 +1,166 @@
+from bisect import bisect_left, bisect_right
+import RoomColumns
+from RoomQuery import availability_ordinal
+
+'''
+Room filtering with indexes instead of a _room_filter call per room.
+Every filter becomes a bitset over the room positions (bit i set = room i passes),
+and a search is the AND of the bitsets for the filters that are set.
+'''
+
+BLOCK_SIZE = 64  # sorted columns keep a prefix bitset every BLOCK_SIZE entries
+
+
+def _bits_to_positions(bits):
+    """Yields the positions of the set bits, lowest first."""
+    binary = bin(bits)[:1:-1]  # lowest bit first, without the "0b"
+    position = binary.find("1")
+    while position != -1:
+        yield position
+        position = binary.find("1", position + 1)
+
+
+class SortedColumn:
+    """
+    A numeric room field sorted once, answering "value >= x" / "value <= x" as bitsets.
+    Prefix bitsets at every block boundary keep a range query to at most BLOCK_SIZE bit operations.
+    """
+    def __init__(self, values):
+        """values: one number per room position, or None for rooms without a usable value."""
+        order = sorted((position for position, value in enumerate(values) if value is not None), key=lambda position: values[position])
+        self.positions = order
+        self.values = [values[position] for position in order]
+        self.block_prefixes = [0]
+
+        bits = 0
+        for index, position in enumerate(order, start=1):
+            bits |= 1 << position
+            if index % BLOCK_SIZE == 0:
+                self.block_prefixes.append(bits)
+        self.all_bits = bits
+
+    def _prefix(self, count):
+        """Bitset of the first count rooms in sorted order."""
+        block, remainder = divmod(count, BLOCK_SIZE)
+        bits = self.block_prefixes[block]
+        for position in self.positions[block * BLOCK_SIZE:block * BLOCK_SIZE + remainder]:
+            bits |= 1 << position
+        return bits
+
+    def at_most(self, limit):
+        """Rooms whose value is <= limit."""
+        return self._prefix(bisect_right(self.values, limit))
+
+    def at_least(self, limit):
+        """Rooms whose value is >= limit."""
+        return self.all_bits & ~self._prefix(bisect_left(self.values, limit))
+
+
+class RoomIndex:
+    """
+    Indexes for one fetched list of roomModel.DormRoom, built once and reused for every search:
+    sorted price, roommate and availability-date columns, a city hash index, a language inverted
+    index and bitsets for the yes/no fields.
+    """
+    def __init__(self, rooms, version=None):
+        """
+        Builds the indexes.
+
+        - rooms: the roomModel.DormRoomRow (or DormRoom) list from /viewAllDormRooms.
+        - version: identifies the dataset (ETag or body hash), so an unchanged room list isn't re-indexed.
+        """
+        self.rooms = list(rooms)
+        self.names = [room.name for room in self.rooms]
+        self.version = version
+        self.all_rooms = (1 << len(self.rooms)) - 1
+
+        self.cities = {}
+        self.languages = {}
+        self.live_in_landlord = 0
+        self.bills_included = 0
+        self.bathroom_shared = 0
+        self.date_errors = []  # (position, error) for rooms whose availability_date doesn't parse
+        availability_dates = []
+
+        for position, room in enumerate(self.rooms):
+            bit = 1 << position
+            city = room.location.city.lower()
+            self.cities[city] = self.cities.get(city, 0) | bit
+
+            for language in {language.lower() for language in room.spoken_languages}:
+                self.languages[language] = self.languages.get(language, 0) | bit
+
+            if room.details.live_in_landlord:
+                self.live_in_landlord |= bit
+            if room.details.bills_included:
+                self.bills_included |= bit
+            if room.details.bathroom_shared:
+                self.bathroom_shared |= bit
+
+            try:
+                availability_dates.append(availability_ordinal(room.availability_date))
+            except Exception as e:
+                availability_dates.append(None)
+                self.date_errors.append((position, e))
+
+        self.prices = SortedColumn([float(room.price_per_month_gbp) for room in self.rooms])
+        self.shared_with = SortedColumn([room.details.shared_with for room in self.rooms])
+        self.availability_dates = SortedColumn(availability_dates)
+        self._columns = None
+
+    def columns(self):
+        """The same rooms as NumPy columns (RoomColumns), built on first use, None without numpy."""
+        if self._columns is None and RoomColumns.available:
+            self._columns = RoomColumns.RoomColumns(self.rooms, version=self.version)
+        return self._columns
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def _yes_no(self, bits, wanted):
+        """Rooms with a yes/no field set (wanted=True) or not set (wanted=False)."""
+        return bits if wanted else self.all_rooms & ~bits
+
+    def field_bits(self, query):
+        """{field: bitset of the rooms passing that field} for each constrained field of a RoomQuery."""
+        field_bits = {}
+        if query.city is not None:
+            field_bits["city"] = self.cities.get(query.city, 0)
+        if query.language is not None:
+            field_bits["language"] = self.languages.get(query.language, 0)
+        if query.available_from is not None:
+            field_bits["available_from"] = self.availability_dates.at_most(query.available_from)
+        if query.max_roommates is not None:
+            field_bits["max_roommates"] = self.shared_with.at_most(query.max_roommates)
+        if query.max_price is not None:
+            field_bits["max_price"] = self.prices.at_most(query.max_price)
+        if query.min_price is not None:
+            field_bits["min_price"] = self.prices.at_least(query.min_price)
+        if query.live_in_landlord is not None:
+            field_bits["live_in_landlord"] = self._yes_no(self.live_in_landlord, query.live_in_landlord)
+        if query.bills_included is not None:
+            field_bits["bills_included"] = self._yes_no(self.bills_included, query.bills_included)
+        if query.shared_bathroom is not None:
+            field_bits["shared_bathroom"] = self._yes_no(self.bathroom_shared, query.shared_bathroom)
+        return field_bits
+
+    def selectivity(self, query):
+        """{field: number of rooms passing it}, used to order compiled checks most selective first."""
+        return {field: bits.bit_count() for field, bits in self.field_bits(query).items()}
+
+    def filter(self, query):
+        """
+        Runs a RoomQuery, returning (matching names in room order, error message).
+        The bitsets are intersected smallest first, stopping as soon as nothing is left.
+        """
+        if query.available_from is not None and self.date_errors:
+            position, error = self.date_errors[0]
+            return [], f"Error while checking filters for room {self.names[position]}: {error}"
+
+        bits = self.all_rooms
+        for field_bits in sorted(self.field_bits(query).values(), key=int.bit_count):
+            bits &= field_bits
+            if not bits:
+                break
+
+        return [self.names[position] for position in _bits_to_positions(bits)], None
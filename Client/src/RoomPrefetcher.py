@@ -0,0 +1,144 @@
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import GlobalVariables
+from GlobalDormFunctions import SavedResult, fetch_dorm_room_combined_information
+from ResponseCache import combined_cache
+
+'''
+Fetches the combined information (details and weather) for the first rooms of a search in the
+background, so picking one of them from the dropdown shows it straight away instead of waiting
+on /fetchDormRoomCombinedInformation.
+
+prefetcher.prefetch(database_url(), dorm_options)  # when the search results arrive
+prefetcher.cancel()  # when the filters change
+'''
+
+# a small pool of its own, so prefetching never holds up the clicks on the shared BackgroundWorker pool
+executor = ThreadPoolExecutor(max_workers=GlobalVariables.prefetch_threads, thread_name_prefix="globaldorm-prefetch")
+
+
+class RoomPrefetcher:
+    """
+    Prefetches combined room information for the top of the search results into combined_cache.
+    A new search cancels the queued fetches for rooms that are no longer at the top, a filter change
+    cancels them all; fetches already running finish, but are only cached if their room is still wanted.
+    Saved copies shown while the server is down aren't cached, the next selection asks the server again.
+    """
+    def __init__(self, depth=None, fetch=fetch_dorm_room_combined_information, cache=combined_cache):
+        """
+        Initialises the prefetcher.
+
+        - depth: rooms fetched from the top of each result list, defaults to GlobalVariables.prefetch_depth.
+        - fetch: the blocking fetch, called as fetch(database, room_name) and returning (postcode, details).
+        - cache: TTLCache the results go into, keyed by room name.
+        """
+        self.depth = depth if depth is not None else GlobalVariables.prefetch_depth
+        self.fetch = fetch
+        self.cache = cache
+        self.futures = {}  # room name -> future, for the rooms currently being prefetched
+        self.results = []  # room names of the last search, in order, for the ranks of selections
+        self.ranks = Counter()  # position in the results of each selected room, for tuning depth
+        self.hits = 0  # selected room was already fetched
+        self.waits = 0  # selected room was still being fetched, the selection waits for that fetch
+        self.misses = 0
+        self.prefetched = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def prefetch(self, database, room_names):
+        """
+        Starts fetching the first depth rooms of a new result list.
+        Queued fetches for rooms that dropped out of the top are cancelled, running ones for rooms still there are kept.
+        """
+        room_names = list(room_names)
+        wanted = room_names[:self.depth]
+
+        with self._lock:
+            self._cancel(keep=wanted)
+            self.results = room_names
+
+            for room_name in wanted:
+                future = self.futures.get(room_name)
+                if (future is not None and not future.done()) or room_name in self.cache:  # a peek, not counted as a lookup
+                    continue
+                self.futures[room_name] = executor.submit(self._fetch, database, room_name)
+
+    def _fetch(self, database, room_name):
+        """
+        Runs on the prefetch pool, caching the result unless the room has been cancelled since.
+        A result that can't be cached, or an exception, drops its future too, so selecting the room fetches it again.
+        """
+        try:
+            result = self.fetch(database, room_name)
+        except Exception:
+            with self._lock:
+                self.futures.pop(room_name, None)
+            raise
+
+        with self._lock:
+            if room_name in self.futures:
+                if self._cacheable(result):
+                    self.cache.set(room_name, result)
+                    self.prefetched += 1
+                else:
+                    del self.futures[room_name]
+        return result
+
+    def cancel(self):
+        """Cancels every prefetch, e.g. when the filters change and the results are about to."""
+        with self._lock:
+            self._cancel()
+            self.results = []
+
+    def _cancel(self, keep=()):
+        """Drops the prefetches for rooms not in keep, called with the lock held."""
+        for room_name in [room_name for room_name in self.futures if room_name not in keep]:
+            if self.futures.pop(room_name).cancel():
+                self.cancelled += 1
+
+    def lookup(self, room_name):
+        """
+        Returns the prefetched (postcode, details) for a room, or a future when its prefetch is still running.
+        Returns None when it was never prefetched, the caller fetches it with fetch_room.
+        """
+        with self._lock:
+            if room_name in self.results:
+                self.ranks[self.results.index(room_name)] += 1
+
+            result = self.cache.get(room_name)
+            if result is not None:
+                self.hits += 1
+                return result
+
+            future = self.futures.get(room_name)
+            if future is not None and not future.cancelled():
+                self.waits += 1
+                return future
+
+            self.misses += 1
+            return None
+
+    def fetch_room(self, database, room_name):
+        """Fetches a room that wasn't prefetched and caches it, so selecting it again is instant."""
+        result = self.fetch(database, room_name)
+        if self._cacheable(result):
+            self.cache.set(room_name, result)
+        return result
+
+    @staticmethod
+    def _cacheable(result):
+        """Whether a fetch result is fresh from the server, not an error or a saved copy."""
+        return bool(result[0]) and not isinstance(result, SavedResult)
+
+    @property
+    def hit_rate(self):
+        """Share of selections that didn't start a new fetch (already fetched, or being fetched)."""
+        selections = self.hits + self.waits + self.misses
+        return (self.hits + self.waits) / selections if selections else 0.0
+
+    def stats(self):
+        """Counters for tuning depth: ranks shows how far down the results users pick rooms."""
+        return {"depth": self.depth, "hits": self.hits, "waits": self.waits, "misses": self.misses,
+                "hit_rate": self.hit_rate, "prefetched": self.prefetched, "cancelled": self.cancelled,
+                "ranks": dict(sorted(self.ranks.items()))}
@@ -0,0 +1,100 @@
+import datetime
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# yes/no/either dropdown values used by the GUI and the old positional filters
+EITHER = 2
+YES_NO_EITHER = {0: False, 1: True, 2: None}
+
+# fields in the order they are checked when nothing better is known, most selective first
+DEFAULT_ORDER = ("city", "language", "available_from", "max_roommates", "max_price", "min_price",
+                 "live_in_landlord", "bills_included", "shared_bathroom")
+
+
+@lru_cache(maxsize=4096)
+def availability_ordinal(availability_date):
+    """Parses a "YYYY-MM-DD" date into days, each distinct date string is parsed once."""
+    return datetime.datetime.strptime(availability_date, "%Y-%m-%d").toordinal()
+
+
+class RoomQuery(NamedTuple):
+    """
+    A room search, normalised once: prices as floats, city and language lower case, the availability
+    date as days, and None for any field that isn't constrained (including "either").
+    Hashable, so results can be memoised per query for a given room list.
+    """
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    city: Optional[str] = None
+    live_in_landlord: Optional[bool] = None
+    max_roommates: Optional[float] = None
+    bills_included: Optional[bool] = None
+    shared_bathroom: Optional[bool] = None
+    language: Optional[str] = None
+    available_from: Optional[int] = None
+
+    @classmethod
+    def from_filters(cls, min_price, max_price, city, live_in_landlord, max_roommates,
+                     bills_included, shared_bathroom, languages_spoken, available_from):
+        """
+        Builds a query from the nine positional filters SearchAndApplyWindow.select_entries collects
+        (0/1/2 for no/yes/either). Raises ValueError if a value can't be used.
+        """
+        try:
+            return cls(min_price=None if min_price is None else float(min_price),
+                       max_price=None if max_price is None else float(max_price),
+                       city=None if city is None else city.lower(),
+                       live_in_landlord=YES_NO_EITHER[live_in_landlord],
+                       max_roommates=None if max_roommates is None else float(max_roommates),
+                       bills_included=YES_NO_EITHER[bills_included],
+                       shared_bathroom=YES_NO_EITHER[shared_bathroom],
+                       language=None if languages_spoken is None else languages_spoken.lower(),
+                       available_from=None if available_from is None else availability_ordinal(available_from))
+        except KeyError as e:
+            raise ValueError(f"yes/no/either filters must be 0, 1 or 2, not {e}") from None
+        except (TypeError, AttributeError) as e:
+            raise ValueError(str(e)) from None
+
+    def constrained_fields(self):
+        """Names of the fields that actually filter something."""
+        return [field for field in self._fields if getattr(self, field) is not None]
+
+    def compile(self, selectivity=None):
+        """
+        Compiles the query into a single room -> bool function over roomModel.DormRoom.
+        Unconstrained fields are left out. Checks run most selective first: by selectivity
+        ({field: rooms matching}) when given, otherwise by DEFAULT_ORDER.
+        """
+        checks = {}
+        if self.city is not None:
+            checks["city"] = lambda room, city=self.city: room.location.city.lower() == city
+        if self.language is not None:
+            checks["language"] = lambda room, language=self.language: any(spoken.lower() == language for spoken in room.spoken_languages)
+        if self.available_from is not None:
+            checks["available_from"] = lambda room, limit=self.available_from: availability_ordinal(room.availability_date) <= limit
+        if self.max_roommates is not None:
+            checks["max_roommates"] = lambda room, limit=self.max_roommates: room.details.shared_with <= limit
+        if self.max_price is not None:
+            checks["max_price"] = lambda room, limit=self.max_price: room.price_per_month_gbp <= limit
+        if self.min_price is not None:
+            checks["min_price"] = lambda room, limit=self.min_price: room.price_per_month_gbp >= limit
+        if self.live_in_landlord is not None:
+            checks["live_in_landlord"] = lambda room, wanted=self.live_in_landlord: room.details.live_in_landlord == wanted
+        if self.bills_included is not None:
+            checks["bills_included"] = lambda room, wanted=self.bills_included: room.details.bills_included == wanted
+        if self.shared_bathroom is not None:
+            checks["shared_bathroom"] = lambda room, wanted=self.shared_bathroom: room.details.bathroom_shared == wanted
+
+        if selectivity:
+            order = sorted(checks, key=lambda field: selectivity.get(field, float("inf")))
+        else:
+            order = [field for field in DEFAULT_ORDER if field in checks]
+        predicates = tuple(checks[field] for field in order)
+
+        def matches(room):
+            for predicate in predicates:
+                if not predicate(room):
+                    return False
+            return True
+
+        return matches
@@ -1,12 +1,17 @@
 import customtkinter as ctk
-from tkcalendar import Calendar
-from PIL import Image
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from GlobalDormFunctions import fetch_dorm_room_names, add_application,cancel_application, httpJsonCrimeData
-from GlobalDormFunctions import fetch_dorm_room_combined_information, view_room_application_history, httpJsonDistanceData
+from ImageAssets import background_image
+from GlobalDormFunctions import search_dorm_rooms, add_application,cancel_application, httpJsonCrimeData
+from GlobalDormFunctions import view_room_application_history, httpJsonDistanceData
 from GlobalVariables import global_fetch_user, global_authenticate
 from GlobalVariables import database_url, crime_url, distance_url
+from GlobalDormAsync import commute_table
+from model.routeDistanceModel import generateCommuteTable
+from BackgroundWorker import BackgroundWorker
+from Resilience import status_message
+from GlobalVariables import status_poll_interval, background_images
+from RoomPrefetcher import RoomPrefetcher
+from RoomQuery import RoomQuery
+from CrimeChart import CrimeChart
 
 # Positioning of the application is off when switching windows back and forth.
 # ...only when the app is moved though.
@@ -22,6 +27,8 @@ class SearchAndApplyWindow:
         self.window = ctk.CTkToplevel(parent_app.window)
         self.window.title("Global Dorm: Search and Apply for Rooms")
         self.parent = parent_app
+        self.worker = BackgroundWorker(self.window)  # network calls run off the Tk main loop
+        self.prefetcher = RoomPrefetcher()  # details of the top search results, fetched before they are picked
 
         parent_x = self.parent.window.winfo_x()
         parent_y = self.parent.window.winfo_y()
@@ -62,35 +69,56 @@ class SearchAndApplyWindow:
         self.languages_spoken = None
         self.available_from = None
         self.max_roommates = None
+        self.room_query = RoomQuery()  # no filters until "Select" is pressed
         self.selected_dorm_room_postcode = ""
+        self.dorm_options = []  # room names from the last search, for the commute table
         self.entered_location = ""  # line 471
         # self.refine_search() # allows the toggle to control
-        self.canvas = None
+        self.chart = CrimeChart(self.left_frame, figsize=(4, 4), color='#526D82', highlight_max=True, grid=True,
+                                place={"relx": 0.5, "rely": 0.3, "anchor": "center", "relwidth": 0.8, "relheight": 0.5})
         self.create_options_frame()
+        self.create_service_status_label()
+        self.show_last_known_rooms()
         self.window.lift()
         self.window.focus_force()
         self.window.protocol("WM_DELETE_WINDOW", self.close_window)
 
     def add_image_to_left(self):
         """Adds the background image to the left."""
-        home_image = ctk.CTkImage(light_image=Image.open("images/kira-laktionov-ezyhA0jc1oU-unsplash.jpg"),
-                                  dark_image=Image.open("images/kira-laktionov-ezyhA0jc1oU-unsplash.jpg"),
-                                  size=(self.parent.width, self.parent.height))
+        home_image = background_image(background_images["search"], (self.parent.width, self.parent.height), self.window)
 
         home_image_label = ctk.CTkLabel(self.left_frame, text="", image=home_image)
         home_image_label.place(relx=0.5, rely=0.5, anchor="center")
 
     def close_window(self):
         """Closes the current window and quits the parent application."""
-        self.window.destroy()
+        self.destroy()
         self.parent.window.quit()
 
+    def destroy(self):
+        """Destroys the window and cancels its outstanding work, see WindowManager.close_all."""
+        self.worker.stop()
+        self.prefetcher.cancel()
+        self.window.destroy()
+
+    def show(self):
+        """Shows the hidden window again over the main window, with its results as they were left."""
+        parent_x = self.parent.window.winfo_x()
+        parent_y = self.parent.window.winfo_y()
+        self.window.geometry(f"{self.grid_width}x{self.parent.height}+{parent_x}+{parent_y}")
+        self.window.deiconify()
+        self.window.lift()
+        self.window.focus_force()
+        if self.dorm_options:
+            self.prefetcher.prefetch(database_url(), self.dorm_options)  # picks up again where show_main_window left off
+
     def show_main_window(self):
         """
-        Closes the current window and re-displays the main application window.
+        Hides the current window, WindowManager shows it again next time, and re-displays the main application window.
         Repositions the main window if necessary.
         """
-        self.window.destroy()
+        self.prefetcher.cancel()  # nothing is picked while the window is hidden, running searches still finish
+        self.window.withdraw()
         self.parent.window.deiconify()
 
         parent_x = self.parent.window.winfo_x()
@@ -121,14 +149,43 @@ class SearchAndApplyWindow:
         """
         Fetches dorm room names based on current filters and populates the dropdown menu.
         Displays a message indicating success or failure.
+        The search runs in the background, the button shows a loading state until it returns.
         """
-        dorm_options, message = fetch_dorm_room_names(database_url(), self.min_price, self.max_price, self.city, self.live_in_landlord, self.max_roommates,
-                                                      self.bills_included, self.shared_bathroom, self.languages_spoken, self.available_from)
+        self.search_button.configure(text="Searching...", state="disabled")
+        self.worker.submit("search", search_dorm_rooms, database_url(), self.room_query,
+                           on_result=self.show_dorm_options, on_error=self.show_search_error)
 #        dorm_options = fetch_dorm_room_names(database_url())  # room_name=None
+
+    def show_last_known_rooms(self):
+        """
+        Shows the rooms saved from the last session (read from disk in the background, no network),
+        then refreshes them from the server. A search started meanwhile replaces the saved rooms.
+        """
+        def show_saved_rooms(result):
+            dorm_options, _ = result
+            if dorm_options:
+                self.dropdown_menu.configure(values=dorm_options)
+                self.dorm_options = dorm_options
+                self.populate_dropdown()
+
+        # the same key as populate_dropdown, so a search clicked meanwhile makes this result stale
+        self.worker.submit("search", search_dorm_rooms, database_url(), self.room_query, True, on_result=show_saved_rooms)
+
+    def show_dorm_options(self, result):
+        """Fills the dropdown menu with the rooms returned by a background search."""
+        dorm_options, message = result
+        self.search_button.configure(text="Search", state="normal")
         self.dropdown_menu.configure(values=[])
         self.dropdown_menu.configure(values=dorm_options)
+        self.dorm_options = dorm_options
+        self.prefetcher.prefetch(database_url(), dorm_options)
         self.show_secret_message(message)
 
+    def show_search_error(self, error):
+        """Restores the search button after a failed background search."""
+        self.search_button.configure(text="Search", state="normal")
+        self.show_secret_message(f"Search failed: {error}")
+
     def create_username_password_fields(self):
         """Creates input fields for applicant name, password, and confirm password."""
         self.name_label = ctk.CTkLabel(self.right_frame, text="Name:", font=("Helvetica", 16), text_color="#DDE6ED")
@@ -156,14 +213,36 @@ class SearchAndApplyWindow:
         """Updates the dorm details textbox with information for the selected dorm room, including its postcode for other features."""
         selected_room = self.dropdown_var.get()
 
-        postcode, dorm_details = fetch_dorm_room_combined_information(database_url(), selected_room)
+        self.selected_dorm_room_postcode = ""
+        prefetched = self.prefetcher.lookup(selected_room)
+        if isinstance(prefetched, tuple):
+            self.worker.cancel("details")  # an earlier, slower pick mustn't replace this one
+            self.show_room_details(prefetched)
+            return
+
+        self.set_details_text(f"Loading {selected_room}...")
+        if prefetched is not None:  # still being prefetched, wait for that fetch rather than starting another
+            self.worker.submit("details", prefetched.result, on_result=self.show_room_details,
+                               on_error=lambda error: self.set_details_text(f"Error fetching room data: {error}"))
+        else:
+            self.worker.submit("details", self.prefetcher.fetch_room, database_url(), selected_room,
+                               on_result=self.show_room_details,
+                               on_error=lambda error: self.set_details_text(f"Error fetching room data: {error}"))
+
+    def show_room_details(self, result):
+        """Shows the combined room information returned by a background fetch."""
+        postcode, dorm_details = result
         self.selected_dorm_room_postcode = postcode.replace(" ", "")
 
 #        print(self.selected_dorm_room_postcode)  # error with postcode - %20...
 
+        self.set_details_text(dorm_details)
+
+    def set_details_text(self, text):
+        """Replaces the contents of the read-only dorm details textbox."""
         self.dorm_details_textbox.configure(state="normal")
         self.dorm_details_textbox.delete(0.0, ctk.END)
-        self.dorm_details_textbox.insert("0.0", dorm_details)
+        self.dorm_details_textbox.insert("0.0", text)
         self.dorm_details_textbox.configure(state="disabled")
 
     def create_radio_buttons(self):
@@ -232,7 +311,8 @@ class SearchAndApplyWindow:
                 message = "Incorrect passwords, try again."
             else:
                 dorm_name = self.dropdown_var.get()
-                message = add_application(database_url(), dorm_name, applicant_name, global_fetch_user(), password)
+                self.run_action(add_application, database_url(), dorm_name, applicant_name, global_fetch_user(), password)
+                return
 
         self.show_secret_message(message)
 
@@ -253,7 +333,8 @@ class SearchAndApplyWindow:
                 message = "Incorrect passwords, try again."
             else:
                 dorm_name = self.dropdown_var.get()
-                message = cancel_application(database_url(), global_fetch_user(), password, dorm_name, applicant_name)
+                self.run_action(cancel_application, database_url(), global_fetch_user(), password, dorm_name, applicant_name)
+                return
 
         self.show_secret_message(message)
 
@@ -278,13 +359,30 @@ class SearchAndApplyWindow:
             else:
                 dorm_name = self.dropdown_var.get()
                 message = "..."
-                dorm_details = view_room_application_history(database_url(), dorm_name)
+                dorm_details = f"Loading application history for {dorm_name}..."
+                self.run_action(view_room_application_history, database_url(), dorm_name, on_result=self.set_details_text)
                 
-        self.dorm_details_textbox.configure(state="normal")
-        self.dorm_details_textbox.delete(0.0, ctk.END)
-        self.dorm_details_textbox.insert("0.0", dorm_details)
-        self.dorm_details_textbox.configure(state="disabled")
+        self.set_details_text(dorm_details)
         self.show_secret_message(message)
+
+    def run_action(self, function, *args, on_result=None):
+        """
+        Runs an apply, cancel or history request in the background.
+        The action button is disabled until it returns so the same request isn't sent twice.
+        """
+        def finish(result):
+            self.action_button.configure(state="normal")
+            if on_result:
+                on_result(result)
+            elif result:
+                self.show_secret_message(result)
+
+        def failed(error):
+            self.action_button.configure(state="normal")
+            self.show_secret_message(f"Error making request: {error}")
+
+        self.action_button.configure(state="disabled")
+        self.worker.submit("action", function, *args, on_result=finish, on_error=failed)
         
     def refine_search(self):
         """Creates and displays a scrollable frame with various input fields for refining dorm room searches."""
@@ -359,6 +457,7 @@ class SearchAndApplyWindow:
                 self.available_from_label = ctk.CTkLabel(self.search_frame, text=field, font=("Helvetica", 14), text_color="#DDE6ED")
                 self.available_from_label.grid(row=row_index, column=0, padx=10, pady=5, sticky="w")
 
+                from tkcalendar import Calendar  # only when the filters are opened
                 self.calendar = Calendar(self.search_frame, selectmode="day", date_pattern="yyyy-mm-dd", font=("Helvetica", 14),
                                          width=280, height=240)
                 self.calendar.grid(row=row_index + 1, column=0, columnspan=2, padx=10, pady=10, sticky="ew")  # ew is center
@@ -423,6 +522,13 @@ class SearchAndApplyWindow:
 
         available_from_calendar = getattr(self, "calendar", None)
         self.available_from = available_from_calendar.get_date() if available_from_calendar else ""
+
+        self.prefetcher.cancel()  # the results are about to change
+        try:
+            self.room_query = RoomQuery.from_filters(self.min_price, self.max_price, self.city, self.live_in_landlord, self.max_roommates,
+                                                     self.bills_included, self.shared_bathroom, self.languages_spoken, self.available_from)
+        except ValueError as e:
+            self.show_secret_message(f"Error while checking filters: {e}")
         
     def reset_entries(self):
         """Resets all search filter entries to their default (empty or 'Either') states."""
@@ -458,6 +564,9 @@ class SearchAndApplyWindow:
             self.shared_bathroom_dropdown.set("Either")
             self.shared_bathroom = 2
 
+        self.room_query = RoomQuery()
+        self.prefetcher.cancel()
+
     def create_options_frame(self):
         """Creates the options frame with postcode entry and feature toggle switches."""
         self.options_frame = ctk.CTkFrame(self.left_frame, fg_color="#000000", bg_color="#000000",
@@ -529,12 +638,23 @@ class SearchAndApplyWindow:
         Fetches data and updates the chart if activated.
         """
         if self.toggle_vars["crime_data"].get():  # active
-            results_message, crime_data = httpJsonCrimeData(crime_url(), self.selected_dorm_room_postcode)
-            if crime_data:
-                self.update_chart(crime_data)
-                self.show_secret_message(results_message)
+            self.show_secret_message("Loading crime data...")
+            self.worker.submit("crime", httpJsonCrimeData, crime_url(), self.selected_dorm_room_postcode,
+                               on_result=self.show_crime_chart)
         else:
+            self.worker.cancel("crime")
             self.clear_chart()
+
+    def show_crime_chart(self, result):
+        """Draws the crime chart from a background fetch, if the crime toggle is still on."""
+        if result is None:
+            self.show_secret_message("Failed to retrieve crime data.")
+            return
+
+        results_message, crime_data = result
+        if crime_data and self.toggle_vars["crime_data"].get():
+            self.update_chart(crime_data)
+            self.show_secret_message(results_message)
             
     def clear_crime_information(self):
         """Clears displayed crime chart and distance information."""
@@ -559,18 +679,29 @@ class SearchAndApplyWindow:
                 self.distance_frame.place_forget()
                 
     def route_data_message(self):
-        """Fetches and displays route distance information between the entered starting postcode and the selected dorm room postcode."""
-        if not self.entered_location or not self.selected_dorm_room_postcode:
-            self.text_widget.configure(state="normal")
-            self.text_widget.delete("1.0", "end")
-            self.text_widget.insert("1.0", "Please enter a starting location and select a dorm room.")
-            self.text_widget.configure(state="disabled")
+        """
+        Fetches and displays route distance information between the entered starting postcode and the selected dorm room postcode.
+        With no room selected, shows the commute to every room from the last search instead, quickest first.
+        """
+        if self.entered_location and not self.selected_dorm_room_postcode and self.dorm_options:
+            self.set_route_text(f"Calculating routes to {len(self.dorm_options)} rooms...")
+            self.worker.submit("route", commute_table, distance_url(), database_url(), self.entered_location, self.dorm_options,
+                               on_result=lambda rows: self.set_route_text(generateCommuteTable(rows) or "No routes found."),
+                               on_error=lambda error: self.set_route_text(f"Error: {error}"))
+        elif not self.entered_location or not self.selected_dorm_room_postcode:
+            self.set_route_text("Please enter a starting location and select a dorm room.")
         else:
-            route_message = httpJsonDistanceData(distance_url(), self.entered_location, self.selected_dorm_room_postcode) 
-            self.text_widget.configure(state="normal")
-            self.text_widget.delete("1.0", "end")
-            self.text_widget.insert("1.0", route_message)
-            self.text_widget.configure(state="disabled")
+            self.set_route_text("Calculating route...")
+            self.worker.submit("route", httpJsonDistanceData, distance_url(), self.entered_location, self.selected_dorm_room_postcode,
+                               on_result=self.set_route_text,
+                               on_error=lambda error: self.set_route_text(f"Error: {error}"))
+
+    def set_route_text(self, route_message):
+        """Replaces the contents of the read-only route textbox."""
+        self.text_widget.configure(state="normal")
+        self.text_widget.delete("1.0", "end")
+        self.text_widget.insert("1.0", route_message)
+        self.text_widget.configure(state="disabled")
 
     def update_chart(self, crime_data=None):
         """
@@ -579,48 +710,11 @@ class SearchAndApplyWindow:
         """
         if crime_data is None:
             return
-
-        text_size = 10
-        number_text_size = 8
-        count_bar_gap = 0.1
-        bar_width = 0.6
-        layout_padding = 1
-
-        self.clear_chart()
-
-        figure = Figure(figsize=(4, 4), dpi=100)
-        axes = figure.add_subplot(111)
-
-        categories = list(crime_data.keys())
-        counts = list(crime_data.values())
-        max_count = max(counts) if counts else 0
-
-        bars = axes.bar(categories, counts, width=bar_width, zorder=2, color=['red' if count == max_count else '#526D82' for count in counts])
-
-        for bar in bars:
-            height = bar.get_height()
-            axes.text(bar.get_x() + bar.get_width() / 2, height + count_bar_gap, str(height), 
-                      ha='center', va='bottom', fontsize=number_text_size)
-
-        axes.set_xticks(range(len(categories)))
-        axes.set_xticklabels(categories, rotation=90, fontsize=text_size)
-        axes.set_title("Crime Data", fontsize=12, fontweight='bold', pad=5)
-        axes.set_xlabel("Crime Categories", fontsize=text_size, fontweight='bold', labelpad=10)
-        axes.set_ylabel("Counts", fontsize=text_size, fontweight='bold', labelpad=0)
-        axes.grid(zorder=1)
-
-        figure.tight_layout(pad=layout_padding)
-
-        self.canvas = FigureCanvasTkAgg(figure, self.left_frame)
-        canvas_widget = self.canvas.get_tk_widget()
-        canvas_widget.place(relx=0.5, rely=0.3, anchor="center", relwidth=0.8, relheight=0.5)
-        self.canvas.draw()
+        self.chart.show(crime_data)
 
     def clear_chart(self):
-        """Clears any displayed Matplotlib chart."""
-        if self.canvas:
-            self.canvas.get_tk_widget().destroy()
-            self.canvas = None
+        """Hides the crime chart, it is redrawn in place for the next room."""
+        self.chart.clear()
 
     def create_distance_frame(self):
         """Creates the frame and text widget to display commute distance information."""
@@ -639,6 +733,23 @@ class SearchAndApplyWindow:
 #                                       "To achieve the highest marks(Mid 1st to Excep 1st), you must show initiative and inventiveness beyond the stated specification.\n")
         self.text_widget.configure(state="disabled")
 
+    def create_service_status_label(self):
+        """Creates the label that reports unavailable services (open circuit breakers), refreshed every second."""
+        self.service_status_label = ctk.CTkLabel(self.right_frame, text="", font=("Helvetica", 12), text_color="#FFD700",
+                                                 fg_color="transparent")
+        self.service_status_label.place(relx=0.5, rely=0.975, relwidth=0.95, anchor="center")
+        self.update_service_status()
+
+    def update_service_status(self):
+        """Shows Resilience.status_message() while the window is open."""
+        try:
+            if not self.window.winfo_exists():
+                return
+            self.service_status_label.configure(text=status_message())
+            self.window.after(status_poll_interval, self.update_service_status)
+        except Exception:  # window destroyed between the check and the update
+            pass
+
     def show_secret_message(self, message):
         """Displays a temporary feedback message on the right frame."""
         secret_label = ctk.CTkLabel(self.right_frame, text=message, font=("Helvetica", 12),
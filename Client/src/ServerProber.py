@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import GlobalVariables
+import Resilience
+
+'''
+Picks the server the client talks to. A background thread probes every server in
+GlobalVariables.servers, keeps each one's round trip time and error rate, and switches
+GlobalVariables.current_server to the fastest healthy one, failing over as soon as the
+current server stops answering. The transport follows current_server on its next request.
+
+server_prober.start()  # GlobalDormApp, once the window is up
+'''
+
+
+class ServerHealth:
+    """Recent probe results for one server."""
+    def __init__(self, name, address, window=None):
+        """
+        Initialises the record.
+
+        - name, address: a GlobalVariables.servers entry, e.g. "azure", "20.162.251.254:8080".
+        - window: probes the error rate is worked out over, defaults to GlobalVariables.probe_window.
+        """
+        self.name = name
+        self.address = address
+        self.results = deque(maxlen=window or GlobalVariables.probe_window)  # True for a successful probe
+        self.rtts = deque(maxlen=window or GlobalVariables.probe_window)  # seconds, successful probes only
+        self.rtt = None  # exponentially weighted average of rtts
+        self.checked_at = None
+
+    def record(self, ok, rtt=None):
+        self.results.append(ok)
+        self.checked_at = time.monotonic()
+        if ok:
+            self.rtts.append(rtt)
+            self.rtt = rtt if self.rtt is None else self.rtt + GlobalVariables.probe_smoothing * (rtt - self.rtt)
+
+    @property
+    def error_rate(self):
+        return self.results.count(False) / len(self.results) if self.results else 0.0
+
+    @property
+    def healthy(self):
+        """Answered its last probe, and most of the recent ones."""
+        return bool(self.results) and self.results[-1] and self.error_rate <= GlobalVariables.probe_max_error_rate
+
+    def describe(self):
+        """e.g. "azure 48 ms", or "azure down", for the server label."""
+        if not self.results:
+            return self.name
+        if not self.healthy:
+            return f"{self.name} down"
+        return f"{self.name} {self.rtt * 1000:.0f} ms"
+
+
+class ServerProber:
+    """
+    Probes the servers every probe_interval seconds, all at once so one dead server doesn't hold up the others.
+    A switch to a faster server needs it to be switch_margin faster, so two similar servers don't flap;
+    an unhealthy current server is replaced straight away. A server chosen by hand (the "#" button)
+    is kept until it fails.
+    """
+    def __init__(self, servers=None, interval=None, timeout=None, session=None):
+        """
+        Initialises the prober, nothing is sent until start() or probe().
+
+        - servers: {name: address}, defaults to GlobalVariables.servers.
+        - interval: seconds between rounds of probes, defaults to GlobalVariables.probe_interval.
+        - timeout: (connect, read) timeout of a probe, defaults to GlobalVariables.probe_timeout.
+        """
+        self.servers = servers if servers is not None else GlobalVariables.servers
+        self.interval = interval or GlobalVariables.probe_interval
+        self.timeout = timeout or GlobalVariables.probe_timeout
+        self.session = session or requests.Session()  # its own connections, apart from the transport's pool
+        self.health = {name: ServerHealth(name, address) for name, address in self.servers.items()}
+        self.pinned = None  # server chosen by hand
+        self.switches = 0
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=len(self.servers), thread_name_prefix="globaldorm-probe")
+
+    def probe_server(self, health):
+        """Sends one probe; any answer below 500 means the server is up, its time is the round trip time."""
+        start = time.perf_counter()
+        try:
+            response = self.session.head(f"http://{health.address}{GlobalVariables.probe_path}", timeout=self.timeout)
+            ok = response.status_code < 500
+        except requests.exceptions.RequestException:
+            ok = False
+        health.record(ok, time.perf_counter() - start)
+
+    def probe(self):
+        """Probes every server once, then switches server if a better one is available. Returns the chosen name."""
+        list(self._executor.map(self.probe_server, self.health.values()))
+        return self.select()
+
+    def select(self):
+        """Points GlobalVariables.current_server at the best healthy server, returning its name."""
+        current = GlobalVariables.global_fetch_server()
+        candidates = [health for health in self.health.values() if health.healthy]
+        if not candidates:
+            return current  # nothing answers, stay put and let the circuit breakers fail fast
+
+        best = min(candidates, key=lambda health: health.rtt)
+        current_health = self.health.get(current)
+        current_ok = current_health is not None and current_health.healthy
+
+        if current_ok and (self.pinned == current or best.rtt >= current_health.rtt * (1 - GlobalVariables.switch_margin)):
+            return current
+
+        if self.pinned and not current_ok:
+            self.pinned = None  # the server chosen by hand has failed, automatic selection takes over again
+        self.switch(best.name)
+        return best.name
+
+    def switch(self, name):
+        """Makes name the current server; the breakers start afresh since they described the old one."""
+        if GlobalVariables.global_fetch_server() == name:
+            return
+        print(f"Switching server to {name} ({self.health[name].describe()}).")
+        GlobalVariables.change_server(name)
+        Resilience.reset()
+        self.switches += 1
+
+    def pin(self, name):
+        """Chooses a server by hand, it stays current until it fails a probe."""
+        self.pinned = name
+        self.switch(name)
+
+    def probe_now(self):
+        """Wakes the probing thread early, e.g. after a request to the current server failed."""
+        self._wake.set()
+
+    def label(self):
+        """The current server as the label shows it, e.g. "docker 12 ms"."""
+        current = GlobalVariables.global_fetch_server()
+        health = self.health.get(current)
+        return health.describe() if health else str(current)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.probe()
+            except Exception as e:  # keep probing whatever happens, the client still works on the current server
+                print(f"Server probe failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        """Starts probing in a daemon thread."""
+        if self._thread is None and GlobalVariables.auto_select_server:
+            self._thread = threading.Thread(target=self._run, name="globaldorm-prober", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        self._executor.shutdown(wait=False)
+
+
+server_prober = ServerProber()  # one for the whole client
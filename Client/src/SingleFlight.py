@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+import GlobalVariables
+
+'''
+Request coalescing: while a lookup is in flight, identical lookups wait for it instead of
+sending their own request, and every caller gets its result, or its exception. Nothing is kept
+once the call finishes, that is left to the caches in ResponseCache.
+
+histogram = lookups.do(("crime", url, cache_key), _stream_crimes, url, postcode, month, cache_key)
+'''
+
+
+class SingleFlight:
+    """
+    One call per key at a time, shared by every caller that asks while it runs.
+    Threads (the GUI's background workers) and asyncio tasks (GlobalDormAsync) can share the same call.
+    """
+    def __init__(self):
+        self.calls = {}  # key -> Future of the call in flight
+        self.leaders = 0  # calls actually made
+        self.shared = 0  # callers that got another caller's result
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """Returns (future, True) if the caller has to make the call, or the call in flight's (future, False)."""
+        with self._lock:
+            future = self.calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+
+            future = self.calls[key] = Future()
+            future.set_running_or_notify_cancel()  # a cancelled asyncio waiter can't cancel it for the others
+            self.leaders += 1
+            return future, True
+
+    def _lead(self, key, future, function, args, kwargs):
+        """Makes the call and hands its result, or exception, to everyone waiting on it."""
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                # removed only after the result is set, so a caller arriving in between still shares it
+                self.calls.pop(key, None)
+
+    def do(self, key, function, *args, **kwargs):
+        """Calls function(*args, **kwargs), or waits for the identical call already in flight. Blocks the thread."""
+        if not GlobalVariables.coalesce_requests:
+            return function(*args, **kwargs)
+
+        future, leader = self._join(key)
+        if leader:
+            self._lead(key, future, function, args, kwargs)
+        return future.result()
+
+    async def do_async(self, key, function, *args, executor=None):
+        """
+        Async version of do for a blocking function, which runs on a thread of executor (default: the loop's).
+        Waiting doesn't hold a thread.
+        """
+        loop = asyncio.get_running_loop()
+        if not GlobalVariables.coalesce_requests:
+            return await loop.run_in_executor(executor, function, *args)
+
+        future, leader = self._join(key)
+        if leader:
+            await loop.run_in_executor(executor, self._lead, key, future, function, args, {})
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        """Counters for checking how many duplicate calls were saved."""
+        with self._lock:
+            return {"calls": self.leaders, "shared": self.shared, "in_flight": len(self.calls)}
+
+
+lookups = SingleFlight()  # the postcode lookups in GlobalDormFunctions and GlobalDormAsync
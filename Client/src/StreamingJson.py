@@ -0,0 +1,139 @@
+import codecs
+import json
+
+'''
+Incremental JSON parsing for the large responses (/viewAllDormRooms, a month of crime near a
+city centre). Array items are decoded and handed over one at a time while the body is still
+arriving, so only the unparsed tail of the body is ever held, never the whole decoded list.
+
+for crime in iter_array(response.iter_content(CHUNK_SIZE)):
+    ...
+'''
+
+CHUNK_SIZE = 64 * 1024  # bytes read from the socket at a time
+WHITESPACE = " \t\n\r"
+DELIMITERS = WHITESPACE + ",:]}"
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """A rolling text buffer over the body's chunks, already parsed text is dropped as more arrives."""
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()  # characters can be split across chunks
+        self.buffer = ""
+        self.position = 0
+        self.finished = False
+
+    def read_more(self):
+        """Appends the next chunk to the buffer, returns False once the body has run out."""
+        if self.finished:
+            return False
+
+        for chunk in self.chunks:
+            text = chunk if isinstance(chunk, str) else self.utf8.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.position:] + text
+                self.position = 0
+                return True
+
+        self.buffer = self.buffer[self.position:] + self.utf8.decode(b"", final=True)
+        self.position = 0
+        self.finished = True
+        return False
+
+    def peek(self):
+        """Skips whitespace and returns the next character, or "" at the end of the body."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                return ""
+
+    def expect(self, character):
+        """Consumes one structural character, e.g. "[" or ":"."""
+        if self.peek() != character:
+            raise json.JSONDecodeError(f"Expecting '{character}'", self.buffer, self.position)
+        self.position += 1
+
+    def value(self):
+        """Decodes the next complete JSON value, reading more of the body until it is all there."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.finished:
+                    raise
+            else:
+                # a number cut off by the end of a chunk ("1" of "1.5") only counts once a delimiter follows it
+                if self.finished or (end < len(self.buffer) and self.buffer[end] in DELIMITERS):
+                    self.position = end
+                    return value
+            self.read_more()
+
+
+def _items(reader):
+    """Yields the items of the array starting at the reader's position."""
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.position += 1
+        return
+
+    while True:
+        yield reader.value()
+        if reader.peek() == ",":
+            reader.position += 1
+            continue
+        reader.expect("]")
+        return
+
+
+def iter_array(chunks, key=None, extras=None):
+    """
+    Yields the items of a JSON array one at a time, parsing the body as its chunks arrive.
+
+    - chunks: bytes (or str) pieces of the body, e.g. response.iter_content(CHUNK_SIZE) or iter_chunks(body).
+    - key: for {"status": ..., "data": [...]} bodies, the key holding the array; None for a top-level array.
+    - extras: optional dict that collects the object's other keys, e.g. status.
+    """
+    reader = _Reader(chunks)
+
+    if key is None:
+        yield from _items(reader)
+    else:
+        found = False
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.position += 1
+        else:
+            while True:
+                name = reader.value()
+                reader.expect(":")
+                if name == key:
+                    found = True
+                    yield from _items(reader)
+                else:
+                    value = reader.value()
+                    if extras is not None:
+                        extras[name] = value
+                if reader.peek() == ",":
+                    reader.position += 1
+                    continue
+                reader.expect("}")
+                break
+
+        if not found:
+            raise ValueError(f"Missing key '{key}' in the response data.")
+
+    if reader.peek():
+        raise json.JSONDecodeError("Extra data", reader.buffer, reader.position)
+
+
+def iter_chunks(body, size=CHUNK_SIZE):
+    """Splits a body that is already in memory (e.g. a saved copy) into chunks for iter_array."""
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
@@ -1,10 +1,12 @@
 import customtkinter as ctk
 import re  # regex
-from GlobalDormFunctions import httpJsonWeatherData, httpJsonCrimeData, httpJsonDistanceData
+from GlobalDormFunctions import httpJsonWeatherData, httpJsonCrimeData, httpJsonDistanceData, fetch_crime_rings
 from GlobalVariables import weather_url, crime_url, distance_url
-from PIL import Image
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from BackgroundWorker import BackgroundWorker
+from CrimeChart import CrimeChart
+from Resilience import status_message
+from GlobalVariables import status_poll_interval, background_images
+from ImageAssets import background_image
 # import mplcyberpunk
 
 
@@ -26,6 +28,7 @@ class WeatherSafetyCommuteWindow:
         self.window = ctk.CTkToplevel(parent_app.window)
         self.window.title("Global Dorm: Weather - Safety - Commute")
         self.parent = parent_app
+        self.worker = BackgroundWorker(self.window)  # network calls run off the Tk main loop
 
         parent_x = self.parent.window.winfo_x()  # for clarity
         parent_y = self.parent.window.winfo_y()
@@ -50,35 +53,49 @@ class WeatherSafetyCommuteWindow:
         self.create_title()
         self.create_input_fields()
         self.create_buttons()
-        self.canvas = None
+        self.chart = CrimeChart(self.left_frame, figsize=(6, 6), layout_padding=2,
+                                place={"relx": 0.5, "rely": 0.5, "anchor": "center", "relwidth": 0.8})
         self.update_chart() # Initialises chart with no data, effectively clearing it
         self.clear_chart() # Explicitly clears the chart after initialisation
         self.create_results_display()
         self.update_results("") # Sets initial empty text in results box
+        self.create_service_status_label()
         self.window.lift()
         self.window.focus_force()
         self.window.protocol("WM_DELETE_WINDOW", self.close_window)
 
     def add_image_to_left(self):
         """Adds the background image to the left panel."""
-        home_image = ctk.CTkImage(light_image=Image.open("images/pexels-abdullahalmallah-13185437.jpg"),
-                                  dark_image=Image.open("images/pexels-abdullahalmallah-13185437.jpg"),
-                                  size=(self.parent.width, self.parent.height))
+        home_image = background_image(background_images["commute"], (self.parent.width, self.parent.height), self.window)
 
         home_image_label = ctk.CTkLabel(self.left_frame, text="", image=home_image)
         home_image_label.place(relx=0.5, rely=0.5, anchor="center")
 
     def close_window(self):
         """Closes the current window and quits the parent application."""
-        self.window.destroy()
+        self.destroy()
         self.parent.window.quit()
 
+    def destroy(self):
+        """Destroys the window and cancels its outstanding requests, see WindowManager.close_all."""
+        self.worker.stop()
+        self.window.destroy()
+
+    def show(self):
+        """Shows the hidden window again over the main window, with its entries, results and chart as they were left."""
+        parent_x = self.parent.window.winfo_x()
+        parent_y = self.parent.window.winfo_y()
+        self.window.geometry(f"{self.grid_width}x{self.parent.height}+{parent_x}+{parent_y}")
+        self.window.deiconify()
+        self.window.lift()
+        self.window.focus_force()
+
     def show_main_window(self):
         """
-        Closes the current window and re-displays the main application window.
+        Hides the current window, WindowManager shows it again next time, and re-displays the main application window.
         Repositions the main window if necessary.
         """
-        self.window.destroy()
+        self.window.withdraw()
         self.parent.window.deiconify()
 
         parent_x = self.parent.window.winfo_x()
@@ -114,11 +131,9 @@ class WeatherSafetyCommuteWindow:
             self.clear_chart()
 
             if re.match(postcode_pattern, selected_location.upper()):
-                results_message = httpJsonWeatherData(weather_url(), selected_location)
+                self.fetch_results(httpJsonWeatherData, weather_url(), selected_location)
             else:
-                results_message = "Invalid postcode"
-
-            self.update_results(results_message)
+                self.fetch_results(None, "Invalid postcode")
 
         self.weather_information_button = ctk.CTkButton(self.right_frame, text="Weather", command=get_weather_information, font=("Helvetica", 16),
                                                         text_color="#DDE6ED", fg_color="#526D82", hover_color="#9DB2BF")
@@ -131,15 +146,29 @@ class WeatherSafetyCommuteWindow:
             """
             selected_location = self.end_entry.get()
 
-            if re.match(postcode_pattern, selected_location.upper()):
-                results_message, crime_data = httpJsonCrimeData(crime_url(), selected_location)
-            else:
-                results_message, crime_data = "Invalid postcode", None
+            def show_safety_information(result):
+                if result is None:
+                    self.update_results("Failed to retrieve crime data.")
+                    return
+
+                results_message, crime_data = result
+                self.update_results(results_message)
 
-            self.update_results(results_message)
+                if crime_data:
+                    self.update_chart(crime_data)
 
-            if crime_data:
-                self.update_chart(crime_data)
+                # the crimes are cached by now, only the postcode's coordinates may need fetching
+                self.worker.submit("results", fetch_crime_rings, crime_url(), selected_location,
+                                   on_result=lambda rings: show_crime_rings(results_message, rings))
+
+            def show_crime_rings(results_message, rings):
+                if rings is not None:
+                    self.update_results(f"{results_message}\n{rings.summary()}")
+
+            if re.match(postcode_pattern, selected_location.upper()):
+                self.fetch_results(httpJsonCrimeData, crime_url(), selected_location, on_result=show_safety_information)
+            else:
+                self.fetch_results(None, "Invalid postcode")
 
         self.safety_information_button = ctk.CTkButton(self.right_frame, text="Safety", command=get_safety_information, font=("Helvetica", 16),
                                                        text_color="#DDE6ED", fg_color="#526D82", hover_color="#9DB2BF")
@@ -153,7 +182,8 @@ class WeatherSafetyCommuteWindow:
 
             if start_location and end_location:
                 if re.match(postcode_pattern, start_location.upper()) and re.match(postcode_pattern, end_location.upper()):
-                    results_message = httpJsonDistanceData(distance_url(), start_location, end_location)
+                    self.fetch_results(httpJsonDistanceData, distance_url(), start_location, end_location)
+                    return
                 else:
                     results_message = "Invalid postcode(s) entered.\nNo spaces allowed!"
             elif not start_location and not end_location:
@@ -161,70 +191,57 @@ class WeatherSafetyCommuteWindow:
             else:
                 results_message = "One of the locations is missing. Please complete both fields.\n"
 
-            self.update_results(results_message)
+            self.fetch_results(None, results_message)
 
         self.commute_information_button = ctk.CTkButton(self.right_frame, text="Commute", command=get_commute_information, font=("Helvetica", 18),
                                                         text_color="#DDE6ED", fg_color="#526D82", hover_color="#9DB2BF")
         self.commute_information_button.place(relx=0.5, rely=0.59, relwidth=0.6, anchor="center")
 
-        def show_main_window():
-            """Returns to the main application window."""
-            self.window.destroy()
-            self.parent.window.deiconify()
-
-            parent_x = self.parent.window.winfo_x()
-            parent_y = self.parent.window.winfo_y()
-
-            self.parent.window.geometry(f"{self.grid_width}x{self.parent.height}+{parent_x}+{parent_y}")
-
-        self.back_button = ctk.CTkButton(self.right_frame, text="Home", command=show_main_window, font=("Helvetica", 18),
+        self.back_button = ctk.CTkButton(self.right_frame, text="Home", command=self.show_main_window, font=("Helvetica", 18),
                                          text_color="#DDE6ED", fg_color="#526D82", hover_color="#9DB2BF")
         self.back_button.place(relx=0.5, rely=0.92, relwidth=0.6, anchor="center")
 
+    def fetch_results(self, function, *args, on_result=None):
+        """
+        Runs a weather, safety or commute lookup in the background and shows a loading message meanwhile.
+        All three share the results box, so a new click replaces any lookup still running.
+        With no function, the first argument is shown straight away (e.g. validation messages).
+        """
+        if function is None:
+            self.worker.cancel("results")
+            self.update_results(args[0])
+            return
+
+        self.update_results("Loading...")
+        self.worker.submit("results", function, *args, on_result=on_result or self.update_results,
+                           on_error=lambda error: self.update_results(f"Error: {error}"))
+
+    def create_service_status_label(self):
+        """Creates the label that reports unavailable services (open circuit breakers), refreshed every second."""
+        self.service_status_label = ctk.CTkLabel(self.right_frame, text="", font=("Helvetica", 12), text_color="#FFD700",
+                                                 fg_color="transparent")
+        self.service_status_label.place(relx=0.5, rely=0.975, relwidth=0.95, anchor="center")
+        self.update_service_status()
+
+    def update_service_status(self):
+        """Shows Resilience.status_message() while the window is open."""
+        try:
+            if not self.window.winfo_exists():
+                return
+            self.service_status_label.configure(text=status_message())
+            self.window.after(status_poll_interval, self.update_service_status)
+        except Exception:  # window destroyed between the check and the update
+            pass
+
     def update_chart(self, crime_data=None):
         """Updates or creates a bar chart displaying crime category counts."""
         if crime_data is None:
             return
-
-        text_size = 10
-        number_text_size = 8
-        count_bar_gap = 0.1
-        bar_width = 0.6
-        layout_padding = 2
-
-        self.clear_chart()
-
-        figure = Figure(figsize=(6, 6), dpi=100)
-        axes = figure.add_subplot(111)
-
-        categories = list(crime_data.keys())
-        counts = list(crime_data.values())
-
-        bars = axes.bar(categories, counts, width=bar_width, zorder=2)
-
-        axes.set_xticks(range(len(categories)))
-        axes.set_xticklabels(categories, rotation=90, fontsize=text_size)
-
-        for bar in bars:
-            height = bar.get_height()
-            axes.text(bar.get_x() + bar.get_width() / 2, height + count_bar_gap, str(height), ha='center', va='bottom', fontsize=number_text_size)
-
-        axes.set_title("Crime Data", fontsize=12, fontweight='bold', pad=5)
-        axes.set_xlabel("Crime Categories", fontsize=text_size, fontweight='bold', labelpad=10)
-        axes.set_ylabel("Counts", fontsize=text_size, fontweight='bold', labelpad=0)
-
-        figure.tight_layout(pad=layout_padding)
-
-        self.canvas = FigureCanvasTkAgg(figure, self.left_frame)
-        canvas_widget = self.canvas.get_tk_widget()
-        canvas_widget.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.8)
-        self.canvas.draw()
+        self.chart.show(crime_data)
 
     def clear_chart(self):
-        """Clears any displayed Matplotlib chart."""
-        if self.canvas:
-            self.canvas.get_tk_widget().destroy()
-            self.canvas = None
+        """Hides the crime chart, it is redrawn in place for the next postcode."""
+        self.chart.clear()
 
     def create_results_display(self):
         """Creates a read-only text box to display results messages."""
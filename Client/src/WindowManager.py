@@ -0,0 +1,43 @@
+'''
+Keeps the secondary windows (Search and Apply, Weather - Safety - Commute) alive between visits.
+Each is built the first time it is opened; "Home" only hides it, and opening it again shows the
+same window with its search results, chart and cached data as they were left.
+
+self.windows.show("search", SearchAndApplyWindow)  # GlobalDormApp's buttons
+'''
+
+
+class WindowManager:
+    """One instance of each secondary window, hidden and shown instead of destroyed and rebuilt."""
+    def __init__(self, parent_app):
+        """
+        Initialises the manager.
+
+        - parent_app: the GlobalDormApp, hidden while a secondary window is showing.
+        """
+        self.parent = parent_app
+        self.windows = {}  # name -> window object, e.g. "search" -> SearchAndApplyWindow
+        self.created = 0
+        self.reused = 0
+
+    def show(self, name, window_class):
+        """Shows the window called name, building it with window_class(parent_app) if it isn't open yet."""
+        window = self.windows.get(name)
+        if window is not None and window.window.winfo_exists():
+            window.show()
+            self.reused += 1
+        else:
+            window = self.windows[name] = window_class(self.parent)
+            self.created += 1
+        self.parent.window.withdraw()
+        return window
+
+    def close_all(self):
+        """Destroys every window, e.g. on logout so the next user doesn't see the last one's searches."""
+        for window in self.windows.values():
+            if window.window.winfo_exists():
+                window.destroy()
+        self.windows.clear()
+
+    def stats(self):
+        return {"open": len(self.windows), "created": self.created, "reused": self.reused}
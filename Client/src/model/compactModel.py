@@ -0,0 +1,44 @@
+from itertools import islice
+from typing import List
+from pydantic import TypeAdapter, ValidationError
+
+# compact records for the models that arrive in bulk (rooms, crimes): __slots__ dataclasses
+# validated a whole batch at a time, instead of one pydantic model per record
+
+
+class BulkValidator:
+    """
+    Validates batches of JSON records into slot-based rows with a single pydantic call per batch.
+    The row classes mirror the pydantic models field for field, so values are coerced the same way;
+    a batch with a bad record is re-checked with the model itself, so the error raised is unchanged.
+    """
+    def __init__(self, row, model, batch_size=1000):
+        """
+        Compiles the schema once.
+
+        - row: the @dataclass(slots=True) record class.
+        - model: the pydantic model it mirrors, used to raise the original error for malformed records.
+        - batch_size: records validated per call by validate_stream.
+        """
+        self.row = row
+        self.model = model
+        self.batch_size = batch_size
+        self.adapter = TypeAdapter(List[row])
+
+    def validate(self, records):
+        """Returns a list of rows, raising the model's ValidationError (or TypeError) for the first malformed record."""
+        try:
+            return self.adapter.validate_python(records)
+        except ValidationError:
+            for record in records:
+                self.model(**record)
+            raise
+
+    def validate_stream(self, records):
+        """Yields rows from an iterable of records (e.g. StreamingJson.iter_array), one batch at a time."""
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                return
+            yield from self.validate(batch)
@@ -1,5 +1,7 @@
+from dataclasses import dataclass
 from pydantic import BaseModel as parse_json
 from typing import Optional
+from model.compactModel import BulkValidator
 
 
 class Street(parse_json):
@@ -19,3 +21,29 @@ class CrimeRecord(parse_json):
     context: Optional[str]
     id: int
     month: str
+
+
+# compact versions of the models above, for the thousands of crimes per postcode
+@dataclass(slots=True)
+class StreetRow:
+    id: int
+    name: str
+
+
+@dataclass(slots=True)
+class LocationRow:
+    latitude: str
+    longitude: str
+    street: StreetRow
+
+
+@dataclass(slots=True)
+class CrimeRecordRow:
+    category: str
+    location: LocationRow
+    context: Optional[str]
+    id: int
+    month: str
+
+
+crime_records = BulkValidator(CrimeRecordRow, CrimeRecord)
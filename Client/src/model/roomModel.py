@@ -1,5 +1,7 @@
 from pydantic import BaseModel as parse_json  # no default feature for deserialisation in python?
-from typing import List
+from typing import List, NamedTuple, Optional
+from dataclasses import dataclass
+from model.compactModel import BulkValidator
 
 
 class Location(parse_json):
@@ -31,3 +33,48 @@ class DormRoom(parse_json):
 class Response(parse_json):
     status: str
     data: List[DormRoom]
+
+
+# compact versions of the models above, for the full /viewAllDormRooms list
+@dataclass(slots=True)
+class LocationRow:
+    city: str
+    county: str
+    postcode: str
+
+
+@dataclass(slots=True)
+class DetailsRow:
+    furnished: bool
+    amenities: List[str]
+    live_in_landlord: bool
+    shared_with: int
+    bills_included: bool
+    bathroom_shared: bool
+
+
+@dataclass(slots=True)
+class DormRoomRow:
+    id: int
+    name: str
+    location: LocationRow
+    details: DetailsRow
+    price_per_month_gbp: int
+    availability_date: str
+    spoken_languages: List[str]
+    is_available: bool
+
+
+@dataclass(slots=True)
+class ResponseRow:
+    status: str
+    data: List[DormRoomRow]
+
+
+dorm_rooms = BulkValidator(DormRoomRow, DormRoom)
+
+
+class RoomSearch(NamedTuple):
+    rooms: List[str]  # names of the matching rooms
+    message: str  # what the Search and Apply window shows
+    error: Optional[str]  # None unless the search couldn't run, e.g. the room list couldn't be fetched
@@ -1,6 +1,6 @@
 import random
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 
 
 class Leg(BaseModel):
@@ -45,6 +45,33 @@ def generateRouteMessage(sourcePostcode, targetPostcode, duration, distance, way
             f"{friendly_message}")
 
 
+class RouteSummary(NamedTuple):
+    source: str  # normalised postcodes
+    target: str
+    mode: str
+    duration: float  # seconds
+    distance: float  # metres
+    message: str  # generateRouteMessage's text
+
+
+class CommuteRow(NamedTuple):
+    name: str  # room name, or the postcode when routing to bare postcodes
+    postcode: str
+    route: Optional[RouteSummary]  # None if the route couldn't be fetched
+    message: str  # the route message, or the error
+
+
+def generateCommuteTable(rows):
+    lines = []
+    for row in rows:
+        if row.route is None:
+            lines.append(f"{row.name} ({row.postcode.upper()}): {row.message}")
+        else:
+            lines.append(f"{row.name} ({row.postcode.upper()}): about {row.route.duration / 60:.0f} minutes, "
+                         f"{row.route.distance / 1600:.2f} miles")
+    return "\n".join(lines)
+
+
 '''
 {
   "code": "Ok",
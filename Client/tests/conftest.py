@@ -0,0 +1,41 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+# the client's modules import each other flat, as they do when run from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers GETs with the JSON registered for their path (query string included), 404 otherwise."""
+    protocol_version = "HTTP/1.1"  # keep-alive, so tests can see connections being reused
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address[1]))
+        payload = self.server.routes.get(self.path)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b"{}"
+        self.send_response(200 if payload is not None else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    """A local server on a free port; set .routes to {path: payload}, .requests records (path, client port)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.routes = {}
+    server.requests = []
+    server.address = f"127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
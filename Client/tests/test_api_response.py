@@ -0,0 +1,45 @@
+import json
+import pytest
+import GlobalDormFunctions
+import GlobalVariables
+import JsonCodec
+from GlobalDormTransport import ApiResponse
+
+
+@pytest.mark.parametrize("body", [b"", b"[]", b"{}", b"null", b'""', b"0", b"false", b"  [ ]\n", b"{ }"])
+def test_empty_bodies_are_recognised_without_parsing(body, monkeypatch):
+    monkeypatch.setattr(JsonCodec, "loads", lambda content: pytest.fail("parsed an empty body"))
+    assert ApiResponse(body).is_empty
+
+
+@pytest.mark.parametrize("body", [b"[1]", b'{"a": 1}', b"1", b"true", b'"x"', b'[{"weather": "Rain", "temp_max": 12}]'])
+def test_bodies_with_content_are_not_empty(body):
+    assert not ApiResponse(body).is_empty
+
+
+def test_body_is_parsed_once_on_first_use(monkeypatch):
+    parses = []
+    loads = JsonCodec.loads
+    monkeypatch.setattr(JsonCodec, "loads", lambda content: parses.append(content) or loads(content))
+
+    response = ApiResponse(b'[{"weather": "Rain"}]')
+    assert not parses
+    assert response.data == [{"weather": "Rain"}]
+    assert response.data[0]["weather"] == "Rain"
+    assert len(parses) == 1
+
+
+def test_pretty_and_errors():
+    assert ApiResponse(b'{"a": 1}').pretty() == json.dumps({"a": 1}, indent=4)
+    with pytest.raises(ValueError):
+        ApiResponse(b"<html>Bad gateway</html>").data
+
+
+def test_get_data_skips_empty_responses(stand_in_server, monkeypatch):
+    monkeypatch.setattr(GlobalVariables, "current_server", stand_in_server.address)
+    stand_in_server.routes = {"/weather?postcode=NG72RD": [{"weather": "Rain"}], "/weather?postcode=XX": []}
+    base = f"http://{stand_in_server.address}/weather?postcode="
+
+    result = GlobalDormFunctions.getData(base, "NG72RD")
+    assert isinstance(result, ApiResponse) and result.data == [{"weather": "Rain"}]
+    assert GlobalDormFunctions.getData(base, "XX") is None
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+import GlobalDormAsync
+import GlobalDormFunctions
+
+
+def test_gather_limited_keeps_order_and_limit():
+    running = []
+    peak = []
+
+    async def lookup(value, delay):
+        running.append(value)
+        peak.append(len(running))
+        await asyncio.sleep(delay)
+        running.remove(value)
+        return value * 10
+
+    arguments = [(value, 0.02 if value % 2 else 0.001) for value in range(12)]
+    results = asyncio.run(GlobalDormAsync.gather_limited(lookup, arguments, 3))
+    assert results == [value * 10 for value in range(12)]
+    assert max(peak) == 3
+
+
+def test_async_calls_return_what_the_sync_functions_return(monkeypatch):
+    monkeypatch.setattr(GlobalDormFunctions, "httpJsonWeatherData", lambda url, postcode: f"weather for {postcode}")
+    monkeypatch.setattr(GlobalDormFunctions, "view_room_application_history", lambda database, room: f"history of {room}")
+
+    async def main():
+        weather = await GlobalDormAsync.weather_for_postcodes("url", ["NG7 2RD", "NG1 5FS", "NG7 2RD"])
+        history = await GlobalDormAsync.application_history_for_rooms("db", ["Quiet Room"])
+        return weather, history
+
+    weather, history = asyncio.run(main())
+    assert weather == {"NG7 2RD": "weather for NG7 2RD", "NG1 5FS": "weather for NG1 5FS"}
+    assert history == {"Quiet Room": "history of Quiet Room"}
+
+
+def test_lookups_run_concurrently_off_the_event_loop_thread(monkeypatch):
+    threads = []
+    both_running = threading.Barrier(2, timeout=5)  # only passes if two lookups are running at once
+
+    def weather(url, postcode):
+        threads.append(threading.get_ident())
+        both_running.wait()
+        return postcode
+
+    monkeypatch.setattr(GlobalDormFunctions, "httpJsonWeatherData", weather)
+
+    async def main():
+        return threading.get_ident(), await GlobalDormAsync.gather_limited(GlobalDormAsync.httpJsonWeatherData,
+                                                                           [("url", "NG1"), ("url", "NG7")], 2)
+
+    loop_thread, results = asyncio.run(main())
+    assert results == ["NG1", "NG7"]
+    assert loop_thread not in threads
+
+
+def test_identical_lookups_in_flight_are_made_once(monkeypatch):
+    calls = []
+
+    def slow_weather(url, postcode):
+        calls.append(postcode)
+        time.sleep(0.05)
+        return postcode
+
+    monkeypatch.setattr(GlobalDormFunctions, "httpJsonWeatherData", slow_weather)
+    results = asyncio.run(GlobalDormAsync.gather_limited(GlobalDormAsync.httpJsonWeatherData, [("url", "NG7 2RD")] * 4, 4))
+    assert results == ["NG7 2RD"] * 4
+    assert calls == ["NG7 2RD"]
+
+
+def test_limit_is_reached_beyond_the_default_executor(monkeypatch):
+    limit = 40  # more than the default executor's min(32, cpus + 4) threads
+    all_running = threading.Barrier(limit, timeout=5)  # only passes if every lookup is running at once
+
+    def weather(url, postcode):
+        all_running.wait()
+        return postcode
+
+    monkeypatch.setattr(GlobalDormFunctions, "httpJsonWeatherData", weather)
+    postcodes = [f"TE{number} 1AA" for number in range(limit)]
+    results = asyncio.run(GlobalDormAsync.gather_limited(GlobalDormAsync.httpJsonWeatherData,
+                                                         [("url", postcode) for postcode in postcodes], limit))
+    assert results == postcodes
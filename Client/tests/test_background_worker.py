@@ -0,0 +1,73 @@
+import threading
+from BackgroundWorker import BackgroundWorker
+
+
+class Window:
+    """Stands in for the Tk window: after() callbacks are queued and run by pump(), as the main loop would."""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, milliseconds, callback):
+        self.scheduled.append(callback)
+
+    def pump(self):
+        """Runs the polling loop until every job has been delivered."""
+        for _ in range(1000):
+            if not self.scheduled:
+                return
+            threading.Event().wait(0.002)
+            self.scheduled.pop(0)()
+        raise AssertionError("results never arrived")
+
+
+def test_results_are_delivered_on_the_polling_loop():
+    window = Window()
+    worker = BackgroundWorker(window)
+    results = []
+    worker.submit("search", lambda: ["Room 1"], on_result=results.append)
+    window.pump()
+    assert results == [["Room 1"]]
+    assert not worker.polling and worker.pending == 0
+
+
+def test_errors_go_to_on_error():
+    window = Window()
+    worker = BackgroundWorker(window)
+    errors = []
+
+    def fail():
+        raise ValueError("server down")
+
+    worker.submit("search", fail, on_error=errors.append)
+    window.pump()
+    assert [str(error) for error in errors] == ["server down"]
+
+
+def test_resubmitting_a_key_drops_the_older_result():
+    window = Window()
+    worker = BackgroundWorker(window)
+    release = threading.Event()
+    results = []
+    worker.submit("details", lambda: release.wait(5) and "old", on_result=results.append)
+    worker.submit("details", lambda: "new", on_result=results.append)
+    release.set()
+    window.pump()
+    assert results == ["new"]
+
+
+def test_a_failing_callback_does_not_stop_later_results(capsys):
+    window = Window()
+    worker = BackgroundWorker(window)
+
+    def broken(result):
+        raise RuntimeError("bad widget")
+
+    worker.submit("crime", lambda: 1, on_result=broken)
+    window.pump()
+    assert "bad widget" in capsys.readouterr().out
+    assert not worker.polling
+
+    results = []
+    worker.submit("crime", lambda: 2, on_result=results.append)
+    window.pump()
+    assert results == [2]
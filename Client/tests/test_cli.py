@@ -0,0 +1,68 @@
+import json
+from io import StringIO
+import pytest
+import GlobalDormCLI
+import GlobalDormFunctions
+import GlobalVariables
+from PersistentCache import PersistentCache
+
+ROOM = {"id": 1, "name": "Quiet Room", "location": {"city": "Nottingham", "county": "Notts", "postcode": "NG7 2RD"},
+        "details": {"furnished": True, "amenities": [], "live_in_landlord": False, "shared_with": 1,
+                    "bills_included": True, "bathroom_shared": False},
+        "price_per_month_gbp": 500, "availability_date": "2025-01-01", "spoken_languages": ["English"], "is_available": True}
+
+
+@pytest.fixture
+def saved_rooms(monkeypatch):
+    """An in-memory persistent cache, which --fresh keeps using, holding nothing until a test saves a room list."""
+    cache = PersistentCache(":memory:")
+    monkeypatch.setattr(GlobalDormFunctions, "persistent_cache", cache)
+    monkeypatch.setattr(GlobalDormCLI, "PersistentCache", lambda path: cache)
+
+    def save():
+        cache.set_raw("rooms", f"{GlobalVariables.database_url()}/viewAllDormRooms",
+                      json.dumps({"status": "success", "data": [ROOM]}).encode(), version="sha1:1")
+    return save
+
+
+def run(capsys, *argv):
+    code = GlobalDormCLI.main(["--fresh", *argv])
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_offline_search_without_saved_rooms_fails(saved_rooms, capsys):
+    code, rows = run(capsys, "search", "--offline")
+    assert code == 1
+    assert rows[0]["error"] == "No saved rooms yet."
+
+
+def test_offline_search_of_saved_rooms(saved_rooms, capsys):
+    saved_rooms()
+    code, rows = run(capsys, "search", "--offline", "--city", "Nottingham")
+    assert code == 0
+    assert rows == [{"city": "Nottingham", "count": 1, "rooms": ["Quiet Room"], "message": "Rooms updated."}]
+
+
+def test_no_matches_is_not_an_error(saved_rooms, capsys):
+    saved_rooms()
+    code, rows = run(capsys, "search", "--offline", "--city", "Leeds")
+    assert code == 0 and rows[0]["count"] == 0 and "error" not in rows[0]
+
+
+def test_bad_input_exits_with_2(saved_rooms, capsys):
+    assert GlobalDormCLI.main(["--fresh", "weather"]) == 2
+    assert "no postcodes given" in capsys.readouterr().err
+
+
+def test_csv_output_joins_lists():
+    stream = StringIO()
+    GlobalDormCLI.write_rows([{"city": "Nottingham", "rooms": ["A", "B"]}, {"error": "Failed"}], "csv", stream)
+    assert stream.getvalue().splitlines() == ["city,rooms,error", "Nottingham,A; B,", ",,Failed"]
+
+
+def test_failed_lookup_keeps_stdout_parseable(saved_rooms, stand_in_server, monkeypatch, capsys):
+    monkeypatch.setattr(GlobalVariables, "current_server", stand_in_server.address)  # no routes, every lookup 404s
+    code, rows = run(capsys, "weather", "TE5 7AA")
+    assert code == 1
+    assert rows == [{"postcode": "TE5 7AA", "weather": "Failed to retrieve weather data.",
+                     "error": "Failed to retrieve weather data."}]
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+'''
+The home screen's imports, checked in a fresh interpreter so modules the test run has already
+loaded don't hide a heavy import GlobalDormApp picked up again.
+'''
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# not needed until a window, a lookup or a notification needs them, see GlobalDormApp.warm_up
+HEAVY = ("numpy", "matplotlib", "tkcalendar", "pika", "pydantic", "msgspec", "orjson",
+         "GlobalDormFunctions", "JsonCodec", "SearchAndApplyWindow", "WeatherSafetyCommuteWindow", "RabbitPushNotifications")
+
+
+def loaded_modules(module):
+    script = f"import sys\nimport {module}\nprint(*sorted(sys.modules))"
+    output = subprocess.run([sys.executable, "-c", script], cwd=SRC, capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+def test_home_screen_leaves_heavy_modules_unloaded():
+    loaded = loaded_modules("GlobalDormApp")
+    assert "GlobalDormApp" in loaded
+    assert not [module for module in HEAVY if module in loaded]
+
+
+def test_functions_load_the_deferred_modules():
+    # a renamed module would make the check above pass for the wrong reason
+    loaded = loaded_modules("GlobalDormFunctions")
+    assert {"GlobalDormFunctions", "JsonCodec", "pydantic"} <= loaded
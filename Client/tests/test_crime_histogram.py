@@ -0,0 +1,44 @@
+import json
+from types import SimpleNamespace
+from CrimeHistogram import HIGHEST_RISK, CrimeHistogram
+
+
+def crime(category, month="2024-10", street="On or near Derby Road"):
+    return SimpleNamespace(category=category, month=month, location=SimpleNamespace(street=SimpleNamespace(name=street)))
+
+
+def test_counts_categories_months_and_streets():
+    histogram = CrimeHistogram.from_records(iter([crime("burglary"), crime("drugs", street="On or near Castle Boulevard"),
+                                                  crime("burglary", month="2024-11")]))
+    assert histogram.total == len(histogram) == 3
+    assert histogram.category_counts() == {"burglary": 2, "drugs": 1}
+    assert histogram.months == {"2024-10": 2, "2024-11": 1}
+    assert histogram.top_streets(1) == [("On or near Derby Road", 2)]
+
+
+def test_merge_adds_counts_without_changing_the_inputs():
+    october = CrimeHistogram.from_records([crime("burglary"), crime("drugs")])
+    november = CrimeHistogram.from_records([crime("burglary", month="2024-11")])
+    merged = CrimeHistogram.merge(october, november)
+    assert merged.category_counts() == {"burglary": 2, "drugs": 1}
+    assert (october + november).category_counts() == merged.category_counts()
+    assert october.total == 2 and november.total == 1
+    assert CrimeHistogram.merge().total == 0
+
+
+def test_json_round_trip():
+    histogram = CrimeHistogram.from_records([crime("burglary"), crime("drugs", month="2024-11")])
+    restored = CrimeHistogram.from_json(json.loads(json.dumps(histogram.to_json())))  # as through the persistent cache
+    assert restored.category_counts() == histogram.category_counts()
+    assert restored.months == histogram.months and restored.streets == histogram.streets
+
+
+def test_risk_bands():
+    def risk(count):
+        return CrimeHistogram({"burglary": count}).risk_message() if count else CrimeHistogram().risk_message()
+
+    assert risk(0) == risk(49) == "Low crime risk in the area."
+    assert risk(50) == "Moderate crime risk."
+    assert risk(299) == "High crime risk."
+    assert risk(499) == "Very high crime risk."
+    assert risk(500) == HIGHEST_RISK
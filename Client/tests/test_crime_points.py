@@ -0,0 +1,51 @@
+import json
+from typing import List
+import pytest
+import GlobalDormFunctions
+import GlobalVariables
+import JsonCodec
+import model.crimeDataModel as crimeDataModel
+from Geospatial import CrimePoints, haversine_mile
+from PersistentCache import PersistentCache
+
+
+def crime(category, latitude, longitude, street="On or near Derby Road"):
+    return {"category": category, "location": {"latitude": latitude, "longitude": longitude, "street": {"id": 1, "name": street}},
+            "context": None, "id": 1, "month": "2024-10"}
+
+
+def records(*crimes):
+    return JsonCodec.decode(json.dumps(list(crimes)).encode(), List[crimeDataModel.CrimeRecordRow])
+
+
+def test_bad_coordinates_add_nothing():
+    points = CrimePoints()
+    good, bad_longitude = records(crime("burglary", "52.95", "-1.18"), crime("drugs", "52.95", "unknown"))
+    points.add(good)
+    with pytest.raises(ValueError):
+        points.add(bad_longitude)
+    assert len(points.latitudes) == len(points.longitudes) == len(points.codes) == 1
+
+
+def test_rings_count_by_distance():
+    centre = (52.95, -1.18)
+    points = CrimePoints.from_records(records(crime("burglary", "52.95", "-1.18"), crime("drugs", "52.96", "-1.18"),
+                                              crime("drugs", "53.5", "-1.18")))
+    assert haversine_mile(*centre, 52.96, -1.18) == pytest.approx(0.69, abs=0.01)
+    rings = points.rings(*centre, radii=(0.5, 1.0))
+    assert rings.counts == [1, 1]
+    assert rings.categories == [{"burglary": 1}, {"drugs": 1}]
+    assert rings.outside == 1
+
+
+def test_one_bad_record_does_not_lose_the_crime_lookup(stand_in_server, monkeypatch):
+    monkeypatch.setattr(GlobalVariables, "current_server", stand_in_server.address)
+    monkeypatch.setattr(GlobalDormFunctions, "persistent_cache", PersistentCache(":memory:"))
+    stand_in_server.routes = {"/crime?postcode=TE571NG": [crime("burglary", "52.95", "-1.18"), crime("drugs", "n/a", "-1.18"),
+                                                          crime("drugs", "52.96", "-1.18")]}
+    url = f"http://{stand_in_server.address}/crime?postcode="
+
+    histogram = GlobalDormFunctions.fetch_crime_histogram(url, "TE571NG")
+    assert histogram.category_counts() == {"burglary": 1, "drugs": 2}
+    points = GlobalDormFunctions.fetch_crime_points(url, "TE571NG")
+    assert len(points) == 2
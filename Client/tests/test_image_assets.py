@@ -0,0 +1,46 @@
+import os
+import pytest
+from PIL import Image
+import GlobalVariables
+import ImageAssets
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    """Two different images with the same file name in different folders, and an empty thumbnail directory."""
+    monkeypatch.setattr(GlobalVariables, "thumbnail_dir", str(tmp_path / "thumbnails"))
+    monkeypatch.setattr(ImageAssets, "image_cache", ImageAssets.TTLCache(None, 16))
+    paths = []
+    for folder, color in (("images", "red"), ("images/lower quality", "blue")):
+        os.makedirs(tmp_path / folder, exist_ok=True)
+        path = str(tmp_path / folder / "x.jpg")
+        Image.new("RGB", (400, 300), color).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_same_name_in_different_folders_keeps_separate_thumbnails(images):
+    first, second = images
+    assert ImageAssets.thumbnail_path(first, (40, 30)) != ImageAssets.thumbnail_path(second, (40, 30))
+    assert ImageAssets.thumbnail_path(first, (40, 30)) != ImageAssets.thumbnail_path(first, (80, 60))
+
+    ImageAssets.scaled_image(first, (40, 30))
+    ImageAssets.image_cache.clear()  # as on the next start, only the thumbnails are left
+    red, blue = ImageAssets.scaled_image(first, (40, 30)), ImageAssets.scaled_image(second, (40, 30))
+    assert red.getpixel((20, 15))[0] > 200 and blue.getpixel((20, 15))[2] > 200
+
+
+def test_images_are_scaled_once_and_saved(images):
+    first, _ = images
+    image = ImageAssets.scaled_image(first, (40, 30))
+    assert image.size == (40, 30)
+    assert ImageAssets.scaled_image(first, (40.0, 30.0)) is image
+    assert os.path.exists(ImageAssets.thumbnail_path(first, (40, 30)))
+
+
+def test_changed_originals_are_scaled_again(images):
+    first, _ = images
+    ImageAssets.scaled_image(first, (40, 30))
+    thumbnail = ImageAssets.thumbnail_path(first, (40, 30))
+    os.utime(thumbnail, (0, 0))  # older than the original
+    assert ImageAssets._read_thumbnail(first, (40, 30)) is None
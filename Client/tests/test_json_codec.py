@@ -0,0 +1,62 @@
+import json
+from typing import List
+import pytest
+import JsonCodec
+import model.crimeDataModel as crimeDataModel
+import model.weatherModel as weatherModel
+
+CRIMES = [{"category": "burglary", "location": {"latitude": "52.9", "longitude": "-1.2", "street": {"id": 7, "name": "On or near Derby Road"}},
+           "context": None, "id": "101", "month": "2024-10"}]  # an id as a string, as the police API sometimes sends
+
+
+@pytest.fixture(params=["json", "orjson", "msgspec"])
+def backend(request):
+    if not JsonCodec.installed[request.param]:
+        pytest.skip(f"{request.param} isn't installed")
+    saved = JsonCodec.backend
+    JsonCodec.set_backend(request.param)
+    yield request.param
+    JsonCodec.backend = saved
+
+
+def test_loads_gives_plain_values(backend):
+    assert JsonCodec.loads(b'{"data": [1, 2.5, "x", null]}') == {"data": [1, 2.5, "x", None]}
+
+
+def test_decode_into_rows_coerces_like_pydantic(backend):
+    rows = JsonCodec.decode(json.dumps(CRIMES).encode(), List[crimeDataModel.CrimeRecordRow])
+    assert rows[0].id == 101
+    assert rows[0].location.street.name == "On or near Derby Road"
+    assert isinstance(rows[0], crimeDataModel.CrimeRecordRow)
+
+
+def test_decode_into_models(backend):
+    record = JsonCodec.decode(json.dumps(CRIMES[0]).encode(), crimeDataModel.CrimeRecord)
+    assert isinstance(record, crimeDataModel.CrimeRecord)
+    assert record.id == 101 and record.context is None
+
+
+def test_every_backend_decodes_the_same(backend):
+    body = json.dumps(CRIMES).encode()
+    saved = JsonCodec.backend
+    JsonCodec.set_backend("json")
+    reference = JsonCodec.decode(body, List[crimeDataModel.CrimeRecordRow])
+    JsonCodec.backend = saved
+    assert JsonCodec.decode(body, List[crimeDataModel.CrimeRecordRow]) == reference
+
+
+@pytest.mark.parametrize("body", [b"not json", b'[{"category": "burglary"}]', b'{"status": "success"}'])
+def test_malformed_data_raises_value_error(backend, body):
+    with pytest.raises(ValueError):
+        JsonCodec.decode(body, List[crimeDataModel.CrimeRecordRow])
+
+
+def test_model_lists_are_decoded_without_msgspec():
+    assert JsonCodec._uses_models(List[weatherModel.WeatherData])
+    assert not JsonCodec._uses_models(List[crimeDataModel.CrimeRecordRow])
+
+
+def test_missing_backend_falls_back_to_an_installed_one(monkeypatch, capsys):
+    monkeypatch.setitem(JsonCodec.installed, "msgspec", False)
+    assert JsonCodec.choose_backend("msgspec") in ("orjson", "json")
+    assert "isn't installed" in capsys.readouterr().out
@@ -0,0 +1,137 @@
+import threading
+from collections import deque
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+import pytest
+import requests
+import GlobalVariables
+from LoadBalancer import ReadBalancer
+from ServerProber import ServerHealth
+
+ROOMS_URL = "http://slow:1/GlobalDorm/webresources/database/viewAllDormRooms"
+WEATHER_URL = "http://slow:1/GlobalDorm/webresources/globaldorm/weather?postcode=NG72RD"
+
+
+class Response:
+    def __init__(self, url):
+        self.server = urlsplit(url).netloc
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def health(name, rtt=None):
+    """A ServerHealth that answered its probes in rtt seconds, or failed them when rtt is None."""
+    record = ServerHealth(name, f"{name}:1")
+    for _ in range(3):
+        record.record(rtt is not None, rtt)
+    return record
+
+
+@pytest.fixture
+def balancer(monkeypatch):
+    """A ReadBalancer over a fast and a slow server, hedging after 50 ms."""
+    monkeypatch.setattr(GlobalVariables, "hedge_default_delay", 0.05)
+    monkeypatch.setattr(GlobalVariables, "hedge_budget", 1.0)
+    balancer = ReadBalancer(SimpleNamespace(health={"fast": health("fast", 0.01), "slow": health("slow", 0.05)}))
+    yield balancer
+    balancer.executor.shutdown(wait=True)
+
+
+def test_fastest_server_first_unless_busy(balancer):
+    assert balancer.servers_for(ROOMS_URL) == ["fast:1", "slow:1"]
+    balancer.in_flight["fast:1"] = 9  # 10 x 10 ms is worse than 1 x 50 ms
+    assert balancer.servers_for(ROOMS_URL) == ["slow:1", "fast:1"]
+
+
+def test_unhealthy_servers_are_skipped(balancer):
+    balancer.prober.health["fast"] = health("fast")
+    assert balancer.servers_for(ROOMS_URL) == ["slow:1"]
+    balancer.prober.health["slow"] = health("slow")
+    assert balancer.servers_for(ROOMS_URL) == ["slow:1"]  # nothing healthy, the URL's own server
+
+
+def test_quick_answer_is_not_hedged(balancer):
+    response = balancer.send(Response, ROOMS_URL)
+    assert response.server == "fast:1"
+    assert balancer.stats()["hedges"] == 0
+
+
+def test_slow_server_is_hedged_and_its_response_closed(balancer):
+    responses = []
+    release_first = threading.Event()
+
+    def send(url):
+        if urlsplit(url).netloc == "fast:1":
+            assert release_first.wait(5)
+        responses.append(Response(url))
+        return responses[-1]
+
+    response = balancer.send(send, ROOMS_URL)
+    assert response.server == "slow:1"
+    assert balancer.stats()["hedges"] == 1 and balancer.stats()["hedge_wins"] == 1
+
+    release_first.set()
+    balancer.executor.shutdown(wait=True)  # the loser has answered and been closed
+    loser = next(response for response in responses if response.server == "fast:1")
+    assert loser.closed and not response.closed
+
+
+def test_hedge_budget_caps_duplicates(balancer, monkeypatch):
+    monkeypatch.setattr(GlobalVariables, "hedge_budget", 0.0)
+    servers = []
+
+    def send(url):
+        servers.append(urlsplit(url).netloc)
+        threading.Event().wait(0.1)  # slower than the hedge delay
+        return Response(url)
+
+    assert balancer.send(send, ROOMS_URL).server == "fast:1"
+    assert servers == ["fast:1"] and balancer.hedges == 0
+
+
+def test_failing_first_server_is_covered_by_the_hedge(balancer):
+    second_started = threading.Event()
+    first_failed = threading.Event()
+
+    def send(url):
+        if urlsplit(url).netloc == "fast:1":
+            assert second_started.wait(5)
+            first_failed.set()
+            raise requests.exceptions.ConnectionError("fast is down")
+        second_started.set()
+        assert first_failed.wait(5)
+        return Response(url)
+
+    assert balancer.send(send, ROOMS_URL).server == "slow:1"
+
+
+def test_every_server_failing_raises(balancer):
+    def send(url):
+        threading.Event().wait(0.1)
+        raise requests.exceptions.ConnectionError(f"{urlsplit(url).netloc} is down")
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        balancer.send(send, ROOMS_URL)
+    assert balancer.hedges == 1
+
+
+def test_database_reads_follow_a_write(balancer):
+    balancer.note_write("http://slow:1/GlobalDorm/webresources/database/addApplication")
+    assert balancer.servers_for(ROOMS_URL) == ["slow:1"]
+    assert balancer.servers_for(WEATHER_URL) == ["fast:1", "slow:1"]  # only the database reads are pinned
+    assert balancer.send(Response, ROOMS_URL).server == "slow:1"
+
+
+def test_pinning_after_a_write_expires(balancer, monkeypatch):
+    monkeypatch.setattr(GlobalVariables, "read_your_writes", -1)
+    balancer.note_write("http://slow:1/GlobalDorm/webresources/database/addApplication")
+    assert balancer.servers_for(ROOMS_URL) == ["fast:1", "slow:1"]
+
+
+def test_hedge_delay_is_the_recent_percentile(balancer, monkeypatch):
+    monkeypatch.setattr(GlobalVariables, "hedge_min_samples", 20)
+    assert balancer.hedge_delay("viewAllDormRooms") == 0.05  # too few samples yet
+    balancer.latencies["viewAllDormRooms"] = deque(millis / 1000 for millis in range(1, 101))
+    assert balancer.hedge_delay("viewAllDormRooms") == pytest.approx(0.096)
@@ -0,0 +1,131 @@
+import json
+import time
+from types import SimpleNamespace
+import pytest
+import GlobalDormFunctions
+from PersistentCache import PersistentCache, content_version, is_etag
+
+ROOM = {"id": 1, "name": "Quiet Room", "location": {"city": "Nottingham", "county": "Notts", "postcode": "NG7 2RD"},
+        "details": {"furnished": True, "amenities": [], "live_in_landlord": False, "shared_with": 1,
+                    "bills_included": True, "bathroom_shared": False},
+        "price_per_month_gbp": 500, "availability_date": "2025-01-01", "spoken_languages": ["English"], "is_available": True}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PersistentCache(str(tmp_path / "cache" / "client.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_values_round_trip_through_the_file(tmp_path):
+    path = str(tmp_path / "client.sqlite3")
+    first = PersistentCache(path)
+    first.set("combined", "Quiet Room", ["NG7 2RD", "Details"], version='"etag-1"')
+    first.close()
+
+    reopened = PersistentCache(path)  # as after a restart
+    entry = reopened.get("combined", "Quiet Room")
+    assert entry.value == ["NG7 2RD", "Details"]
+    assert entry.version == '"etag-1"'
+    assert entry.age() < 60
+    assert reopened.version("combined", "Quiet Room") == '"etag-1"'
+    reopened.close()
+
+
+def test_missing_entries(cache):
+    assert cache.get("weather", "NG72RD") is None
+    assert cache.get_raw("weather", "NG72RD") is None
+    assert cache.version("weather", "NG72RD") is None
+
+
+def test_namespaces_keep_keys_apart(cache):
+    cache.set("weather", "NG72RD", "sunny")
+    cache.set("crime_histogram", "NG72RD", {"total": 3})
+    assert cache.get("weather", "NG72RD").value == "sunny"
+    assert cache.get("crime_histogram", "NG72RD").value == {"total": 3}
+
+    cache.clear("weather")
+    assert cache.get("weather", "NG72RD") is None
+    assert cache.get("crime_histogram", "NG72RD") is not None
+    cache.clear()
+    assert cache.get("crime_histogram", "NG72RD") is None
+
+
+def test_raw_bodies_are_kept_as_sent(cache):
+    body = b'{"status": "success", "data": []}'
+    cache.set_raw("rooms", "viewAllDormRooms", body, version="sha1:abc")
+    assert cache.get_raw("rooms", "viewAllDormRooms").value == body
+    assert cache.get("rooms", "viewAllDormRooms").value == {"status": "success", "data": []}
+
+
+def test_max_age_and_touch(cache):
+    cache.set("weather", "NG72RD", "sunny", fetched_at=time.time() - 3600)
+    assert cache.get("weather", "NG72RD", max_age=60) is None
+    assert cache.get("weather", "NG72RD").value == "sunny"  # still there for the offline fallback
+
+    cache.touch("weather", "NG72RD")
+    assert cache.get("weather", "NG72RD", max_age=60).value == "sunny"
+
+
+def test_set_replaces_the_entry(cache):
+    cache.set("route", "NG72RD|NG15FS", {"duration": 600}, version="v1")
+    cache.set("route", "NG72RD|NG15FS", {"duration": 540}, version="v2")
+    entry = cache.get("route", "NG72RD|NG15FS")
+    assert entry.value == {"duration": 540} and entry.version == "v2"
+
+
+def test_unreadable_file_is_reported_not_raised(tmp_path, capsys):
+    cache = PersistentCache(str(tmp_path))  # a directory, sqlite can't open it
+    assert cache.get("weather", "NG72RD") is None
+    cache.set("weather", "NG72RD", "sunny")
+    assert "Persistent cache unavailable" in capsys.readouterr().out
+
+
+def test_content_version_prefers_the_etag():
+    assert content_version(SimpleNamespace(headers={"ETag": '"abc"'}, content=b"{}")) == '"abc"'
+    hashed = content_version(SimpleNamespace(headers={}, content=b"{}"))
+    assert hashed.startswith("sha1:")
+    assert is_etag('"abc"') and not is_etag(hashed) and not is_etag(None)
+
+
+def test_room_list_gone_between_reads_is_an_error(cache, monkeypatch):
+    monkeypatch.setattr(GlobalDormFunctions, "persistent_cache", cache)
+    monkeypatch.setattr(cache, "version", lambda namespace, key: "sha1:gone")  # saved when checked, evicted when read
+    assert GlobalDormFunctions.fetch_room_index("http://localhost:1/database", offline=True) == (None, "No saved rooms yet.")
+
+
+def test_bad_room_list_keeps_the_saved_one(cache, stand_in_server, monkeypatch, capsys):
+    monkeypatch.setattr(GlobalDormFunctions, "persistent_cache", cache)
+    monkeypatch.setattr(GlobalDormFunctions, "_room_index", None)
+    database = f"http://{stand_in_server.address}/database"
+    good = json.dumps({"status": "success", "data": [ROOM]}).encode()
+    cache.set_raw("rooms", f"{database}/viewAllDormRooms", good, version="sha1:good")
+    stand_in_server.routes["/database/viewAllDormRooms"] = "<html>Internal error</html>"  # a 200 that isn't a room list
+
+    room_index, error = GlobalDormFunctions.fetch_room_index(database)
+    assert error is None and [room.name for room in room_index.rooms] == ["Quiet Room"]
+    assert "searching the saved list" in capsys.readouterr().out
+    assert cache.get_raw("rooms", f"{database}/viewAllDormRooms").value == good
+
+    monkeypatch.setattr(GlobalDormFunctions, "_room_index", None)
+    room_index, error = GlobalDormFunctions.fetch_room_index(database, offline=True)
+    assert error is None and [room.name for room in room_index.rooms] == ["Quiet Room"]
+
+
+def test_bad_room_list_without_a_saved_one_is_an_error(cache, stand_in_server, monkeypatch):
+    monkeypatch.setattr(GlobalDormFunctions, "persistent_cache", cache)
+    stand_in_server.routes["/database/viewAllDormRooms"] = "<html>Internal error</html>"
+    room_index, error = GlobalDormFunctions.fetch_room_index(f"http://{stand_in_server.address}/database")
+    assert room_index is None and error.startswith("Error parsing response")
+    assert cache.version("rooms", f"http://{stand_in_server.address}/database/viewAllDormRooms") is None
+
+
+def test_uncreatable_directory_is_reported_not_raised(tmp_path, capsys):
+    (tmp_path / "not a directory").write_text("")
+    cache = PersistentCache(str(tmp_path / "not a directory" / "cache" / "client.sqlite3"))  # makedirs raises
+    assert cache.get("weather", "NG72RD") is None
+    assert cache.version("rooms", "viewAllDormRooms") is None
+    cache.set("weather", "NG72RD", "sunny")
+    cache.touch("weather", "NG72RD")
+    assert capsys.readouterr().out.count("Persistent cache unavailable") == 4
@@ -0,0 +1,157 @@
+import pytest
+import requests
+from Resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, ResiliencePolicy
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def sender(*outcomes):
+    """send() for a policy: returns the responses and raises the exceptions in outcomes, in order."""
+    outcomes = list(outcomes)
+    calls = []
+
+    def send():
+        calls.append(1)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    send.calls = calls
+    return send
+
+
+def policy(attempts=3, failure_threshold=3, reset_timeout=30, clock=None):
+    return ResiliencePolicy("weather", attempts, 0.1, 1.0, failure_threshold, reset_timeout,
+                            sleep=lambda seconds: None, clock=clock or Clock())
+
+
+def test_breaker_opens_after_threshold_failures():
+    breaker = CircuitBreaker("weather", 3, 30, Clock())
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("weather", 3, 30, Clock())
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_open_breaker_lets_one_trial_through_after_reset_timeout():
+    clock = Clock()
+    breaker = CircuitBreaker("weather", 1, 30, clock)
+    breaker.record_failure()
+    clock.now = 29
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(1)
+
+    clock.now = 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one trial at a time
+
+
+def test_half_open_trial_closes_on_success_and_reopens_on_failure():
+    clock = Clock()
+    breaker = CircuitBreaker("weather", 1, 30, clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    clock.now = 60
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.opened_at == 60
+    assert not breaker.allow()
+
+
+def test_released_trial_lets_the_next_one_through():
+    clock = Clock()
+    breaker = CircuitBreaker("weather", 1, 30, clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_policy_retries_connection_errors_then_succeeds():
+    resilience = policy()
+    send = sender(requests.exceptions.ConnectionError(), requests.exceptions.Timeout(), Response(200))
+    assert resilience.call(send).status_code == 200
+    assert len(send.calls) == 3
+    assert resilience.retries == 2
+    assert resilience.breaker.state == CLOSED
+
+
+def test_policy_returns_the_last_retry_status_response():
+    resilience = policy(failure_threshold=10)
+    first, last = Response(503), Response(503)
+    assert resilience.call(sender(first, Response(502), last)) is last
+    assert first.closed and not last.closed
+
+
+def test_policy_does_not_retry_when_told_not_to():
+    send = sender(requests.exceptions.ConnectionError())
+    with pytest.raises(requests.exceptions.ConnectionError):
+        policy().call(send, retry=False)
+    assert len(send.calls) == 1
+
+
+def test_policy_fails_fast_while_open():
+    resilience = policy(attempts=1, failure_threshold=1)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        resilience.call(sender(requests.exceptions.ConnectionError()))
+
+    send = sender(Response(200))
+    with pytest.raises(CircuitOpenError):
+        resilience.call(send)
+    assert not send.calls
+    assert resilience.rejected == 1
+
+
+def test_policy_reports_its_own_error_when_its_failures_open_the_breaker():
+    resilience = policy(attempts=3, failure_threshold=2)
+    error = requests.exceptions.ConnectionError("refused")
+    with pytest.raises(requests.exceptions.ConnectionError) as raised:
+        resilience.call(sender(error, error, Response(200)))
+    assert raised.value is error
+    assert not isinstance(raised.value, CircuitOpenError)
+
+
+def test_other_exceptions_release_the_trial():
+    clock = Clock()
+    resilience = policy(attempts=1, failure_threshold=1, clock=clock)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        resilience.call(sender(requests.exceptions.ConnectionError()))
+    clock.now = 30
+    with pytest.raises(ValueError):
+        resilience.call(sender(ValueError("bad url")))
+    assert resilience.call(sender(Response(200))).status_code == 200
+    assert resilience.breaker.state == CLOSED
@@ -0,0 +1,86 @@
+from ResponseCache import TTLCache, normalise_postcode
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl():
+    clock = Clock()
+    cache = TTLCache(60, 10, clock)
+    cache.set("NG72RD", "sunny")
+    clock.now = 59.9
+    assert cache.get("NG72RD") == "sunny"
+    clock.now = 60
+    assert cache.get("NG72RD") is None
+    assert len(cache) == 0  # the expired entry is dropped on lookup
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_no_ttl_keeps_entries_until_evicted():
+    clock = Clock()
+    cache = TTLCache(None, 10, clock)
+    cache.set("NG72RD", (52.9, -1.2))
+    clock.now = 10 ** 9
+    assert cache.get("NG72RD") == (52.9, -1.2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(None, 2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_setting_a_key_again_refreshes_it():
+    clock = Clock()
+    cache = TTLCache(60, 2, clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    clock.now = 50
+    cache.set("a", 10)
+    cache.set("c", 3)
+    assert "b" not in cache
+    clock.now = 100
+    assert cache.get("a") == 10
+
+
+def test_peek_and_contains_do_not_count_or_reorder():
+    cache = TTLCache(None, 2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.peek("a") == 1 and "a" in cache
+    assert cache.peek("missing", "default") == "default"
+    cache.set("c", 3)  # "a" was only peeked, it is still the oldest
+    assert "a" not in cache
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 0
+
+
+def test_falsy_values_are_cached():
+    cache = TTLCache(None, 2)
+    cache.set("empty", [])
+    assert cache.get("empty", "missing") == []
+    assert "empty" in cache
+
+
+def test_invalidate_and_clear():
+    cache = TTLCache(None, 4)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    cache.invalidate("never set")
+    assert "a" not in cache and "b" in cache
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_postcodes_are_normalised():
+    assert normalise_postcode("ng7 2rd") == normalise_postcode("NG72RD") == "NG72RD"
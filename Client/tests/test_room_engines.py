@@ -0,0 +1,121 @@
+import random
+import pytest
+import model.roomModel as roomModel
+from GlobalDormFunctions import _room_filter, filter_room_index
+from RoomIndex import BLOCK_SIZE, RoomIndex
+from RoomQuery import RoomQuery
+
+'''
+RoomIndex (bitsets), RoomColumns (NumPy) and the compiled python engine have to give the same
+rooms, in room order, as the original _room_filter scan for every filter combination.
+'''
+
+CITIES = ["Nottingham", "London", "Leeds", "Derby"]
+LANGUAGES = ["English", "Spanish", "French", "Mandarin"]
+
+
+def make_rooms(count, seed=1):
+    generator = random.Random(seed)
+    rooms = []
+    for room_id in range(count):
+        rooms.append(roomModel.DormRoom(
+            id=room_id, name=f"Room {room_id}",
+            location={"city": generator.choice(CITIES + ["nottingham"]), "county": "Notts", "postcode": "NG7 2RD"},
+            details={"furnished": True, "amenities": [], "live_in_landlord": generator.random() < 0.3,
+                     "shared_with": generator.randint(0, 5), "bills_included": generator.random() < 0.5,
+                     "bathroom_shared": generator.random() < 0.6},
+            price_per_month_gbp=generator.randint(300, 1500),
+            availability_date=f"2025-{generator.randint(1, 12):02d}-{generator.randint(1, 28):02d}",
+            spoken_languages=generator.sample(LANGUAGES, generator.randint(1, 3)),
+            is_available=True))
+    return rooms
+
+
+def make_filters(count, seed=2):
+    """Filter tuples in _room_filter's argument order, 0/1/2 for no/yes/either."""
+    generator = random.Random(seed)
+    filters = [(None, None, None, 2, None, 2, 2, None, None)]  # no filters at all
+    for _ in range(count):
+        filters.append((generator.choice([None, generator.randint(300, 900)]),
+                        generator.choice([None, generator.randint(600, 1500)]),
+                        generator.choice([None, generator.choice(CITIES + ["LONDON", "Paris"])]),
+                        generator.randint(0, 2),
+                        generator.choice([None, generator.randint(0, 5)]),
+                        generator.randint(0, 2), generator.randint(0, 2),
+                        generator.choice([None, generator.choice(LANGUAGES + ["english", "Welsh"])]),
+                        generator.choice([None, f"2025-{generator.randint(1, 12):02d}-15"])))
+    return filters
+
+
+def scan(rooms, room_filter):
+    return [room.name for room in rooms if _room_filter(room, *room_filter)[0]], None
+
+
+@pytest.fixture(scope="module")
+def rooms():
+    return make_rooms(3 * BLOCK_SIZE + 5)  # sorted columns with full blocks and a remainder
+
+
+@pytest.fixture(scope="module")
+def filters():
+    return make_filters(300)
+
+
+@pytest.mark.parametrize("engine", ["index", "python", "columnar"])
+def test_engines_match_the_linear_scan(rooms, filters, engine):
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    room_index = RoomIndex(rooms)
+    for room_filter in filters:
+        assert filter_room_index(room_index, RoomQuery.from_filters(*room_filter), engine) == scan(rooms, room_filter), room_filter
+
+
+@pytest.mark.parametrize("engine", ["index", "python", "columnar"])
+def test_price_and_roommate_limits_are_inclusive(rooms, engine):
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    room_index = RoomIndex(rooms)
+    price, roommates = rooms[0].price_per_month_gbp, rooms[0].details.shared_with
+    query = RoomQuery(min_price=price, max_price=price, max_roommates=roommates)
+    names, error = filter_room_index(room_index, query, engine)
+    assert error is None and rooms[0].name in names
+    assert names == scan(rooms, (price, price, None, 2, roommates, 2, 2, None, None))[0]
+
+
+@pytest.mark.parametrize("engine", ["index", "python", "columnar"])
+def test_unparsable_dates_fail_date_searches_only(engine):
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    rooms = make_rooms(10)
+    rooms[3].availability_date = "soon"
+    room_index = RoomIndex(rooms)
+
+    names, error = filter_room_index(room_index, RoomQuery.from_filters(None, None, None, 2, None, 2, 2, None, "2025-06-01"), engine)
+    assert names == [] and error.startswith("Error while checking filters for room Room 3")
+    assert filter_room_index(room_index, RoomQuery(), engine) == ([room.name for room in rooms], None)
+
+
+def test_columns_filter_many_matches_the_index(rooms, filters):
+    pytest.importorskip("numpy")
+    room_index = RoomIndex(rooms)
+    queries = [RoomQuery.from_filters(*room_filter) for room_filter in filters]
+    assert room_index.columns().filter_many(queries) == [room_index.filter(query) for query in queries]
+
+
+def test_compact_rows_index_like_the_validated_models(rooms, filters):
+    import JsonCodec
+    payload = roomModel.Response(status="success", data=rooms).model_dump_json().encode()
+    rows = JsonCodec.decode(payload, roomModel.ResponseRow).data
+    models, compact = RoomIndex(rooms), RoomIndex(rows)
+    for room_filter in filters[:50]:
+        query = RoomQuery.from_filters(*room_filter)
+        assert compact.filter(query) == models.filter(query)
+
+
+def test_bad_filters_raise_value_error():
+    with pytest.raises(ValueError):
+        RoomQuery.from_filters(None, None, None, 3, None, 2, 2, None, None)
+    with pytest.raises(ValueError):
+        RoomQuery.from_filters("cheap", None, None, 2, None, 2, 2, None, None)
+    with pytest.raises(ValueError):
+        RoomQuery.from_filters(None, None, None, 2, None, 2, 2, None, "15/06/2025")
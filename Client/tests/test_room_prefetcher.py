@@ -0,0 +1,130 @@
+import threading
+from types import SimpleNamespace
+import requests
+import GlobalDormFunctions
+from GlobalDormFunctions import SavedResult
+from ResponseCache import TTLCache
+from RoomPrefetcher import RoomPrefetcher
+
+
+class Fetch:
+    """A stand-in for fetch_dorm_room_combined_information that blocks until released, recording the rooms asked for."""
+    def __init__(self, results=None):
+        self.results = results or {}
+        self.rooms = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, database, room_name):
+        self.rooms.append(room_name)
+        self.started.set()
+        assert self.release.wait(5)
+        return self.results.get(room_name, ("NG7 2RD", f"Details of {room_name}"))
+
+
+def prefetcher(fetch, depth=2):
+    return RoomPrefetcher(depth=depth, fetch=fetch, cache=TTLCache(60))
+
+
+def wait_for(prefetcher, room_names):
+    for room_name in room_names:
+        future = prefetcher.futures.get(room_name)
+        if future is not None:
+            future.result(5)
+
+
+def test_top_results_are_fetched_and_served_from_the_cache():
+    fetch = Fetch()
+    rooms = prefetcher(fetch)
+    rooms.prefetch("db", ["A", "B", "C"])
+    wait_for(rooms, ["A", "B"])
+
+    assert sorted(fetch.rooms) == ["A", "B"]
+    assert rooms.lookup("A") == ("NG7 2RD", "Details of A")
+    assert rooms.lookup("C") is None
+    assert rooms.stats()["hits"] == 1 and rooms.stats()["misses"] == 1
+    assert rooms.stats()["ranks"] == {0: 1, 2: 1}
+
+
+def test_selection_waits_for_a_running_prefetch():
+    fetch = Fetch()
+    fetch.release.clear()
+    rooms = prefetcher(fetch, depth=1)
+    rooms.prefetch("db", ["A"])
+
+    future = rooms.lookup("A")
+    assert future is not None and not isinstance(future, tuple)
+    fetch.release.set()
+    assert future.result(5) == ("NG7 2RD", "Details of A")
+    assert rooms.waits == 1 and fetch.rooms == ["A"]
+
+
+def test_cancel_drops_results_of_running_fetches():
+    fetch = Fetch()
+    fetch.release.clear()
+    rooms = prefetcher(fetch, depth=1)
+    rooms.prefetch("db", ["A"])
+    future = rooms.futures["A"]
+    assert fetch.started.wait(5)  # running, too late to cancel the future itself
+    rooms.cancel()
+    fetch.release.set()
+    future.result(5)
+
+    assert "A" not in rooms.cache
+    assert rooms.lookup("A") is None
+
+
+def test_failed_fetches_and_saved_copies_are_not_cached():
+    fetch = Fetch({"Down": SavedResult(("NG7 2RD", "Saved details")), "Missing": ("", "Error fetching room data")})
+    rooms = prefetcher(fetch)
+    rooms.prefetch("db", ["Down", "Missing"])
+    wait_for(rooms, ["Down", "Missing"])
+
+    assert "Down" not in rooms.cache and "Missing" not in rooms.cache
+    assert rooms.lookup("Down") is None  # the next selection asks the server again
+    assert rooms.fetch_room("db", "Down") == ("NG7 2RD", "Saved details")
+    assert "Down" not in rooms.cache
+    assert rooms.prefetched == 0
+
+
+def test_fetch_room_caches_fresh_results():
+    rooms = prefetcher(Fetch())
+    assert rooms.fetch_room("db", "A") == ("NG7 2RD", "Details of A")
+    assert rooms.lookup("A") == ("NG7 2RD", "Details of A")
+
+
+def test_saved_copy_is_returned_as_saved_result(monkeypatch):
+    class Down:
+        def get(self, url):
+            raise requests.exceptions.ConnectionError("down")
+
+    class Saved:
+        def get(self, namespace, key):
+            return SimpleNamespace(value=["NG7 2RD", "Saved details"])
+
+    monkeypatch.setattr(GlobalDormFunctions, "transport", Down())
+    monkeypatch.setattr(GlobalDormFunctions, "persistent_cache", Saved())
+    result = GlobalDormFunctions.fetch_dorm_room_combined_information("db", "Quiet Room")
+    postcode, details = result
+    assert isinstance(result, SavedResult) and (postcode, details) == ("NG7 2RD", "Saved details")
+
+
+def test_failed_prefetch_is_fetched_again():
+    calls = []
+
+    def fetch(database, room_name):
+        calls.append(room_name)
+        if len(calls) == 1:
+            raise RuntimeError("server error")
+        return "NG7 2RD", f"Details of {room_name}"
+
+    rooms = prefetcher(fetch, depth=1)
+    rooms.prefetch("db", ["A"])
+    future = rooms.futures["A"]
+    assert isinstance(future.exception(5), RuntimeError)  # a selection waiting on it still sees the error
+
+    assert rooms.lookup("A") is None
+    assert rooms.fetch_room("db", "A") == ("NG7 2RD", "Details of A")
+    assert rooms.lookup("A") == ("NG7 2RD", "Details of A")
+    assert calls == ["A", "A"]
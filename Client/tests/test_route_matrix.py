@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+import GlobalDormAsync
+import GlobalDormFunctions
+import GlobalVariables
+from GlobalDormTransport import ClientTransport, route_path
+from model.routeDistanceModel import RouteSummary
+
+DURATIONS = {"NG15FS": 900, "NG72RD": 300, "NG92HA": 600}  # seconds, anything else fails
+
+
+def fake_routes(monkeypatch, delay=0.0):
+    """Replaces fetch_route with one answering from DURATIONS; .targets lists the targets asked for, .peak the most at once."""
+    calls = SimpleNamespace(targets=[], running=0, peak=0)
+    lock = threading.Lock()
+
+    def fetch_route(url, source, target):
+        with lock:
+            calls.targets.append(target)
+            calls.running += 1
+            calls.peak = max(calls.peak, calls.running)
+        time.sleep(delay)
+        with lock:
+            calls.running -= 1
+
+        duration = DURATIONS.get(target)
+        if duration is None:
+            return None, "Error: No routes found in the response."
+        message = f"{duration / 60:.0f} minutes"
+        return RouteSummary(source, target, "driving", duration, duration * 10, message), message
+
+    monkeypatch.setattr(GlobalDormFunctions, "fetch_route", fetch_route)
+    return calls
+
+
+def test_route_matrix_routes_each_postcode_once_quickest_first(monkeypatch):
+    calls = fake_routes(monkeypatch)
+    rows = asyncio.run(GlobalDormAsync.route_matrix("url", "NG7 2RD", ["NG1 5FS", "ng72rd", "XX1 1XX", "NG7 2RD", "NG9 2HA"]))
+    assert sorted(calls.targets) == ["NG15FS", "NG72RD", "NG92HA", "XX11XX"]
+    assert [row.postcode for row in rows] == ["NG72RD", "NG92HA", "NG15FS", "XX11XX"]
+    assert rows[-1].route is None and rows[-1].message.startswith("Error")
+
+
+def test_route_matrix_respects_the_limit(monkeypatch):
+    calls = fake_routes(monkeypatch, delay=0.02)
+    asyncio.run(GlobalDormAsync.route_matrix("url", "NG7 2RD", [f"NG{number} 1AA" for number in range(12)], limit=3))
+    assert len(calls.targets) == 12
+    assert calls.peak <= 3
+
+
+def test_route_matrix_of_nothing():
+    assert asyncio.run(GlobalDormAsync.route_matrix("url", "NG7 2RD", [])) == []
+
+
+def test_commute_table_shares_routes_between_rooms(monkeypatch):
+    calls = fake_routes(monkeypatch)
+    monkeypatch.setattr(GlobalDormFunctions, "room_postcodes",
+                        lambda database, names: {"Quiet Room": "NG1 5FS", "Sunny Room": "NG7 2RD", "Attic": "NG1 5FS"})
+    rows = GlobalDormAsync.commute_table("url", "db", "NG7 2RD", ["Quiet Room", "Sunny Room", "Attic", "Unknown"])
+    assert sorted(calls.targets) == ["NG15FS", "NG72RD"]
+    assert [row.name for row in rows] == ["Sunny Room", "Quiet Room", "Attic"]
+    assert rows[1].postcode == "NG1 5FS" and rows[1].route.duration == 900
+
+
+def test_only_routes_get_the_commute_table_pool(monkeypatch):
+    servers = {"small": "10.0.0.1:8080", "large": "10.0.0.2:8080"}
+    monkeypatch.setattr(GlobalVariables, "servers", servers)
+    monkeypatch.setattr(GlobalVariables, "current_server", servers["small"])
+    monkeypatch.setattr(GlobalVariables, "route_concurrency", 40)
+    session = ClientTransport(pool_sizes={"small": 4}).current_session()
+    for address in servers.values():
+        assert session.get_adapter(f"http://{address}{route_path}?mode=driving&startPostcode=NG7")._pool_maxsize == 40
+    assert session.get_adapter(f"http://{servers['small']}/GlobalDorm/webresources/globaldorm/weather?postcode=NG7")._pool_maxsize == 4
+    assert session.get_adapter(f"http://{servers['small']}/GlobalDorm/webresources/database/viewAllDormRooms")._pool_maxsize == 4
@@ -0,0 +1,95 @@
+import pytest
+import GlobalVariables
+import Resilience
+from ServerProber import ServerHealth, ServerProber
+
+
+@pytest.fixture
+def prober(monkeypatch):
+    """A ServerProber over the app's servers, currently on netbeans, that never sends a probe itself."""
+    monkeypatch.setattr(GlobalVariables, "current_server", GlobalVariables.servers["netbeans"])
+    monkeypatch.setattr(Resilience, "reset", lambda: None)
+    prober = ServerProber()
+    yield prober
+    prober.stop()
+
+
+def answered(prober, name, rtt, times=3):
+    for _ in range(times):
+        prober.health[name].record(True, rtt)
+
+
+def failed(prober, name, times=1):
+    for _ in range(times):
+        prober.health[name].record(False)
+
+
+def test_error_rate_and_healthy():
+    health = ServerHealth("docker", "localhost:8081", window=5)
+    assert health.error_rate == 0.0 and not health.healthy  # never probed
+    for ok in (True, True, False, True, True):
+        health.record(ok, 0.01 if ok else None)
+    assert health.error_rate == pytest.approx(0.2) and health.healthy
+
+    health.record(False)  # the window drops the oldest probe
+    assert health.error_rate == pytest.approx(0.4) and not health.healthy  # the last probe failed
+
+    flaky = ServerHealth("azure", "20.162.251.254:8080", window=5)
+    for ok in (False, False, False, True):
+        flaky.record(ok, 0.01 if ok else None)
+    assert flaky.error_rate == pytest.approx(0.75) and not flaky.healthy  # answered, but fails too often
+
+
+def test_rtt_is_smoothed():
+    health = ServerHealth("docker", "localhost:8081")
+    health.record(True, 0.1)
+    health.record(True, 0.2)
+    assert health.rtt == pytest.approx(0.1 + GlobalVariables.probe_smoothing * 0.1)
+    assert health.describe() == f"docker {health.rtt * 1000:.0f} ms"
+
+
+def test_switches_only_to_a_clearly_faster_server(prober):
+    answered(prober, "netbeans", 0.100)
+    answered(prober, "docker", 0.085)  # 15% faster, within switch_margin
+    assert prober.select() == "netbeans" and prober.switches == 0
+
+    answered(prober, "docker", 0.050, times=10)
+    assert prober.select() == "docker"
+    assert GlobalVariables.current_server == GlobalVariables.servers["docker"] and prober.switches == 1
+
+
+def test_fails_over_when_the_current_server_is_unhealthy(prober):
+    answered(prober, "netbeans", 0.010)
+    answered(prober, "azure", 0.200)
+    failed(prober, "netbeans")
+    assert prober.select() == "azure"
+    assert GlobalVariables.current_server == GlobalVariables.servers["azure"]
+
+
+def test_stays_put_when_nothing_answers(prober):
+    failed(prober, "netbeans")
+    failed(prober, "docker")
+    assert prober.select() == "netbeans" and prober.switches == 0
+
+
+def test_pinned_server_is_kept_until_it_fails(prober):
+    answered(prober, "netbeans", 0.010)
+    answered(prober, "docker", 0.100)
+    prober.pin("docker")
+    assert prober.select() == "docker"  # netbeans is faster, but docker was chosen by hand
+
+    failed(prober, "docker")
+    assert prober.select() == "netbeans"
+    assert prober.pinned is None
+
+
+def test_probe_records_every_server_then_selects(prober, monkeypatch):
+    rtts = {"netbeans": None, "docker": 0.02, "azure": 0.05}  # None for a failed probe
+
+    def probe_server(health):
+        health.record(rtts[health.name] is not None, rtts[health.name])
+
+    monkeypatch.setattr(prober, "probe_server", probe_server)
+    assert prober.probe() == "docker"
+    assert prober.label() == "docker 20 ms"
+    assert prober.health["netbeans"].describe() == "netbeans down"
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import GlobalVariables
+from SingleFlight import SingleFlight
+
+
+def blocking_call(release, result="value"):
+    """A function that counts its calls and waits for release, so callers pile up behind it."""
+    calls = []
+
+    def function(*args):
+        calls.append(args)
+        assert release.wait(5)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    function.calls = calls
+    return function
+
+
+def wait_for_waiters(flights, count):
+    """Spins until count callers have joined the call in flight."""
+    for _ in range(1000):
+        if flights.stats()["shared"] >= count:
+            return
+        threading.Event().wait(0.005)
+    raise AssertionError("callers never joined the call in flight")
+
+
+def test_concurrent_identical_calls_are_made_once():
+    flights = SingleFlight()
+    release = threading.Event()
+    function = blocking_call(release)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(flights.do, "key", function, "NG7") for _ in range(5)]
+        wait_for_waiters(flights, 4)
+        release.set()
+        assert [future.result() for future in futures] == ["value"] * 5
+
+    assert function.calls == [("NG7",)]
+    assert flights.stats() == {"calls": 1, "shared": 4, "in_flight": 0}
+
+
+def test_every_caller_gets_the_exception():
+    flights = SingleFlight()
+    release = threading.Event()
+    function = blocking_call(release, ValueError("upstream down"))
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flights.do, "key", function) for _ in range(3)]
+        wait_for_waiters(flights, 2)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="upstream down"):
+                future.result()
+
+    assert len(function.calls) == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_different_keys_and_later_calls_are_not_shared():
+    flights = SingleFlight()
+    calls = []
+    function = lambda value: calls.append(value) or value
+
+    assert flights.do("a", function, 1) == 1
+    assert flights.do("a", function, 2) == 2  # the first call had finished, nothing is kept
+    assert flights.do("b", function, 3) == 3
+    assert calls == [1, 2, 3]
+    assert flights.stats()["shared"] == 0
+
+
+def test_coalescing_can_be_switched_off(monkeypatch):
+    monkeypatch.setattr(GlobalVariables, "coalesce_requests", False)
+    flights = SingleFlight()
+    assert flights.do("a", lambda: "direct") == "direct"
+    assert flights.stats()["calls"] == 0
+
+
+def test_async_callers_share_a_threaded_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    function = blocking_call(release)
+
+    async def main():
+        waiters = [asyncio.create_task(flights.do_async("key", function)) for _ in range(3)]
+        await asyncio.sleep(0)
+        thread = ThreadPoolExecutor(max_workers=1).submit(flights.do, "key", function)
+        await asyncio.to_thread(wait_for_waiters, flights, 3)
+        release.set()
+        return await asyncio.gather(*waiters), thread.result()
+
+    results, threaded = asyncio.run(main())
+    assert results == ["value"] * 3 and threaded == "value"
+    assert len(function.calls) == 1
+
+
+def test_cancelled_async_waiter_does_not_cancel_the_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    function = blocking_call(release)
+
+    async def main():
+        first = asyncio.create_task(flights.do_async("key", function))
+        second = asyncio.create_task(flights.do_async("key", function))
+        await asyncio.to_thread(wait_for_waiters, flights, 1)
+        second.cancel()
+        release.set()
+        return await first
+
+    assert asyncio.run(main()) == "value"
+    assert len(function.calls) == 1
@@ -0,0 +1,69 @@
+import json
+import pytest
+from StreamingJson import iter_array, iter_chunks
+
+ITEMS = [1, -12, 1.5e3, 0.25, True, False, None, "plain", "quote \" and \\ and é", [], {}, {"k": [1, 2], "n": None}]
+ARRAY = json.dumps(ITEMS, ensure_ascii=False).encode("utf-8")
+
+
+def every_split(body):
+    """The body cut into two chunks at every position, then into chunks of every size up to 8 bytes."""
+    for cut in range(len(body) + 1):
+        yield [body[:cut], body[cut:]]
+    for size in range(1, 9):
+        yield list(iter_chunks(body, size))
+
+
+def test_items_survive_every_chunk_boundary():
+    for chunks in every_split(ARRAY):
+        assert list(iter_array(chunks)) == ITEMS, chunks
+
+
+def test_literals_and_numbers_at_the_end_of_a_chunk():
+    assert list(iter_array([b"[tr", b"ue, fa", b"lse, nu", b"ll, 12", b"34, 5", b".5e", b"1]"])) == [True, False, None, 1234, 55.0]
+    assert list(iter_array([b"[12", b"]"])) == [12]  # not 1 then 2
+
+
+def test_text_chunks_and_whitespace():
+    assert list(iter_array([" [ 1 ,\n", "\t2 ] \r\n"])) == [1, 2]
+    assert list(iter_array([b"[]"])) == []
+
+
+def test_keyed_envelope_across_every_chunk_boundary():
+    body = json.dumps({"status": "success", "count": 3, "data": ITEMS, "next": None}).encode()
+    for chunks in every_split(body):
+        extras = {}
+        assert list(iter_array(chunks, key="data", extras=extras)) == ITEMS
+        assert extras == {"status": "success", "count": 3, "next": None}
+
+
+def test_keyed_envelope_edge_cases():
+    assert list(iter_array([b'{"data": []}'], key="data")) == []
+    with pytest.raises(ValueError, match="Missing key 'data'"):
+        list(iter_array([b'{"status": "success"}'], key="data"))
+    with pytest.raises(ValueError, match="Missing key 'data'"):
+        list(iter_array([b"{}"], key="data"))
+    with pytest.raises(json.JSONDecodeError, match="Expecting '{'"):
+        list(iter_array([b"[1, 2]"], key="data"))
+
+
+def test_extra_trailing_data_raises():
+    with pytest.raises(json.JSONDecodeError, match="Extra data"):
+        list(iter_array([b"[1, 2]", b" [3]"]))
+    with pytest.raises(json.JSONDecodeError, match="Extra data"):
+        list(iter_array([b'{"data": [1]}', b" x"], key="data"))
+    assert list(iter_array([b"[1, 2]", b"  \n"])) == [1, 2]  # trailing whitespace is fine
+
+
+@pytest.mark.parametrize("body", [b"", b"[", b"[1", b"[1,", b"[1, 2", b'["unterminated', b"[tru", b"[1 2]",
+                                  b"[1,]", b"[,1]", b"{", b'{"data": [1, 2]', b"[nope]", b"[1}"])
+def test_malformed_or_truncated_input_raises(body):
+    key = "data" if body.startswith(b"{") else None
+    for chunks in every_split(body):
+        with pytest.raises(ValueError):  # json.JSONDecodeError is a ValueError
+            list(iter_array(chunks, key=key))
+
+
+def test_iter_chunks_covers_the_body():
+    assert list(iter_chunks(b"abcdefg", 3)) == [b"abc", b"def", b"g"]
+    assert list(iter_chunks(b"")) == []
@@ -0,0 +1,64 @@
+import pytest
+import GlobalVariables
+from GlobalDormTransport import ClientTransport
+
+
+@pytest.fixture
+def servers(monkeypatch):
+    """Two made-up servers, the transport starting on the first."""
+    servers = {"small": "10.0.0.1:8080", "large": "10.0.0.2:8080"}
+    monkeypatch.setattr(GlobalVariables, "servers", servers)
+    monkeypatch.setattr(GlobalVariables, "current_server", servers["small"])
+    return servers
+
+
+def pool_size(session, url):
+    return session.get_adapter(url)._pool_maxsize
+
+
+def test_each_server_gets_its_own_pool_size(servers, monkeypatch):
+    transport = ClientTransport(pool_sizes={"small": 4, "large": 12})
+    session = transport.current_session()
+    assert pool_size(session, f"http://{servers['small']}/GlobalDorm/webresources/database/viewAllDormRooms") == 4
+
+    monkeypatch.setattr(GlobalVariables, "current_server", servers["large"])
+    rebuilt = transport.current_session()
+    assert rebuilt is not session
+    assert pool_size(rebuilt, f"http://{servers['large']}/GlobalDorm/webresources/database/viewAllDormRooms") == 12
+
+
+def test_unknown_servers_use_the_default_pool_size(servers, monkeypatch):
+    monkeypatch.setattr(GlobalVariables, "default_pool_size", 3)
+    session = ClientTransport(pool_sizes={}).current_session()
+    assert pool_size(session, f"http://{servers['small']}/anything") == 3
+
+
+def test_session_is_kept_until_the_server_changes_or_rebuild(servers):
+    transport = ClientTransport()
+    session = transport.current_session()
+    assert transport.current_session() is session
+    transport.rebuild()
+    assert transport.current_session() is not session
+
+
+def test_requests_reuse_one_keep_alive_connection(stand_in_server, monkeypatch):
+    monkeypatch.setattr(GlobalVariables, "current_server", stand_in_server.address)
+    stand_in_server.routes = {"/hello": {"greeting": "hi"}}
+    transport = ClientTransport()
+    try:
+        for _ in range(5):
+            assert transport.get(f"http://{stand_in_server.address}/hello").json() == {"greeting": "hi"}
+    finally:
+        transport.close()
+    assert len(stand_in_server.requests) == 5
+    assert len({port for _, port in stand_in_server.requests}) == 1
+
+
+def test_default_timeout_is_applied_unless_given(servers, monkeypatch):
+    transport = ClientTransport(timeout=(1, 2))
+    sent = []
+    session = transport.current_session()
+    monkeypatch.setattr(session, "request", lambda method, url, timeout=None, **kwargs: sent.append(timeout))
+    transport.post("http://example.invalid/anything")
+    transport.post("http://example.invalid/anything", timeout=9)
+    assert sent == [(1, 2), 9]